@@ -7,7 +7,7 @@ import json
 import plistlib
 import asyncio
 from typing import Dict, List, Any, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 import subprocess
 
@@ -22,7 +22,11 @@ class ApplicationDataCollector:
         self.applications = config.get('applications', {})
     
     async def collect_all_applications(self) -> List[Dict[str, Any]]:
-        """Collect data from all configured applications"""
+        """Collect data from all configured applications
+
+        The file-backed collectors (SQLite, plist, JSON, markdown) do their
+        blocking I/O in worker threads, so the gather below overlaps them.
+        """
         all_data = []
         
         tasks = []
@@ -53,6 +57,9 @@ class ApplicationDataCollector:
     
     async def collect_apple_notes(self) -> List[Dict[str, Any]]:
         """Collect notes from Apple Notes app"""
+        return await asyncio.to_thread(self._collect_apple_notes_sync)
+    
+    def _collect_apple_notes_sync(self) -> List[Dict[str, Any]]:
         try:
             notes_data = []
             
@@ -135,6 +142,9 @@ class ApplicationDataCollector:
     
     async def collect_safari_data(self) -> List[Dict[str, Any]]:
         """Collect bookmarks and reading list from Safari"""
+        return await asyncio.to_thread(self._collect_safari_data_sync)
+    
+    def _collect_safari_data_sync(self) -> List[Dict[str, Any]]:
         try:
             safari_data = []
             
@@ -206,6 +216,9 @@ class ApplicationDataCollector:
     
     async def collect_chrome_data(self) -> List[Dict[str, Any]]:
         """Collect bookmarks and history from Chrome"""
+        return await asyncio.to_thread(self._collect_chrome_data_sync)
+    
+    def _collect_chrome_data_sync(self) -> List[Dict[str, Any]]:
         try:
             chrome_data = []
             
@@ -254,6 +267,9 @@ class ApplicationDataCollector:
     
     async def collect_obsidian_data(self) -> List[Dict[str, Any]]:
         """Collect notes from Obsidian vaults"""
+        return await asyncio.to_thread(self._collect_obsidian_data_sync)
+    
+    def _collect_obsidian_data_sync(self) -> List[Dict[str, Any]]:
         try:
             obsidian_data = []
             
@@ -269,7 +285,7 @@ class ApplicationDataCollector:
                     for vault_name in os.listdir(location):
                         vault_path = os.path.join(location, vault_name)
                         if os.path.isdir(vault_path):
-                            vault_notes = await self._collect_obsidian_vault(vault_path, vault_name)
+                            vault_notes = self._collect_obsidian_vault(vault_path, vault_name)
                             obsidian_data.extend(vault_notes)
             
             logger.info(f"Collected {len(obsidian_data)} Obsidian notes")
@@ -279,7 +295,7 @@ class ApplicationDataCollector:
             logger.error(f"Obsidian data collection failed: {e}")
             return []
     
-    async def _collect_obsidian_vault(self, vault_path: str, vault_name: str) -> List[Dict[str, Any]]:
+    def _collect_obsidian_vault(self, vault_path: str, vault_name: str) -> List[Dict[str, Any]]:
         """Collect all markdown files from an Obsidian vault"""
         vault_data = []
         
@@ -318,6 +334,9 @@ class ApplicationDataCollector:
     
     async def collect_bear_notes(self) -> List[Dict[str, Any]]:
         """Collect notes from Bear app"""
+        return await asyncio.to_thread(self._collect_bear_notes_sync)
+    
+    def _collect_bear_notes_sync(self) -> List[Dict[str, Any]]:
         try:
             bear_data = []
             
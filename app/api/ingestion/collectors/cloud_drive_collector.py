@@ -1,6 +1,7 @@
 """
 Cloud Drive Collector - Sync and analyze files from Google Drive, Dropbox, iCloud, etc.
 """
+import io
 import os
 import asyncio
 import json
@@ -13,6 +14,7 @@ try:
     from google.auth.transport.requests import Request
     from google.oauth2.credentials import Credentials
     from google_auth_oauthlib.flow import InstalledAppFlow
+    from googleapiclient.http import MediaIoBaseDownload
     GOOGLE_AVAILABLE = True
 except ImportError:
     GOOGLE_AVAILABLE = False
@@ -27,6 +29,9 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Default transfer chunk size (overridden by the 'chunk_size_bytes' config key)
+DEFAULT_CHUNK_SIZE_BYTES = 1 << 20
+
 class CloudDriveCollector:
     """Collect and sync files from various cloud storage providers"""
     
@@ -147,7 +152,7 @@ class CloudDriveCollector:
                             try:
                                 # Download file content
                                 _, response = dbx.files_download(entry.path_lower)
-                                content = response.content
+                                content = b"".join(response.iter_content(chunk_size=self.chunk_size_bytes))
                                 
                                 collected_files.append({
                                     'source': 'dropbox',
@@ -258,6 +263,19 @@ class CloudDriveCollector:
         
         return creds
     
+    @property
+    def chunk_size_bytes(self) -> int:
+        return self.config.get('chunk_size_bytes', DEFAULT_CHUNK_SIZE_BYTES)
+    
+    def _download_media(self, request) -> bytes:
+        """Download a Google Drive media request in chunk_size_bytes pieces"""
+        buffer = io.BytesIO()
+        downloader = MediaIoBaseDownload(buffer, request, chunksize=self.chunk_size_bytes)
+        done = False
+        while not done:
+            _, done = downloader.next_chunk()
+        return buffer.getvalue()
+    
     def _download_google_drive_file(self, service, file_info: Dict) -> Optional[bytes]:
         """Download file content from Google Drive"""
         try:
@@ -274,11 +292,11 @@ class CloudDriveCollector:
                 export_mime = export_mime_types.get(mime_type)
                 if export_mime:
                     request = service.files().export_media(fileId=file_info['id'], mimeType=export_mime)
-                    return request.execute()
+                    return self._download_media(request)
             else:
                 # Download regular files
                 request = service.files().get_media(fileId=file_info['id'])
-                return request.execute()
+                return self._download_media(request)
         except Exception as e:
             logger.error(f"Error downloading file {file_info['name']}: {e}")
             return None
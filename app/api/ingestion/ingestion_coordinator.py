@@ -52,6 +52,14 @@ class IngestionCoordinator:
             'errors': []
         }
     
+    async def startup(self):
+        """Open the storage connection pool before serving requests"""
+        await asyncio.to_thread(self.storage_manager.warm_pool)
+    
+    async def shutdown(self):
+        """Release storage connections"""
+        self.storage_manager.close()
+    
     def _load_config(self, config_path: str = None) -> Dict[str, Any]:
         """Load configuration from file or use defaults"""
         default_config = {
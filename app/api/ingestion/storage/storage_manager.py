@@ -3,9 +3,12 @@ Storage Manager - Handle data persistence and retrieval for ingested content
 """
 import os
 import json
+import orjson
 import sqlite3
 import asyncio
 import pickle
+import queue
+from contextlib import contextmanager
 from typing import Dict, List, Any, Optional, Iterator
 from datetime import datetime
 import logging
@@ -13,6 +16,10 @@ from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Idle SQLite connections kept open for reuse
+POOL_MIN_SIZE = 4
+POOL_MAX_SIZE = 32
+
 class StorageManager:
     """Manage storage and retrieval of processed knowledge content"""
     
@@ -28,126 +35,176 @@ class StorageManager:
         os.makedirs(self.content_path, exist_ok=True)
         os.makedirs(self.embeddings_path, exist_ok=True)
         
+        # Pool of open connections, reused across operations
+        self._pool: "queue.SimpleQueue[sqlite3.Connection]" = queue.SimpleQueue()
+        
         # Initialize database
         self._init_database()
     
+    def _open(self) -> sqlite3.Connection:
+        """Open a connection, setting the WAL pragmas once for its lifetime"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Take a connection from the pool, opening one if none is idle"""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._open()
+        conn.row_factory = None
+        return conn
+    
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled connection, rolled back if the block fails and always returned to the pool"""
+        conn = self._connect()
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._release(conn)
+    
+    def _release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool"""
+        if self._pool.qsize() < POOL_MAX_SIZE:
+            self._pool.put(conn)
+        else:
+            conn.close()
+    
+    def warm_pool(self, size: int = POOL_MIN_SIZE):
+        """Open connections ahead of the first requests"""
+        for _ in range(size - self._pool.qsize()):
+            self._release(self._open())
+    
+    def close(self):
+        """Close every pooled connection"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+    
     def _init_database(self):
         """Initialize SQLite database schema"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connection() as conn:
+            cursor = conn.cursor()
         
-        # Main content table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS content (
-            id TEXT PRIMARY KEY,
-            title TEXT,
-            content_type TEXT,
-            source TEXT,
-            file_path TEXT,
-            content_hash TEXT,
-            created_time TEXT,
-            modified_time TEXT,
-            collection_time TEXT,
-            processing_time TEXT,
-            quality_score REAL,
-            quality_level TEXT,
-            word_count INTEGER,
-            size INTEGER,
-            language TEXT,
-            metadata TEXT
-        )
-        ''')
+            # Main content table
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS content (
+                id TEXT PRIMARY KEY,
+                title TEXT,
+                content_type TEXT,
+                source TEXT,
+                file_path TEXT,
+                content_hash TEXT,
+                created_time TEXT,
+                modified_time TEXT,
+                collection_time TEXT,
+                processing_time TEXT,
+                quality_score REAL,
+                quality_level TEXT,
+                word_count INTEGER,
+                size INTEGER,
+                language TEXT,
+                metadata TEXT
+            )
+            ''')
         
-        # Keywords table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS keywords (
-            content_id TEXT,
-            keyword TEXT,
-            frequency INTEGER,
-            FOREIGN KEY (content_id) REFERENCES content (id)
-        )
-        ''')
+            # Keywords table
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS keywords (
+                content_id TEXT,
+                keyword TEXT,
+                frequency INTEGER,
+                FOREIGN KEY (content_id) REFERENCES content (id)
+            )
+            ''')
         
-        # Entities table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS entities (
-            content_id TEXT,
-            entity_text TEXT,
-            entity_type TEXT,
-            start_pos INTEGER,
-            end_pos INTEGER,
-            confidence REAL,
-            FOREIGN KEY (content_id) REFERENCES content (id)
-        )
-        ''')
+            # Entities table
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS entities (
+                content_id TEXT,
+                entity_text TEXT,
+                entity_type TEXT,
+                start_pos INTEGER,
+                end_pos INTEGER,
+                confidence REAL,
+                FOREIGN KEY (content_id) REFERENCES content (id)
+            )
+            ''')
         
-        # Relationships table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS relationships (
-            content_id TEXT,
-            relationship_type TEXT,
-            target TEXT,
-            strength REAL,
-            description TEXT,
-            FOREIGN KEY (content_id) REFERENCES content (id)
-        )
-        ''')
+            # Relationships table
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS relationships (
+                content_id TEXT,
+                relationship_type TEXT,
+                target TEXT,
+                strength REAL,
+                description TEXT,
+                FOREIGN KEY (content_id) REFERENCES content (id)
+            )
+            ''')
         
-        # Topics table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS topics (
-            content_id TEXT,
-            topic TEXT,
-            relevance REAL,
-            FOREIGN KEY (content_id) REFERENCES content (id)
-        )
-        ''')
+            # Topics table
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS topics (
+                content_id TEXT,
+                topic TEXT,
+                relevance REAL,
+                FOREIGN KEY (content_id) REFERENCES content (id)
+            )
+            ''')
         
-        # Quality issues table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS quality_issues (
-            content_id TEXT,
-            issue_type TEXT,
-            description TEXT,
-            severity TEXT,
-            suggestion TEXT,
-            FOREIGN KEY (content_id) REFERENCES content (id)
-        )
-        ''')
+            # Quality issues table
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS quality_issues (
+                content_id TEXT,
+                issue_type TEXT,
+                description TEXT,
+                severity TEXT,
+                suggestion TEXT,
+                FOREIGN KEY (content_id) REFERENCES content (id)
+            )
+            ''')
         
-        # Collections table (for organizing content)
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS collections (
-            id TEXT PRIMARY KEY,
-            name TEXT,
-            description TEXT,
-            created_time TEXT,
-            metadata TEXT
-        )
-        ''')
+            # Collections table (for organizing content)
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS collections (
+                id TEXT PRIMARY KEY,
+                name TEXT,
+                description TEXT,
+                created_time TEXT,
+                metadata TEXT
+            )
+            ''')
         
-        # Collection memberships
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS collection_memberships (
-            collection_id TEXT,
-            content_id TEXT,
-            added_time TEXT,
-            FOREIGN KEY (collection_id) REFERENCES collections (id),
-            FOREIGN KEY (content_id) REFERENCES content (id)
-        )
-        ''')
+            # Collection memberships
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS collection_memberships (
+                collection_id TEXT,
+                content_id TEXT,
+                added_time TEXT,
+                FOREIGN KEY (collection_id) REFERENCES collections (id),
+                FOREIGN KEY (content_id) REFERENCES content (id)
+            )
+            ''')
         
-        # Create indexes for performance
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_content_type ON content (content_type)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_content_source ON content (source)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_content_quality ON content (quality_level)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_keywords_content ON keywords (content_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_entities_content ON entities (content_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_relationships_content ON relationships (content_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_topics_content ON topics (content_id)')
+            # Create indexes for performance
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_content_type ON content (content_type)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_content_source ON content (source)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_content_quality ON content (quality_level)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_keywords_content ON keywords (content_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_entities_content ON entities (content_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_relationships_content ON relationships (content_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_topics_content ON topics (content_id)')
         
-        conn.commit()
-        conn.close()
+            conn.commit()
         
         logger.info(f"Storage database initialized at {self.db_path}")
     
@@ -170,90 +227,86 @@ class StorageManager:
                 json.dump(content_data, f, ensure_ascii=False, indent=2)
             
             # Store in database
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self._connection() as conn:
+                cursor = conn.cursor()
             
-            # Insert main content record
-            cursor.execute('''
-            INSERT OR REPLACE INTO content (
-                id, title, content_type, source, file_path, content_hash,
-                created_time, modified_time, collection_time, processing_time,
-                quality_score, quality_level, word_count, size, language, metadata
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                content_id,
-                processed_content.metadata.get('title', 'Untitled'),
-                processed_content.content_type.value,
-                processed_content.metadata.get('source'),
-                content_file_path,
-                processed_content.metadata.get('content_hash'),
-                processed_content.metadata.get('created_time'),
-                processed_content.metadata.get('modified_time'),
-                processed_content.metadata.get('collection_time'),
-                datetime.now().isoformat(),
-                quality_report.quality_score,
-                quality_report.quality_report.quality_level.value,
-                processed_content.metadata.get('word_count', 0),
-                processed_content.metadata.get('size', 0),
-                processed_content.metadata.get('language', 'unknown'),
-                json.dumps(processed_content.metadata)
-            ))
-            
-            # Clear existing related data
-            cursor.execute('DELETE FROM keywords WHERE content_id = ?', (content_id,))
-            cursor.execute('DELETE FROM entities WHERE content_id = ?', (content_id,))
-            cursor.execute('DELETE FROM relationships WHERE content_id = ?', (content_id,))
-            cursor.execute('DELETE FROM topics WHERE content_id = ?', (content_id,))
-            cursor.execute('DELETE FROM quality_issues WHERE content_id = ?', (content_id,))
-            
-            # Insert keywords
-            for keyword in processed_content.keywords:
+                # Insert main content record
                 cursor.execute('''
-                INSERT INTO keywords (content_id, keyword, frequency) VALUES (?, ?, ?)
-                ''', (content_id, keyword, 1))  # Frequency tracking could be enhanced
-            
-            # Insert entities
-            for entity in processed_content.entities:
-                cursor.execute('''
-                INSERT INTO entities (content_id, entity_text, entity_type, start_pos, end_pos, confidence)
-                VALUES (?, ?, ?, ?, ?, ?)
+                INSERT OR REPLACE INTO content (
+                    id, title, content_type, source, file_path, content_hash,
+                    created_time, modified_time, collection_time, processing_time,
+                    quality_score, quality_level, word_count, size, language, metadata
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''', (
                     content_id,
-                    entity.get('text'),
-                    entity.get('label'),
-                    entity.get('start', 0),
-                    entity.get('end', 0),
-                    1.0  # Confidence could be calculated
+                    processed_content.metadata.get('title', 'Untitled'),
+                    processed_content.content_type.value,
+                    processed_content.metadata.get('source'),
+                    content_file_path,
+                    processed_content.metadata.get('content_hash'),
+                    processed_content.metadata.get('created_time'),
+                    processed_content.metadata.get('modified_time'),
+                    processed_content.metadata.get('collection_time'),
+                    datetime.now().isoformat(),
+                    quality_report.quality_score,
+                    quality_report.quality_report.quality_level.value,
+                    processed_content.metadata.get('word_count', 0),
+                    processed_content.metadata.get('size', 0),
+                    processed_content.metadata.get('language', 'unknown'),
+                    json.dumps(processed_content.metadata)
                 ))
             
-            # Insert relationships
-            for relationship in processed_content.relationships:
-                cursor.execute('''
+                # Clear existing related data
+                cursor.execute('DELETE FROM keywords WHERE content_id = ?', (content_id,))
+                cursor.execute('DELETE FROM entities WHERE content_id = ?', (content_id,))
+                cursor.execute('DELETE FROM relationships WHERE content_id = ?', (content_id,))
+                cursor.execute('DELETE FROM topics WHERE content_id = ?', (content_id,))
+                cursor.execute('DELETE FROM quality_issues WHERE content_id = ?', (content_id,))
+            
+                # Insert related rows, one executemany per table
+                cursor.executemany('''
+                INSERT INTO keywords (content_id, keyword, frequency) VALUES (?, ?, ?)
+                ''', [(content_id, keyword, 1) for keyword in processed_content.keywords])  # Frequency tracking could be enhanced
+            
+                cursor.executemany('''
+                INSERT INTO entities (content_id, entity_text, entity_type, start_pos, end_pos, confidence)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ''', [
+                    (
+                        content_id,
+                        entity.get('text'),
+                        entity.get('label'),
+                        entity.get('start', 0),
+                        entity.get('end', 0),
+                        1.0  # Confidence could be calculated
+                    )
+                    for entity in processed_content.entities
+                ])
+            
+                cursor.executemany('''
                 INSERT INTO relationships (content_id, relationship_type, target, strength, description)
                 VALUES (?, ?, ?, ?, ?)
-                ''', (
-                    content_id,
-                    relationship.get('type'),
-                    relationship.get('target'),
-                    relationship.get('strength', 0.5),
-                    relationship.get('description')
-                ))
-            
-            # Insert topics
-            for topic in processed_content.topics:
-                cursor.execute('''
+                ''', [
+                    (
+                        content_id,
+                        relationship.get('type'),
+                        relationship.get('target'),
+                        relationship.get('strength', 0.5),
+                        relationship.get('description')
+                    )
+                    for relationship in processed_content.relationships
+                ])
+            
+                cursor.executemany('''
                 INSERT INTO topics (content_id, topic, relevance) VALUES (?, ?, ?)
-                ''', (content_id, topic, 1.0))  # Relevance could be calculated
+                ''', [(content_id, topic, 1.0) for topic in processed_content.topics])  # Relevance could be calculated
             
-            # Insert quality issues
-            for issue in quality_report.issues:
-                cursor.execute('''
+                cursor.executemany('''
                 INSERT INTO quality_issues (content_id, issue_type, description, severity)
                 VALUES (?, ?, ?, ?)
-                ''', (content_id, 'general', issue, 'medium'))
+                ''', [(content_id, 'general', issue, 'medium') for issue in quality_report.issues])
             
-            conn.commit()
-            conn.close()
+                conn.commit()
             
             logger.info(f"Successfully stored content: {content_id}")
             return {
@@ -275,42 +328,41 @@ class StorageManager:
     async def retrieve_content(self, content_id: str) -> Optional[Dict[str, Any]]:
         """Retrieve content by ID"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            with self._connection() as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
             
-            # Get main content record
-            cursor.execute('SELECT * FROM content WHERE id = ?', (content_id,))
-            content_row = cursor.fetchone()
+                # Get main content record
+                cursor.execute('SELECT * FROM content WHERE id = ?', (content_id,))
+                content_row = cursor.fetchone()
             
-            if not content_row:
-                return None
+                if not content_row:
+                    return None
             
-            # Load content file
-            content_file_path = content_row['file_path']
-            if os.path.exists(content_file_path):
-                with open(content_file_path, 'r', encoding='utf-8') as f:
-                    content_data = json.load(f)
-            else:
-                content_data = {}
+                # Load content file
+                content_file_path = content_row['file_path']
+                if os.path.exists(content_file_path):
+                    with open(content_file_path, 'r', encoding='utf-8') as f:
+                        content_data = json.load(f)
+                else:
+                    content_data = {}
             
-            # Get related data
-            cursor.execute('SELECT * FROM keywords WHERE content_id = ?', (content_id,))
-            keywords = [row['keyword'] for row in cursor.fetchall()]
+                # Get related data
+                cursor.execute('SELECT * FROM keywords WHERE content_id = ?', (content_id,))
+                keywords = [row['keyword'] for row in cursor.fetchall()]
             
-            cursor.execute('SELECT * FROM entities WHERE content_id = ?', (content_id,))
-            entities = [dict(row) for row in cursor.fetchall()]
+                cursor.execute('SELECT * FROM entities WHERE content_id = ?', (content_id,))
+                entities = [dict(row) for row in cursor.fetchall()]
             
-            cursor.execute('SELECT * FROM relationships WHERE content_id = ?', (content_id,))
-            relationships = [dict(row) for row in cursor.fetchall()]
+                cursor.execute('SELECT * FROM relationships WHERE content_id = ?', (content_id,))
+                relationships = [dict(row) for row in cursor.fetchall()]
             
-            cursor.execute('SELECT * FROM topics WHERE content_id = ?', (content_id,))
-            topics = [row['topic'] for row in cursor.fetchall()]
+                cursor.execute('SELECT * FROM topics WHERE content_id = ?', (content_id,))
+                topics = [row['topic'] for row in cursor.fetchall()]
             
-            cursor.execute('SELECT * FROM quality_issues WHERE content_id = ?', (content_id,))
-            quality_issues = [row['description'] for row in cursor.fetchall()]
+                cursor.execute('SELECT * FROM quality_issues WHERE content_id = ?', (content_id,))
+                quality_issues = [row['description'] for row in cursor.fetchall()]
             
-            conn.close()
             
             # Combine all data
             result = {
@@ -330,7 +382,7 @@ class StorageManager:
                 'quality_issues': quality_issues,
                 'created_time': content_row['created_time'],
                 'modified_time': content_row['modified_time'],
-                'metadata': json.loads(content_row['metadata']) if content_row['metadata'] else {}
+                'metadata': orjson.loads(content_row['metadata']) if content_row['metadata'] else {}
             }
             
             return result
@@ -342,74 +394,73 @@ class StorageManager:
     async def search_content(self, query: str, filters: Optional[Dict[str, Any]] = None, limit: int = 50) -> List[Dict[str, Any]]:
         """Search content with optional filters"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            # Build search query
-            where_clauses = []
-            params = []
-            
-            if query:
-                # Simple text search in title and keywords
-                where_clauses.append('''
-                (content.title LIKE ? OR 
-                 content.id IN (SELECT content_id FROM keywords WHERE keyword LIKE ?))
-                ''')
-                params.extend([f'%{query}%', f'%{query}%'])
-            
-            if filters:
-                if 'content_type' in filters:
-                    where_clauses.append('content.content_type = ?')
-                    params.append(filters['content_type'])
+            with self._connection() as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+            
+                # Build search query
+                where_clauses = []
+                params = []
+            
+                if query:
+                    # Simple text search in title and keywords
+                    where_clauses.append('''
+                    (content.title LIKE ? OR 
+                     content.id IN (SELECT content_id FROM keywords WHERE keyword LIKE ?))
+                    ''')
+                    params.extend([f'%{query}%', f'%{query}%'])
+            
+                if filters:
+                    if 'content_type' in filters:
+                        where_clauses.append('content.content_type = ?')
+                        params.append(filters['content_type'])
                 
-                if 'source' in filters:
-                    where_clauses.append('content.source = ?')
-                    params.append(filters['source'])
+                    if 'source' in filters:
+                        where_clauses.append('content.source = ?')
+                        params.append(filters['source'])
                 
-                if 'quality_level' in filters:
-                    where_clauses.append('content.quality_level = ?')
-                    params.append(filters['quality_level'])
+                    if 'quality_level' in filters:
+                        where_clauses.append('content.quality_level = ?')
+                        params.append(filters['quality_level'])
                 
-                if 'min_quality_score' in filters:
-                    where_clauses.append('content.quality_score >= ?')
-                    params.append(filters['min_quality_score'])
+                    if 'min_quality_score' in filters:
+                        where_clauses.append('content.quality_score >= ?')
+                        params.append(filters['min_quality_score'])
                 
-                if 'topic' in filters:
-                    where_clauses.append('content.id IN (SELECT content_id FROM topics WHERE topic = ?)')
-                    params.append(filters['topic'])
-            
-            where_clause = ' AND '.join(where_clauses) if where_clauses else '1=1'
-            
-            sql = f'''
-            SELECT DISTINCT content.* 
-            FROM content 
-            WHERE {where_clause}
-            ORDER BY content.quality_score DESC, content.processing_time DESC
-            LIMIT ?
-            '''
-            
-            params.append(limit)
-            cursor.execute(sql, params)
-            rows = cursor.fetchall()
-            
-            results = []
-            for row in rows:
-                result = {
-                    'id': row['id'],
-                    'title': row['title'],
-                    'content_type': row['content_type'],
-                    'source': row['source'],
-                    'quality_score': row['quality_score'],
-                    'quality_level': row['quality_level'],
-                    'word_count': row['word_count'],
-                    'created_time': row['created_time'],
-                    'modified_time': row['modified_time'],
-                    'metadata': json.loads(row['metadata']) if row['metadata'] else {}
-                }
-                results.append(result)
+                    if 'topic' in filters:
+                        where_clauses.append('content.id IN (SELECT content_id FROM topics WHERE topic = ?)')
+                        params.append(filters['topic'])
+            
+                where_clause = ' AND '.join(where_clauses) if where_clauses else '1=1'
+            
+                sql = f'''
+                SELECT DISTINCT content.* 
+                FROM content 
+                WHERE {where_clause}
+                ORDER BY content.quality_score DESC, content.processing_time DESC
+                LIMIT ?
+                '''
+            
+                params.append(limit)
+                cursor.execute(sql, params)
+                rows = cursor.fetchall()
+            
+                results = []
+                for row in rows:
+                    result = {
+                        'id': row['id'],
+                        'title': row['title'],
+                        'content_type': row['content_type'],
+                        'source': row['source'],
+                        'quality_score': row['quality_score'],
+                        'quality_level': row['quality_level'],
+                        'word_count': row['word_count'],
+                        'created_time': row['created_time'],
+                        'modified_time': row['modified_time'],
+                        'metadata': orjson.loads(row['metadata']) if row['metadata'] else {}
+                    }
+                    results.append(result)
             
-            conn.close()
             return results
             
         except Exception as e:
@@ -419,64 +470,63 @@ class StorageManager:
     async def get_content_statistics(self) -> Dict[str, Any]:
         """Get statistics about stored content"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self._connection() as conn:
+                cursor = conn.cursor()
             
-            # Total content count
-            cursor.execute('SELECT COUNT(*) FROM content')
-            total_content = cursor.fetchone()[0]
+                # Total content count
+                cursor.execute('SELECT COUNT(*) FROM content')
+                total_content = cursor.fetchone()[0]
             
-            # Content by type
-            cursor.execute('SELECT content_type, COUNT(*) FROM content GROUP BY content_type')
-            content_by_type = dict(cursor.fetchall())
+                # Content by type
+                cursor.execute('SELECT content_type, COUNT(*) FROM content GROUP BY content_type')
+                content_by_type = dict(cursor.fetchall())
             
-            # Content by source
-            cursor.execute('SELECT source, COUNT(*) FROM content GROUP BY source ORDER BY COUNT(*) DESC LIMIT 10')
-            content_by_source = dict(cursor.fetchall())
+                # Content by source
+                cursor.execute('SELECT source, COUNT(*) FROM content GROUP BY source ORDER BY COUNT(*) DESC LIMIT 10')
+                content_by_source = dict(cursor.fetchall())
             
-            # Quality distribution
-            cursor.execute('SELECT quality_level, COUNT(*) FROM content GROUP BY quality_level')
-            quality_distribution = dict(cursor.fetchall())
+                # Quality distribution
+                cursor.execute('SELECT quality_level, COUNT(*) FROM content GROUP BY quality_level')
+                quality_distribution = dict(cursor.fetchall())
             
-            # Average quality score
-            cursor.execute('SELECT AVG(quality_score) FROM content')
-            avg_quality = cursor.fetchone()[0] or 0
+                # Average quality score
+                cursor.execute('SELECT AVG(quality_score) FROM content')
+                avg_quality = cursor.fetchone()[0] or 0
             
-            # Total word count
-            cursor.execute('SELECT SUM(word_count) FROM content')
-            total_words = cursor.fetchone()[0] or 0
+                # Total word count
+                cursor.execute('SELECT SUM(word_count) FROM content')
+                total_words = cursor.fetchone()[0] or 0
             
-            # Top keywords
-            cursor.execute('''
-            SELECT keyword, COUNT(*) as frequency 
-            FROM keywords 
-            GROUP BY keyword 
-            ORDER BY frequency DESC 
-            LIMIT 20
-            ''')
-            top_keywords = dict(cursor.fetchall())
+                # Top keywords
+                cursor.execute('''
+                SELECT keyword, COUNT(*) as frequency 
+                FROM keywords 
+                GROUP BY keyword 
+                ORDER BY frequency DESC 
+                LIMIT 20
+                ''')
+                top_keywords = dict(cursor.fetchall())
             
-            # Top topics
-            cursor.execute('''
-            SELECT topic, COUNT(*) as frequency 
-            FROM topics 
-            GROUP BY topic 
-            ORDER BY frequency DESC 
-            LIMIT 15
-            ''')
-            top_topics = dict(cursor.fetchall())
+                # Top topics
+                cursor.execute('''
+                SELECT topic, COUNT(*) as frequency 
+                FROM topics 
+                GROUP BY topic 
+                ORDER BY frequency DESC 
+                LIMIT 15
+                ''')
+                top_topics = dict(cursor.fetchall())
             
-            # Recent content
-            cursor.execute('''
-            SELECT DATE(processing_time) as date, COUNT(*) 
-            FROM content 
-            WHERE processing_time >= datetime('now', '-30 days')
-            GROUP BY DATE(processing_time)
-            ORDER BY date DESC
-            ''')
-            recent_activity = dict(cursor.fetchall())
+                # Recent content
+                cursor.execute('''
+                SELECT DATE(processing_time) as date, COUNT(*) 
+                FROM content 
+                WHERE processing_time >= datetime('now', '-30 days')
+                GROUP BY DATE(processing_time)
+                ORDER BY date DESC
+                ''')
+                recent_activity = dict(cursor.fetchall())
             
-            conn.close()
             
             return {
                 'total_content': total_content,
@@ -501,16 +551,15 @@ class StorageManager:
         try:
             collection_id = f"collection_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self._connection() as conn:
+                cursor = conn.cursor()
             
-            cursor.execute('''
-            INSERT INTO collections (id, name, description, created_time, metadata)
-            VALUES (?, ?, ?, ?, ?)
-            ''', (collection_id, name, description, datetime.now().isoformat(), '{}'))
+                cursor.execute('''
+                INSERT INTO collections (id, name, description, created_time, metadata)
+                VALUES (?, ?, ?, ?, ?)
+                ''', (collection_id, name, description, datetime.now().isoformat(), '{}'))
             
-            conn.commit()
-            conn.close()
+                conn.commit()
             
             logger.info(f"Created collection: {collection_id}")
             return collection_id
@@ -522,17 +571,16 @@ class StorageManager:
     async def add_to_collection(self, collection_id: str, content_ids: List[str]) -> bool:
         """Add content to a collection"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self._connection() as conn:
+                cursor = conn.cursor()
             
-            for content_id in content_ids:
-                cursor.execute('''
-                INSERT OR REPLACE INTO collection_memberships (collection_id, content_id, added_time)
-                VALUES (?, ?, ?)
-                ''', (collection_id, content_id, datetime.now().isoformat()))
+                for content_id in content_ids:
+                    cursor.execute('''
+                    INSERT OR REPLACE INTO collection_memberships (collection_id, content_id, added_time)
+                    VALUES (?, ?, ?)
+                    ''', (collection_id, content_id, datetime.now().isoformat()))
             
-            conn.commit()
-            conn.close()
+                conn.commit()
             
             logger.info(f"Added {len(content_ids)} items to collection {collection_id}")
             return True
@@ -544,20 +592,19 @@ class StorageManager:
     async def export_content(self, output_path: str, format: str = 'json') -> bool:
         """Export all content to file"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+            with self._connection() as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
             
-            cursor.execute('SELECT * FROM content ORDER BY processing_time DESC')
-            rows = cursor.fetchall()
+                cursor.execute('SELECT * FROM content ORDER BY processing_time DESC')
+                rows = cursor.fetchall()
             
-            export_data = []
-            for row in rows:
-                content_data = dict(row)
-                content_data['metadata'] = json.loads(content_data['metadata']) if content_data['metadata'] else {}
-                export_data.append(content_data)
+                export_data = []
+                for row in rows:
+                    content_data = dict(row)
+                    content_data['metadata'] = orjson.loads(content_data['metadata']) if content_data['metadata'] else {}
+                    export_data.append(content_data)
             
-            conn.close()
             
             if format.lower() == 'json':
                 with open(output_path, 'w', encoding='utf-8') as f:
@@ -575,36 +622,35 @@ class StorageManager:
     async def cleanup_storage(self, days_old: int = 30, quality_threshold: float = 2.0) -> int:
         """Clean up low-quality or old content"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Find content to delete
-            cursor.execute('''
-            SELECT id, file_path FROM content 
-            WHERE quality_score < ? 
-            OR (processing_time < datetime('now', '-{} days') AND quality_score < 5.0)
-            '''.format(days_old), (quality_threshold,))
-            
-            to_delete = cursor.fetchall()
+            with self._connection() as conn:
+                cursor = conn.cursor()
             
-            deleted_count = 0
-            for content_id, file_path in to_delete:
-                # Delete from database
-                cursor.execute('DELETE FROM content WHERE id = ?', (content_id,))
-                cursor.execute('DELETE FROM keywords WHERE content_id = ?', (content_id,))
-                cursor.execute('DELETE FROM entities WHERE content_id = ?', (content_id,))
-                cursor.execute('DELETE FROM relationships WHERE content_id = ?', (content_id,))
-                cursor.execute('DELETE FROM topics WHERE content_id = ?', (content_id,))
-                cursor.execute('DELETE FROM quality_issues WHERE content_id = ?', (content_id,))
+                # Find content to delete
+                cursor.execute('''
+                SELECT id, file_path FROM content 
+                WHERE quality_score < ? 
+                OR (processing_time < datetime('now', '-{} days') AND quality_score < 5.0)
+                '''.format(days_old), (quality_threshold,))
+            
+                to_delete = cursor.fetchall()
+            
+                deleted_count = 0
+                for content_id, file_path in to_delete:
+                    # Delete from database
+                    cursor.execute('DELETE FROM content WHERE id = ?', (content_id,))
+                    cursor.execute('DELETE FROM keywords WHERE content_id = ?', (content_id,))
+                    cursor.execute('DELETE FROM entities WHERE content_id = ?', (content_id,))
+                    cursor.execute('DELETE FROM relationships WHERE content_id = ?', (content_id,))
+                    cursor.execute('DELETE FROM topics WHERE content_id = ?', (content_id,))
+                    cursor.execute('DELETE FROM quality_issues WHERE content_id = ?', (content_id,))
                 
-                # Delete content file
-                if file_path and os.path.exists(file_path):
-                    os.remove(file_path)
+                    # Delete content file
+                    if file_path and os.path.exists(file_path):
+                        os.remove(file_path)
                 
-                deleted_count += 1
+                    deleted_count += 1
             
-            conn.commit()
-            conn.close()
+                conn.commit()
             
             logger.info(f"Cleaned up {deleted_count} content items")
             return deleted_count
@@ -630,22 +676,21 @@ class StorageManager:
     async def get_stats(self, user_id: str = None) -> Dict[str, Any]:
         """Get storage statistics"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self._connection() as conn:
+                cursor = conn.cursor()
             
-            # Get total content count
-            cursor.execute("SELECT COUNT(*) FROM content")
-            total_content = cursor.fetchone()[0]
+                # Get total content count
+                cursor.execute("SELECT COUNT(*) FROM content")
+                total_content = cursor.fetchone()[0]
             
-            # Get content by type
-            cursor.execute("SELECT content_type, COUNT(*) FROM content GROUP BY content_type")
-            content_by_type = dict(cursor.fetchall())
+                # Get content by type
+                cursor.execute("SELECT content_type, COUNT(*) FROM content GROUP BY content_type")
+                content_by_type = dict(cursor.fetchall())
             
-            # Get recent content count (last 30 days)
-            cursor.execute("SELECT COUNT(*) FROM content WHERE created_time > datetime('now', '-30 days')")
-            recent_content = cursor.fetchone()[0]
+                # Get recent content count (last 30 days)
+                cursor.execute("SELECT COUNT(*) FROM content WHERE created_time > datetime('now', '-30 days')")
+                recent_content = cursor.fetchone()[0]
             
-            conn.close()
             
             return {
                 'total_content': total_content,
@@ -668,13 +713,12 @@ class StorageManager:
     async def list_collections(self, user_id: str = None) -> List[str]:
         """List available collections/content types"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            with self._connection() as conn:
+                cursor = conn.cursor()
             
-            cursor.execute("SELECT DISTINCT content_type FROM content WHERE content_type IS NOT NULL")
-            collections = [row[0] for row in cursor.fetchall()]
+                cursor.execute("SELECT DISTINCT content_type FROM content WHERE content_type IS NOT NULL")
+                collections = [row[0] for row in cursor.fetchall()]
             
-            conn.close()
             return collections
             
         except Exception as e:
@@ -685,11 +729,10 @@ class StorageManager:
         """Check if the storage system is healthy"""
         try:
             # Test database connection
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM content LIMIT 1")
-            cursor.fetchone()
-            conn.close()
+            with self._connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT COUNT(*) FROM content LIMIT 1")
+                cursor.fetchone()
             
             # Check if storage directories exist
             return (
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -7,18 +7,38 @@ import uvicorn
 import os
 import sys
 import asyncio
+import itertools
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Deque, Dict, List, Optional, Any
+from collections import deque
 from contextlib import asynccontextmanager
 from pydantic import BaseModel, Field
 
+try:
+    from brotli_asgi import BrotliMiddleware
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
 # Add the project root to Python path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from app.api.routes import memory, context, agent, websockets, constellation, ingestion, voice, ecosystem
+from app.api.services.http_client import close_http_session
+from app.core.memory import close_async_client as close_openai_client, warmup as warmup_memory
+
+# Message/task/query identifiers: per-process prefix + monotonic counter
+_id_counter = itertools.count()
+_proc_prefix = f"{os.getpid():x}{int(time.time()):x}"
+
+def next_id(kind: str) -> str:
+    """Return a process-unique identifier such as ``msg_<prefix>_<n>``"""
+    return f"{kind}_{_proc_prefix}_{next(_id_counter):x}"
 
 # Enhanced ecosystem models
 class EcosystemMessage(BaseModel):
@@ -27,7 +47,7 @@ class EcosystemMessage(BaseModel):
     message_type: str
     data: Dict[str, Any]
     timestamp: datetime = Field(default_factory=datetime.now)
-    message_id: str = Field(default_factory=lambda: f"msg_{datetime.now().timestamp()}")
+    message_id: str = Field(default_factory=lambda: next_id("msg"))
 
 class AgentStatus(BaseModel):
     agent_id: str
@@ -50,11 +70,23 @@ class EnhancedHealthResponse(BaseModel):
     ecosystem_status: Dict[str, Any] = Field(default_factory=dict)
 
 # Ecosystem client setup
+SUBMIT_BATCH_SIZE = 64
+
+# Known agents are validated once at import, not on every discovery cycle
+BLACKBIRD_AGENT = AgentStatus(
+    agent_id="blackbird",
+    capabilities=("task_automation", "web_browsing", "file_operations"),
+    metadata={"version": "1.0.0", "location": "Blackbird/"}
+)
+
 class EcosystemClient:
     def __init__(self, agent_id: str = "cogos"):
         self.agent_id = agent_id
         self.connected_agents: Dict[str, AgentStatus] = {}
         self.message_queue: List[EcosystemMessage] = []
+        self.has_messages = asyncio.Event()
+        self._outbox: Deque[EcosystemMessage] = deque()
+        self._outbox_ready = asyncio.Event()
         self.is_connected = False
         self.last_sync = None
         self.capabilities = [
@@ -88,24 +120,40 @@ class EcosystemClient:
     async def discover_agents(self):
         """Discover other agents in ecosystem"""
         # Simulate discovering Blackbird agent
-        blackbird_agent = AgentStatus(
-            agent_id="blackbird",
-            capabilities=["task_automation", "web_browsing", "file_operations"],
-            metadata={"version": "1.0.0", "location": "Blackbird/"}
-        )
-        self.connected_agents["blackbird"] = blackbird_agent
+        self.connected_agents.setdefault("blackbird", BLACKBIRD_AGENT)
         logger.info(f"🔍 Discovered agents: {list(self.connected_agents.keys())}")
     
-    async def send_message(self, message: EcosystemMessage):
-        """Send message to another agent"""
-        self.message_queue.append(message)
-        logger.info(f"📤 Message sent to {message.recipient}: {message.message_type}")
+    def submit(self, message: EcosystemMessage):
+        """Queue a message for the submitter task without awaiting delivery"""
+        self._outbox.append(message)
+        self._outbox_ready.set()
     
-    async def broadcast_message(self, message: EcosystemMessage):
+    def broadcast_message(self, message: EcosystemMessage):
         """Broadcast message to all agents"""
         for agent_id in self.connected_agents:
-            message.recipient = agent_id
-            await self.send_message(message)
+            self.submit(message.model_copy(update={"recipient": agent_id}))
+    
+    async def run_submitter(self):
+        """Drain the outbox in batches, one wakeup per burst of submitted messages"""
+        while True:
+            await self._outbox_ready.wait()
+            self._outbox_ready.clear()
+            
+            while self._outbox:
+                batch = [self._outbox.popleft() for _ in range(min(len(self._outbox), SUBMIT_BATCH_SIZE))]
+                results = await asyncio.gather(
+                    *(self._deliver(message) for message in batch),
+                    return_exceptions=True
+                )
+                for message, result in zip(batch, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"❌ Failed to send message to {message.recipient}: {result}")
+    
+    async def _deliver(self, message: EcosystemMessage):
+        """Send message to another agent"""
+        self.message_queue.append(message)
+        self.has_messages.set()
+        logger.info(f"📤 Message sent to {message.recipient}: {message.message_type}")
     
     async def receive_messages(self) -> List[EcosystemMessage]:
         """Receive pending messages"""
@@ -119,11 +167,18 @@ class EcosystemClient:
     
     @property
     def message_queue_size(self) -> int:
-        return len(self.message_queue)
+        return len(self.message_queue) + len(self._outbox)
 
 # Global ecosystem client
 ecosystem_client: Optional[EcosystemClient] = None
 
+def get_ecosystem(request: Request) -> EcosystemClient:
+    """Inject the ecosystem client created during lifespan startup"""
+    client = getattr(request.app.state, "ecosystem_client", None)
+    if client is None:
+        raise HTTPException(status_code=503, detail="Ecosystem client not initialized")
+    return client
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -139,6 +194,10 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Starting Enhanced CogOS API with Ecosystem Integration...")
     
     try:
+        # Dedicated pool for blocking calls (knowledge base search, ...)
+        executor = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4))
+        asyncio.get_running_loop().set_default_executor(executor)
+        
         # Initialize ecosystem client
         ecosystem_client = EcosystemClient(agent_id="cogos")
         
@@ -148,12 +207,28 @@ async def lifespan(app: FastAPI):
         await ecosystem_client.discover_agents()
         
         # Start background tasks
-        asyncio.create_task(ecosystem_heartbeat())
-        asyncio.create_task(process_ecosystem_messages())
+        asyncio.create_task(ecosystem_client.run_submitter())
+        asyncio.create_task(ecosystem_pump())
         
         app.state.ecosystem_client = ecosystem_client
         app.state.startup_time = datetime.now()
         
+        # Ingestion coordinator, built once with a warm storage connection pool
+        try:
+            app.state.ingestion_coordinator = await asyncio.to_thread(ingestion.create_ingestion_coordinator)
+            await app.state.ingestion_coordinator.startup()
+            logger.info("✅ Ingestion coordinator ready")
+        except Exception as e:
+            app.state.ingestion_coordinator = None
+            logger.warning(f"⚠️ Ingestion coordinator unavailable: {e}")
+        
+        # Load the embedding model and open the Chroma collection before the first memory request
+        try:
+            await asyncio.to_thread(warmup_memory)
+            logger.info("✅ Memory warmed up")
+        except Exception as e:
+            logger.warning(f"⚠️ Memory warmup failed: {e}")
+        
         logger.info("✅ Enhanced CogOS API startup completed successfully")
         
     except Exception as e:
@@ -173,26 +248,43 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error(f"❌ Error during ecosystem disconnect: {e}")
     
+    if app.state.ingestion_coordinator:
+        await app.state.ingestion_coordinator.shutdown()
+    
+    await close_http_session()
+    await close_openai_client()
+    
+    executor.shutdown(wait=False)
+    
     logger.info("👋 Enhanced CogOS API shutdown completed")
 
 # Background tasks
-async def ecosystem_heartbeat():
-    """Send periodic heartbeat to ecosystem"""
+HEARTBEAT_INTERVAL = 30  # seconds
+
+async def ecosystem_pump():
+    """Send periodic heartbeats and process incoming ecosystem messages in a single task"""
+    loop = asyncio.get_running_loop()
+    next_heartbeat = loop.time() + HEARTBEAT_INTERVAL
+    
     while True:
         try:
-            if ecosystem_client and ecosystem_client.is_connected:
-                await ecosystem_client.send_heartbeat()
-                logger.debug("💓 Ecosystem heartbeat sent")
-        except Exception as e:
-            logger.error(f"❌ Heartbeat error: {e}")
+            await asyncio.wait_for(
+                ecosystem_client.has_messages.wait(),
+                timeout=max(0.0, next_heartbeat - loop.time())
+            )
+        except asyncio.TimeoutError:
+            try:
+                if ecosystem_client.is_connected:
+                    await ecosystem_client.send_heartbeat()
+                    logger.debug("💓 Ecosystem heartbeat sent")
+            except Exception as e:
+                logger.error(f"❌ Heartbeat error: {e}")
+            next_heartbeat += HEARTBEAT_INTERVAL
+            continue
         
-        await asyncio.sleep(30)  # Heartbeat every 30 seconds
-
-async def process_ecosystem_messages():
-    """Process incoming ecosystem messages"""
-    while True:
+        ecosystem_client.has_messages.clear()
         try:
-            if ecosystem_client and ecosystem_client.is_connected:
+            if ecosystem_client.is_connected:
                 messages = await ecosystem_client.receive_messages()
                 
                 for message in messages:
@@ -200,8 +292,6 @@ async def process_ecosystem_messages():
                     
         except Exception as e:
             logger.error(f"❌ Message processing error: {e}")
-        
-        await asyncio.sleep(1)  # Check for messages every second
 
 async def handle_ecosystem_message(message: EcosystemMessage):
     """Handle incoming ecosystem messages"""
@@ -240,7 +330,7 @@ async def handle_task_request(message: EcosystemMessage):
             }
         )
         
-        await ecosystem_client.send_message(response)
+        ecosystem_client.submit(response)
         logger.info(f"✅ Task response sent to {message.sender}")
         
     except Exception as e:
@@ -253,8 +343,9 @@ async def handle_knowledge_query(message: EcosystemMessage):
         
         # Use existing knowledge base search
         try:
-            results = knowledge_base.search(query, n_results=5)
-        except:
+            results = await asyncio.to_thread(knowledge_base.search, query, n_results=5)
+        except Exception as e:
+            logger.warning(f"⚠️ Knowledge base search failed, using fallback result: {e}")
             results = [{"content": "Knowledge base search result", "relevance": 0.95}]
         
         # Send response
@@ -269,7 +360,7 @@ async def handle_knowledge_query(message: EcosystemMessage):
             }
         )
         
-        await ecosystem_client.send_message(response)
+        ecosystem_client.submit(response)
         logger.info(f"🧠 Knowledge query response sent to {message.sender}")
         
     except Exception as e:
@@ -285,15 +376,29 @@ app = FastAPI(
 )
 
 # Enhanced middleware setup
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+# Compress large JSON payloads (constellation, search, messages); brotli when installed,
+# falling back to gzip for clients that do not accept it. Level 5 keeps CPU cost low.
+COMPRESSION_MINIMUM_SIZE = 1024
+if BROTLI_AVAILABLE:
+    app.add_middleware(BrotliMiddleware, quality=4, minimum_size=COMPRESSION_MINIMUM_SIZE, gzip_fallback=True)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MINIMUM_SIZE, compresslevel=5)
 
 # Configuration CORS pour permettre les requêtes du frontend
+# Liste explicite d'origines (ALLOW_ORIGINS, séparées par des virgules) : Starlette
+# fait alors une simple recherche dans un ensemble au lieu d'un joker réécrit.
+allow_origins = [
+    origin.strip()
+    for origin in os.getenv("ALLOW_ORIGINS", "http://localhost:3000,tauri://localhost").split(",")
+    if origin.strip()
+]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Pour le développement, à restreindre en production
+    allow_origins=allow_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_headers=["authorization", "content-type"],
 )
 
 # Monter les dossiers statiques
@@ -383,28 +488,22 @@ async def add_knowledge(content: str, metadata: dict = None):
 
 # Enhanced ecosystem endpoints
 @app.get("/api/v1/ecosystem/status", response_model=EcosystemStatusResponse)
-async def get_ecosystem_status():
+async def get_ecosystem_status(client: EcosystemClient = Depends(get_ecosystem)):
     """Get detailed ecosystem status"""
-    if not ecosystem_client:
-        raise HTTPException(status_code=503, detail="Ecosystem client not initialized")
-    
     return EcosystemStatusResponse(
-        agents=ecosystem_client.connected_agents,
-        connections=list(ecosystem_client.connected_agents.keys()),
-        last_sync=ecosystem_client.last_sync,
-        message_queue_size=ecosystem_client.message_queue_size
+        agents=client.connected_agents,
+        connections=list(client.connected_agents.keys()),
+        last_sync=client.last_sync,
+        message_queue_size=client.message_queue_size
     )
 
 @app.post("/api/v1/ecosystem/broadcast")
 async def broadcast_message(
     message_type: str,
     data: Dict[str, Any],
-    background_tasks: BackgroundTasks
+    client: EcosystemClient = Depends(get_ecosystem)
 ):
     """Broadcast a message to all connected agents"""
-    if not ecosystem_client:
-        raise HTTPException(status_code=503, detail="Ecosystem client not initialized")
-    
     message = EcosystemMessage(
         sender="cogos",
         recipient="*",  # Broadcast to all
@@ -412,11 +511,11 @@ async def broadcast_message(
         data=data
     )
     
-    background_tasks.add_task(ecosystem_client.broadcast_message, message)
+    client.broadcast_message(message)
     
     return {
         "status": "message_queued", 
-        "recipients": len(ecosystem_client.connected_agents),
+        "recipients": len(client.connected_agents),
         "message_id": message.message_id
     }
 
@@ -425,13 +524,10 @@ async def send_message(
     recipient: str,
     message_type: str,
     data: Dict[str, Any],
-    background_tasks: BackgroundTasks
+    client: EcosystemClient = Depends(get_ecosystem)
 ):
     """Send a message to a specific agent"""
-    if not ecosystem_client:
-        raise HTTPException(status_code=503, detail="Ecosystem client not initialized")
-    
-    if recipient not in ecosystem_client.connected_agents:
+    if recipient not in client.connected_agents:
         raise HTTPException(status_code=404, detail=f"Agent {recipient} not found")
     
     message = EcosystemMessage(
@@ -441,7 +537,7 @@ async def send_message(
         data=data
     )
     
-    background_tasks.add_task(ecosystem_client.send_message, message)
+    client.submit(message)
     
     return {
         "status": "message_sent", 
@@ -454,16 +550,13 @@ async def request_task(
     recipient: str,
     task_type: str,
     task_data: Dict[str, Any],
-    background_tasks: BackgroundTasks
+    client: EcosystemClient = Depends(get_ecosystem)
 ):
     """Request a task from another agent"""
-    if not ecosystem_client:
-        raise HTTPException(status_code=503, detail="Ecosystem client not initialized")
-    
-    if recipient not in ecosystem_client.connected_agents:
+    if recipient not in client.connected_agents:
         raise HTTPException(status_code=404, detail=f"Agent {recipient} not found")
     
-    task_id = f"task_{datetime.now().timestamp()}"
+    task_id = next_id("task")
     
     message = EcosystemMessage(
         sender="cogos",
@@ -476,7 +569,7 @@ async def request_task(
         }
     )
     
-    background_tasks.add_task(ecosystem_client.send_message, message)
+    client.submit(message)
     
     return {
         "status": "task_requested",
@@ -489,21 +582,18 @@ async def request_task(
 async def query_ecosystem_knowledge(
     query: str,
     target_agents: List[str] = None,
-    background_tasks: BackgroundTasks = None
+    client: EcosystemClient = Depends(get_ecosystem)
 ):
     """Query knowledge from ecosystem agents"""
-    if not ecosystem_client:
-        raise HTTPException(status_code=503, detail="Ecosystem client not initialized")
-    
-    query_id = f"query_{datetime.now().timestamp()}"
+    query_id = next_id("query")
     
     # If no target agents specified, broadcast to all
     if not target_agents:
-        target_agents = list(ecosystem_client.connected_agents.keys())
+        target_agents = list(client.connected_agents.keys())
     
     # Send query to each target agent
     for agent in target_agents:
-        if agent in ecosystem_client.connected_agents:
+        if agent in client.connected_agents:
             message = EcosystemMessage(
                 sender="cogos",
                 recipient=agent,
@@ -515,10 +605,7 @@ async def query_ecosystem_knowledge(
                 }
             )
             
-            if background_tasks:
-                background_tasks.add_task(ecosystem_client.send_message, message)
-            else:
-                await ecosystem_client.send_message(message)
+            client.submit(message)
     
     return {
         "status": "query_sent",
@@ -528,15 +615,12 @@ async def query_ecosystem_knowledge(
     }
 
 @app.get("/api/v1/ecosystem/agents")
-async def list_connected_agents():
+async def list_connected_agents(client: EcosystemClient = Depends(get_ecosystem)):
     """List all connected agents"""
-    if not ecosystem_client:
-        raise HTTPException(status_code=503, detail="Ecosystem client not initialized")
-    
     return {
-        "connected_agents": ecosystem_client.connected_agents,
-        "total_count": len(ecosystem_client.connected_agents),
-        "last_sync": ecosystem_client.last_sync
+        "connected_agents": client.connected_agents,
+        "total_count": len(client.connected_agents),
+        "last_sync": client.last_sync
     }
 
 # Error handlers
@@ -568,18 +652,31 @@ async def general_exception_handler(request, exc):
     )
 
 if __name__ == "__main__":
+    import importlib.util
+    HAS_UVLOOP = importlib.util.find_spec("uvloop") is not None
+    HAS_HTTPTOOLS = importlib.util.find_spec("httptools") is not None
+    
     # Enhanced startup with ecosystem integration
     logger.info("🚀 Starting Enhanced CogOS API Server with Ecosystem Integration...")
     
+    dev_mode = bool(os.getenv("DEV"))
+    
     try:
         uvicorn.run(
             "main:app",
             host="0.0.0.0",
             port=8000,
-            reload=True,
+            reload=dev_mode,
+            # reload only supports a single worker. The ecosystem client (connected agents,
+            # message queue, outbox) lives in process memory, so more workers would each see
+            # different state: raise WEB_CONCURRENCY only once that state is shared.
+            workers=1 if dev_mode else int(os.getenv("WEB_CONCURRENCY", "1")),
             log_level="info",
-            access_log=True,
-            loop="asyncio"
+            access_log=dev_mode,
+            loop="uvloop" if HAS_UVLOOP else "asyncio",
+            http="httptools" if HAS_HTTPTOOLS else "h11",
+            timeout_keep_alive=30,
+            backlog=2048
         )
     except KeyboardInterrupt:
         logger.info("👋 Server stopped by user")
@@ -1,7 +1,16 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
-from typing import List, Dict, Any, Optional
-import json
-import os
+from fastapi import APIRouter, HTTPException, Query, Depends, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import List, Dict, Any, Optional, Callable, Tuple
+import asyncio
+import functools
+import hashlib
+import heapq
+import re
+import time
+import aiofiles
+import orjson
+from collections import defaultdict
+from itertools import islice
 from datetime import datetime, timedelta
 import numpy as np
 from pydantic import BaseModel
@@ -13,7 +22,78 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '../../..'))
 from ...core.memory import query_memory, add_memory_entry, get_recent_entries
 from ...core.context_loader import get_raw_context, update_context
 
-router = APIRouter(prefix="/api", tags=["constellation"])
+router = APIRouter(prefix="/api", tags=["constellation"], default_response_class=ORJSONResponse)
+
+# Knowledge sources
+MEMORY_FILE = "ingested/memory.jsonl"
+JOURNAL_DIR = "data/journal"
+CONTEXT_FILE = "memory/context_mcp.json"
+NOTES_DIR = "data/notes"
+ACTIONS_FILE = "data/agent_actions.json"
+SOURCE_PATHS = (MEMORY_FILE, JOURNAL_DIR, CONTEXT_FILE, NOTES_DIR, ACTIONS_FILE)
+
+# /stats is recomputed at most every STATS_TTL seconds while the sources are unchanged
+STATS_TTL = 30
+_stats_cache: Optional[Tuple[Tuple[int, ...], float, Dict[str, Any]]] = None
+
+# Parsed file cache: path -> (st_mtime_ns, st_size, parsed value)
+_FILE_CACHE: Dict[str, Tuple[int, int, Any]] = {}
+
+# Files above this size are parsed in a worker thread instead of on the event loop
+LARGE_FILE_BYTES = 100 * 1024
+
+async def _load_cached(path: str, parse: Callable[[str, os.stat_result, bytes], Any], stat: Optional[os.stat_result] = None) -> Any:
+    """Return parse(path, stat, data) for a file, re-reading it only when its mtime or size changed"""
+    if stat is None:
+        stat = await asyncio.to_thread(os.stat, path)
+    cached = _FILE_CACHE.get(path)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    
+    async with aiofiles.open(path, 'rb') as f:
+        data = await f.read()
+    
+    if stat.st_size > LARGE_FILE_BYTES:
+        value = await asyncio.to_thread(parse, path, stat, data)
+    else:
+        value = parse(path, stat, data)
+    _FILE_CACHE[path] = (stat.st_mtime_ns, stat.st_size, value)
+    return value
+
+def _source_mtimes() -> Tuple[int, ...]:
+    """mtime of every knowledge source (0 when missing), used as a cache key"""
+    return tuple(
+        os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+        for path in SOURCE_PATHS
+    )
+
+def _scan_text_files(directory: str) -> List[Tuple[str, os.stat_result]]:
+    """List the .txt/.md files of a directory with their stat, in a single scandir pass"""
+    files = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.name.endswith(('.txt', '.md')):
+                try:
+                    files.append((entry.path, entry.stat()))
+                except OSError:
+                    continue
+    return files
+
+async def _load_dir_cached(directory: str, parse: Callable[[str, os.stat_result, bytes], Any]) -> List[Any]:
+    """Load every .txt/.md file of a directory concurrently through the file cache"""
+    files = await asyncio.to_thread(_scan_text_files, directory)
+    values = await asyncio.gather(
+        *(_load_cached(path, parse, stat) for path, stat in files),
+        return_exceptions=True
+    )
+    
+    # Drop entries for files that disappeared from the directory
+    seen = {path for path, _ in files}
+    prefix = os.path.join(directory, '')
+    for path in [p for p in _FILE_CACHE if p.startswith(prefix) and p not in seen]:
+        del _FILE_CACHE[path]
+    
+    return [value for value in values if value and not isinstance(value, Exception)]
 
 # Pydantic models for API responses
 class KnowledgeNode(BaseModel):
@@ -41,89 +121,166 @@ class SearchRequest(BaseModel):
     limit: int = 50
     filters: Optional[Dict[str, Any]] = None
 
+# Domain keywords, already lowercased (domain, keywords)
+_DOMAIN_KEYWORDS = (
+    ('technology', ('code', 'programming', 'software', 'tech', 'development', 'ai', 'machine learning', 'computer')),
+    ('personal', ('goal', 'reflection', 'personal', 'life', 'growth', 'habit', 'diary', 'journal')),
+    ('work', ('project', 'task', 'meeting', 'work', 'professional', 'career', 'business')),
+    ('learning', ('study', 'learn', 'education', 'knowledge', 'skill', 'training', 'course')),
+    ('creative', ('art', 'design', 'creative', 'writing', 'music', 'visual', 'artistic')),
+    ('health', ('health', 'fitness', 'wellness', 'exercise', 'medical', 'physical')),
+    ('social', ('social', 'relationship', 'community', 'network', 'people', 'friend'))
+)
+
+# Single-pass keyword matcher: a lookahead alternation (longest first) reports the
+# longest keyword starting at each position; _KEYWORD_HITS expands it to every
+# keyword it starts with, so counts match one str.count() per keyword.
+_ALL_KEYWORDS = sorted({kw for _, keywords in _DOMAIN_KEYWORDS for kw in keywords}, key=len, reverse=True)
+_KEYWORD_RE = re.compile('(?=(' + '|'.join(map(re.escape, _ALL_KEYWORDS)) + '))')
+_KEYWORD_HITS = {
+    kw: tuple(
+        (domain, prefix)
+        for domain, keywords in _DOMAIN_KEYWORDS
+        for prefix in keywords
+        if kw.startswith(prefix)
+    )
+    for kw in _ALL_KEYWORDS
+}
+
+@functools.lru_cache(maxsize=16384)
+def _lower(text: str) -> str:
+    """Lowercase text once per distinct string.
+    
+    Loaded entries are served from the file cache as the same str objects, whose
+    hash CPython caches, so repeat lookups for unchanged files are O(1).
+    """
+    return text.lower()
+
+@functools.lru_cache(maxsize=4096)
+def _infer_domain_cached(content: str, tags: Tuple[str, ...]) -> str:
+    """Score content and tags against the domain keywords (memoized per content/tags pair)"""
+    domain_scores = dict.fromkeys((domain for domain, _ in _DOMAIN_KEYWORDS), 0)
+    
+    # Every keyword occurrence in content
+    for match in _KEYWORD_RE.finditer(_lower(content)):
+        for domain, _ in _KEYWORD_HITS[match.group(1)]:
+            domain_scores[domain] += 1
+    
+    # Each keyword present in a tag (higher weight)
+    for tag in tags:
+        found = {hit for match in _KEYWORD_RE.finditer(_lower(tag)) for hit in _KEYWORD_HITS[match.group(1)]}
+        for domain, _ in found:
+            domain_scores[domain] += 2
+    
+    # Return domain with highest score, or 'general' if no matches
+    if max(domain_scores.values()) == 0:
+        return 'general'
+    
+    return max(domain_scores, key=domain_scores.get)
+
+def _count_shared_tags(postings, n_nodes: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Count shared tags for every node pair appearing together in a posting list.
+    
+    Each posting list (ascending node indices) expands to its upper-triangle pairs,
+    encoded as i * n_nodes + j; np.unique then counts pairs in (i, j) order.
+    Returns (sources, targets, shared_counts) arrays.
+    """
+    keys = []
+    for node_ids in postings:
+        if len(node_ids) > 1:
+            ids = np.asarray(node_ids, dtype=np.int64)
+            a, b = np.triu_indices(len(ids), k=1)
+            keys.append(ids[a] * n_nodes + ids[b])
+    
+    if not keys:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+    
+    pair_keys, shared = np.unique(np.concatenate(keys), return_counts=True)
+    return pair_keys // n_nodes, pair_keys % n_nodes, shared
+
+_IMPORTANT_RE = re.compile('important|critical|urgent|key|major|significant', re.IGNORECASE)
+
+def _days_old(timestamp: Optional[str], now: datetime) -> float:
+    """Age of an ISO timestamp in whole days, NaN if missing or unparsable"""
+    if not timestamp:
+        return np.nan
+    try:
+        created_date = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+        return (now - created_date.replace(tzinfo=None)).days
+    except (ValueError, TypeError, AttributeError):
+        return np.nan
+
+def _stable_id(data: bytes) -> str:
+    """Content-derived id that stays the same across processes (unlike hash())"""
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+def _memory_node_id(memory: Dict[str, Any]) -> str:
+    return f"memory_{memory['id']}"
+
+def _context_node_id(context: Dict[str, Any]) -> str:
+    return f"context_{context['id']}"
+
+def _skill_node_id(skill: str) -> str:
+    return f"skill_{skill.replace(' ', '_').lower()}"
+
 class ConstellationAPI:
     def __init__(self):
-        # Use the imported functions directly instead of class instances
-        self._domain_keywords = {
-            'technology': ['code', 'programming', 'software', 'tech', 'development', 'ai', 'machine learning', 'computer'],
-            'personal': ['goal', 'reflection', 'personal', 'life', 'growth', 'habit', 'diary', 'journal'],
-            'work': ['project', 'task', 'meeting', 'work', 'professional', 'career', 'business'],
-            'learning': ['study', 'learn', 'education', 'knowledge', 'skill', 'training', 'course'],
-            'creative': ['art', 'design', 'creative', 'writing', 'music', 'visual', 'artistic'],
-            'health': ['health', 'fitness', 'wellness', 'exercise', 'medical', 'physical'],
-            'social': ['social', 'relationship', 'community', 'network', 'people', 'friend']
-        }
+        # One lock per loader so concurrent requests wait for a single re-parse
+        self._memories_lock = asyncio.Lock()
+        self._contexts_lock = asyncio.Lock()
+        self._actions_lock = asyncio.Lock()
+        
+        # Last built graph with the source lists it was built from
+        self._graph_lock = asyncio.Lock()
+        self._graph_cache: Optional[Tuple[Tuple[List[Dict], List[Dict], List[Dict]], KnowledgeGraph]] = None
+
 
     def _infer_domain(self, content: str, tags: List[str] = None) -> str:
         """Infer domain based on content and tags"""
-        content_lower = content.lower()
-        tags_lower = [tag.lower() for tag in (tags or [])]
-        
-        domain_scores = {}
-        
-        for domain, keywords in self._domain_keywords.items():
-            score = 0
-            for keyword in keywords:
-                # Check in content
-                if keyword in content_lower:
-                    score += content_lower.count(keyword)
-                
-                # Check in tags (higher weight)
-                for tag in tags_lower:
-                    if keyword in tag:
-                        score += 2
-            
-            domain_scores[domain] = score
-        
-        # Return domain with highest score, or 'general' if no matches
-        if not domain_scores or max(domain_scores.values()) == 0:
-            return 'general'
-        
-        return max(domain_scores, key=domain_scores.get)
+        return _infer_domain_cached(content, tuple(tags or ()))
 
-    def _calculate_importance(self, content: str, timestamp: str = None, tags: List[str] = None) -> float:
+    def _calculate_importance(self, content: str, timestamp: str = None, tags: List[str] = None, now: Optional[datetime] = None) -> float:
         """Calculate importance score for a piece of content"""
-        importance = 0.3  # Base importance
+        return float(self._batch_importance([content], [timestamp], [tags], now)[0])
+
+    def _batch_importance(self, contents: List[str], timestamps: List[Optional[str]], tags_list: List[Optional[List[str]]], now: Optional[datetime] = None) -> np.ndarray:
+        """Calculate importance scores for parallel lists of contents, timestamps and tags"""
+        now = now or datetime.now()
+        count = len(contents)
         
         # Factor in content length (longer might be more important)
-        content_length = len(content)
-        importance += min(content_length / 5000, 0.3)
-        
-        # Factor in recency if timestamp available
-        if timestamp:
-            try:
-                created_date = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                days_old = (datetime.now() - created_date.replace(tzinfo=None)).days
-                recency_score = max(0, (30 - days_old) / 30 * 0.3)
-                importance += recency_score
-            except:
-                pass
+        lengths = np.fromiter(map(len, contents), dtype=np.float64, count=count)
+        
+        # Factor in recency if timestamp available (NaN when missing or unparsable)
+        days_old = np.fromiter((_days_old(ts, now) for ts in timestamps), dtype=np.float64, count=count)
         
         # Factor in tags (more tags might indicate importance)
-        if tags:
-            importance += min(len(tags) * 0.05, 0.2)
+        tag_counts = np.fromiter((len(tags) if tags else 0 for tags in tags_list), dtype=np.float64, count=count)
         
         # Factor in specific keywords that indicate importance
-        important_keywords = ['important', 'critical', 'urgent', 'key', 'major', 'significant']
-        for keyword in important_keywords:
-            if keyword in content.lower():
-                importance += 0.1
-                break
+        keyword_hits = np.fromiter((_IMPORTANT_RE.search(c) is not None for c in contents), dtype=np.float64, count=count)
+        
+        importance = 0.3 + np.minimum(lengths / 5000, 0.3)  # Base importance + length
+        importance += np.where(np.isnan(days_old), 0.0, np.maximum(0, (30 - days_old) / 30 * 0.3))
+        importance += np.minimum(tag_counts * 0.05, 0.2)
+        importance += keyword_hits * 0.1
         
-        return min(importance, 1.0)
+        return np.minimum(importance, 1.0)
 
     def _extract_title(self, content: str, max_length: int = 60) -> str:
         """Extract a meaningful title from content"""
-        lines = content.strip().split('\n')
-        first_line = lines[0].strip()
+        stripped = content.strip()
+        newline = stripped.find('\n')
+        first_line = (stripped if newline < 0 else stripped[:newline]).strip()
         
         # If first line looks like a title (short and doesn't end with punctuation)
         if len(first_line) <= max_length and not first_line.endswith(('.', '!', '?')):
             return first_line
         
         # Otherwise, use first sentence or truncated content
-        sentences = content.split('.')
-        first_sentence = sentences[0].strip()
+        dot = content.find('.')
+        first_sentence = (content if dot < 0 else content[:dot]).strip()
         
         if len(first_sentence) <= max_length:
             return first_sentence
@@ -133,163 +290,227 @@ class ConstellationAPI:
     async def get_memories(self) -> List[Dict[str, Any]]:
         """Get all memory entries"""
         try:
-            memories = []
-            
-            # Load from memory.jsonl if it exists
-            memory_file = "ingested/memory.jsonl"
-            if os.path.exists(memory_file):
-                with open(memory_file, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        if line.strip():
-                            try:
-                                entry = json.loads(line)
-                                memories.append({
-                                    'id': entry.get('id', str(hash(entry.get('text', '')))),
-                                    'content': entry.get('text', entry.get('content', '')),
-                                    'timestamp': entry.get('metadata', {}).get('created_at', datetime.now().isoformat()),
-                                    'tags': entry.get('metadata', {}).get('tags', []),
-                                    'importance': entry.get('importance', 0.5),
-                                    'context': f"Source: {entry.get('metadata', {}).get('source', 'unknown')}",
-                                    'embedding': entry.get('embedding')
-                                })
-                            except json.JSONDecodeError as e:
-                                continue
-            
-            # Also check for data/journal files
-            journal_dir = "data/journal"
-            if os.path.exists(journal_dir):
-                for filename in os.listdir(journal_dir):
-                    if filename.endswith('.txt') or filename.endswith('.md'):
-                        filepath = os.path.join(journal_dir, filename)
-                        try:
-                            with open(filepath, 'r', encoding='utf-8') as f:
-                                content = f.read()
-                                if content.strip():
-                                    # Extract date from filename if possible
-                                    file_date = filename.replace('.txt', '').replace('.md', '')
-                                    memories.append({
-                                        'id': f"journal_{filename}",
-                                        'content': content,
-                                        'timestamp': file_date if file_date.replace('-', '').isdigit() else datetime.now().isoformat(),
-                                        'tags': ['journal'],
-                                        'importance': 0.6,
-                                        'context': f'Journal entry from {filename}'
-                                    })
-                        except:
-                            continue
+            async with self._memories_lock:
+                memories = []
+                
+                # Load from memory.jsonl if it exists
+                if os.path.exists(MEMORY_FILE):
+                    memories.extend(await _load_cached(MEMORY_FILE, self._parse_memory_file))
+                
+                # Also check for data/journal files
+                if os.path.exists(JOURNAL_DIR):
+                    memories.extend(await _load_dir_cached(JOURNAL_DIR, self._parse_journal_file))
             
             return memories
         except Exception as e:
             print(f"Error loading memories: {e}")
             return []
 
+    def _parse_memory_file(self, path: str, stat: os.stat_result, data: bytes) -> List[Dict[str, Any]]:
+        """Parse memory.jsonl content into memory entries"""
+        memories = []
+        now_iso = datetime.now().isoformat()
+        for line in data.split(b'\n'):
+            if line.strip():
+                try:
+                    entry = orjson.loads(line)
+                    memories.append({
+                        'id': entry['id'] if 'id' in entry else _stable_id(entry.get('text', '').encode('utf-8')),
+                        'content': entry.get('text', entry.get('content', '')),
+                        'timestamp': entry.get('metadata', {}).get('created_at', now_iso),
+                        'tags': entry.get('metadata', {}).get('tags', []),
+                        'importance': entry.get('importance', 0.5),
+                        'context': f"Source: {entry.get('metadata', {}).get('source', 'unknown')}",
+                        'embedding': entry.get('embedding')
+                    })
+                except orjson.JSONDecodeError:
+                    continue
+        return memories
+
+    def _parse_journal_file(self, path: str, stat: os.stat_result, data: bytes) -> Optional[Dict[str, Any]]:
+        """Parse a journal file into a memory entry"""
+        content = data.decode('utf-8')
+        if not content.strip():
+            return None
+        
+        # Extract date from filename if possible
+        filename = os.path.basename(path)
+        file_date = filename.replace('.txt', '').replace('.md', '')
+        return {
+            'id': f"journal_{filename}",
+            'content': content,
+            'timestamp': file_date if file_date.replace('-', '').isdigit() else datetime.now().isoformat(),
+            'tags': ['journal'],
+            'importance': 0.6,
+            'context': f'Journal entry from {filename}'
+        }
+
     async def get_contexts(self) -> List[Dict[str, Any]]:
         """Get all context entries"""
         try:
-            contexts = []
-            
-            # Load context from memory_mcp.json if it exists
-            context_file = "memory/context_mcp.json"
-            if os.path.exists(context_file):
-                with open(context_file, 'r', encoding='utf-8') as f:
-                    try:
-                        context_data = json.load(f)
-                        for section, content in context_data.items():
-                            if isinstance(content, str) and content.strip():
-                                contexts.append({
-                                    'id': f"context_{section}",
-                                    'type': 'context',
-                                    'title': section.replace('_', ' ').title(),
-                                    'content': content,
-                                    'domain': self._infer_domain(content),
-                                    'relationships': [],
-                                    'lastModified': datetime.now().isoformat()
-                                })
-                    except json.JSONDecodeError:
-                        pass
-            
-            # Load notes
-            notes_dir = "data/notes"
-            if os.path.exists(notes_dir):
-                for filename in os.listdir(notes_dir):
-                    if filename.endswith('.txt') or filename.endswith('.md'):
-                        filepath = os.path.join(notes_dir, filename)
-                        try:
-                            with open(filepath, 'r', encoding='utf-8') as f:
-                                content = f.read()
-                                if content.strip():
-                                    contexts.append({
-                                        'id': f"note_{filename}",
-                                        'type': 'note',
-                                        'title': filename.replace('.txt', '').replace('.md', ''),
-                                        'content': content,
-                                        'domain': self._infer_domain(content),
-                                        'relationships': [],
-                                        'lastModified': datetime.fromtimestamp(
-                                            os.path.getmtime(filepath)
-                                        ).isoformat()
-                                    })
-                        except:
-                            continue
+            async with self._contexts_lock:
+                contexts = []
+                
+                # Load context from memory_mcp.json if it exists
+                if os.path.exists(CONTEXT_FILE):
+                    contexts.extend(await _load_cached(CONTEXT_FILE, self._parse_context_file))
+                
+                # Load notes
+                if os.path.exists(NOTES_DIR):
+                    contexts.extend(await _load_dir_cached(NOTES_DIR, self._parse_note_file))
             
             return contexts
         except Exception as e:
             print(f"Error loading contexts: {e}")
             return []
 
+    def _parse_context_file(self, path: str, stat: os.stat_result, data: bytes) -> List[Dict[str, Any]]:
+        """Parse context_mcp.json content into context entries"""
+        contexts = []
+        try:
+            context_data = orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return contexts
+        
+        now_iso = datetime.now().isoformat()
+        for section, content in context_data.items():
+            if isinstance(content, str) and content.strip():
+                contexts.append({
+                    'id': f"context_{section}",
+                    'type': 'context',
+                    'title': section.replace('_', ' ').title(),
+                    'content': content,
+                    'domain': self._infer_domain(content),
+                    'relationships': [],
+                    'lastModified': now_iso
+                })
+        return contexts
+
+    def _parse_note_file(self, path: str, stat: os.stat_result, data: bytes) -> Optional[Dict[str, Any]]:
+        """Parse a note file into a context entry"""
+        content = data.decode('utf-8')
+        if not content.strip():
+            return None
+        
+        filename = os.path.basename(path)
+        return {
+            'id': f"note_{filename}",
+            'type': 'note',
+            'title': filename.replace('.txt', '').replace('.md', ''),
+            'content': content,
+            'domain': self._infer_domain(content),
+            'relationships': [],
+            'lastModified': datetime.fromtimestamp(stat.st_mtime).isoformat()
+        }
+
     async def get_agent_actions(self) -> List[Dict[str, Any]]:
         """Get agent action history"""
         try:
-            actions = []
-            
-            # Load from agent_actions.json if it exists
-            actions_file = "data/agent_actions.json"
-            if os.path.exists(actions_file):
-                with open(actions_file, 'r', encoding='utf-8') as f:
-                    try:
-                        actions_data = json.load(f)
-                        if isinstance(actions_data, list):
-                            actions = actions_data
-                        elif isinstance(actions_data, dict) and 'actions' in actions_data:
-                            actions = actions_data['actions']
-                    except json.JSONDecodeError:
-                        pass
+            async with self._actions_lock:
+                # Load from agent_actions.json if it exists
+                if os.path.exists(ACTIONS_FILE):
+                    return list(await _load_cached(ACTIONS_FILE, self._parse_actions_file))
             
-            # Ensure each action has required fields
-            processed_actions = []
-            for action in actions:
-                if isinstance(action, dict):
-                    processed_actions.append({
-                        'id': action.get('id', str(hash(str(action)))),
-                        'action': action.get('action', 'Unknown action'),
-                        'timestamp': action.get('timestamp', datetime.now().isoformat()),
-                        'context': action.get('context', ''),
-                        'outcome': action.get('outcome', ''),
-                        'skills_used': action.get('skills_used', action.get('skills', ['general']))
-                    })
-            
-            return processed_actions
+            return []
         except Exception as e:
             print(f"Error loading agent actions: {e}")
             return []
 
+    def _parse_actions_file(self, path: str, stat: os.stat_result, data: bytes) -> List[Dict[str, Any]]:
+        """Parse agent_actions.json content, ensuring each action has required fields"""
+        actions = []
+        try:
+            actions_data = orjson.loads(data)
+            if isinstance(actions_data, list):
+                actions = actions_data
+            elif isinstance(actions_data, dict) and 'actions' in actions_data:
+                actions = actions_data['actions']
+        except orjson.JSONDecodeError:
+            pass
+        
+        processed_actions = []
+        now_iso = datetime.now().isoformat()
+        for action in actions:
+            if isinstance(action, dict):
+                processed_actions.append({
+                    'id': action['id'] if 'id' in action else _stable_id(orjson.dumps(action, option=orjson.OPT_SORT_KEYS)),
+                    'action': action.get('action', 'Unknown action'),
+                    'timestamp': action.get('timestamp', now_iso),
+                    'context': action.get('context', ''),
+                    'outcome': action.get('outcome', ''),
+                    'skills_used': action.get('skills_used', action.get('skills', ['general']))
+                })
+        
+        return processed_actions
+
+    async def get_graph(self, memories: List[Dict], contexts: List[Dict], actions: List[Dict]) -> KnowledgeGraph:
+        """Return the knowledge graph for the loaded sources, rebuilding it only when they changed.
+        
+        Loaders hand back the same cached entry objects while their files are unchanged,
+        so an identity comparison against the previous sources detects any change.
+        The rebuild itself is CPU-bound and runs in the default executor.
+        """
+        sources = (memories, contexts, actions)
+        async with self._graph_lock:
+            if self._graph_cache and all(
+                len(old) == len(new) and all(a is b for a, b in zip(old, new))
+                for old, new in zip(self._graph_cache[0], sources)
+            ):
+                return self._graph_cache[1]
+            
+            loop = asyncio.get_running_loop()
+            graph = await loop.run_in_executor(None, self.transform_to_knowledge_graph, memories, contexts, actions)
+            self._graph_cache = (sources, graph)
+            return graph
+
     def transform_to_knowledge_graph(self, memories: List[Dict], contexts: List[Dict], actions: List[Dict]) -> KnowledgeGraph:
         """Transform raw data into knowledge graph format"""
         nodes = []
         links = []
         
-        # Transform memories to nodes
+        # Indexes for link generation, filled while nodes are appended
+        domain_index: Dict[str, List[int]] = defaultdict(list)  # domain -> node indices
+        tag_index: Dict[str, List[int]] = defaultdict(list)  # tag -> memory node indices
+        timestamped: List[int] = []  # memory node indices carrying a timestamp
+        
+        now = datetime.now()
+        
+        # Importance is only computed for memories that don't carry one
+        unscored = [m for m in memories if 'importance' not in m]
+        memory_importance = iter(self._batch_importance(
+            [m['content'] for m in unscored],
+            [m.get('timestamp') for m in unscored],
+            [m.get('tags') for m in unscored],
+            now
+        ).tolist())
+        context_importance = self._batch_importance(
+            [c['content'] for c in contexts],
+            [c.get('lastModified') for c in contexts],
+            [None] * len(contexts),
+            now
+        ).tolist()
+        
+        # Nodes and links are built from already normalised entries: model_construct skips re-validation
+        # Transform memories to nodes; journal snapshots repeat content, so title and domain are memoized
+        seen: Dict[Tuple[str, Tuple[str, ...]], Tuple[str, str]] = {}
         for memory in memories:
-            nodes.append(KnowledgeNode(
-                id=f"memory_{memory['id']}",
-                label=self._extract_title(memory['content']),
+            content = memory['content']
+            key = (content, tuple(memory.get('tags') or ()))
+            title_domain = seen.get(key)
+            if title_domain is None:
+                title_domain = seen[key] = (self._extract_title(content), _infer_domain_cached(*key))
+            index = len(nodes)
+            domain_index[title_domain[1]].append(index)
+            for tag in set(key[1]):
+                tag_index[tag].append(index)
+            if memory.get('timestamp'):
+                timestamped.append(index)
+            nodes.append(KnowledgeNode.model_construct(
+                id=_memory_node_id(memory),
+                label=title_domain[0],
                 type='memory',
-                domain=self._infer_domain(memory['content'], memory.get('tags', [])),
-                importance=memory.get('importance', self._calculate_importance(
-                    memory['content'], 
-                    memory.get('timestamp'),
-                    memory.get('tags')
-                )),
+                domain=title_domain[1],
+                importance=memory['importance'] if 'importance' in memory else next(memory_importance),
                 connections=[],
                 metadata={
                     'timestamp': memory.get('timestamp'),
@@ -300,16 +521,14 @@ class ConstellationAPI:
             ))
         
         # Transform contexts to nodes
-        for context in contexts:
-            nodes.append(KnowledgeNode(
-                id=f"context_{context['id']}",
+        for context, importance in zip(contexts, context_importance):
+            domain_index[context['domain']].append(len(nodes))
+            nodes.append(KnowledgeNode.model_construct(
+                id=_context_node_id(context),
                 label=context['title'],
                 type='concept' if context['type'] == 'note' else 'context',
                 domain=context['domain'],
-                importance=self._calculate_importance(
-                    context['content'],
-                    context.get('lastModified')
-                ),
+                importance=importance,
                 connections=context.get('relationships', []),
                 metadata={
                     'last_modified': context.get('lastModified'),
@@ -327,11 +546,13 @@ class ConstellationAPI:
                 skill_map[skill].append(action)
         
         for skill, related_actions in skill_map.items():
-            nodes.append(KnowledgeNode(
-                id=f"skill_{skill.replace(' ', '_').lower()}",
+            domain = self._infer_skill_domain(skill, related_actions)
+            domain_index[domain].append(len(nodes))
+            nodes.append(KnowledgeNode.model_construct(
+                id=_skill_node_id(skill),
                 label=skill,
                 type='skill',
-                domain=self._infer_skill_domain(skill, related_actions),
+                domain=domain,
                 importance=min(len(related_actions) / 10, 1.0),
                 connections=[],
                 metadata={
@@ -342,9 +563,9 @@ class ConstellationAPI:
             ))
         
         # Generate links based on various relationships
-        links = self._generate_links(nodes)
+        links = self._generate_links(nodes, len(memories), domain_index, tag_index, timestamped)
         
-        return KnowledgeGraph(nodes=nodes, links=links)
+        return KnowledgeGraph.model_construct(nodes=nodes, links=links)
 
     def _infer_skill_domain(self, skill: str, actions: List[Dict]) -> str:
         """Infer domain for a skill based on its usage"""
@@ -364,36 +585,39 @@ class ConstellationAPI:
         
         return 'general'
 
-    def _generate_links(self, nodes: List[KnowledgeNode]) -> List[KnowledgeLink]:
-        """Generate links between nodes based on various relationships"""
+    def _generate_links(self, nodes: List[KnowledgeNode], memory_count: int,
+                        domain_index: Dict[str, List[int]], tag_index: Dict[str, List[int]],
+                        timestamped: List[int]) -> List[KnowledgeLink]:
+        """Generate links between nodes based on various relationships.
+        
+        Memory nodes come first in `nodes`; the indexes are built by transform_to_knowledge_graph.
+        """
         links = []
         
-        # 1. Tag-based links for memory nodes
-        memory_nodes = [n for n in nodes if n.type == 'memory']
-        for i, node1 in enumerate(memory_nodes):
-            for node2 in memory_nodes[i+1:]:
-                tags1 = set(node1.metadata.get('tags', []))
-                tags2 = set(node2.metadata.get('tags', []))
-                common_tags = tags1.intersection(tags2)
-                
-                if common_tags:
-                    strength = len(common_tags) / max(len(tags1), len(tags2), 1)
-                    links.append(KnowledgeLink(
-                        source=node1.id,
-                        target=node2.id,
-                        strength=min(strength, 0.8),
-                        type='association'
-                    ))
+        # 1. Tag-based links for memory nodes, joined through the tag -> nodes inverted index
+        memory_nodes = nodes[:memory_count]
+        sources, targets, shared = _count_shared_tags(tag_index.values(), memory_count)
+        tag_counts = np.bincount(
+            np.fromiter((i for ids in tag_index.values() for i in ids), dtype=np.int64),
+            minlength=memory_count
+        ).astype(np.float64)
+        strengths = np.minimum(
+            shared / np.maximum(np.maximum(tag_counts[sources], tag_counts[targets]), 1),
+            0.8
+        )
+        
+        for i, j, strength in zip(sources.tolist(), targets.tolist(), strengths.tolist()):
+            links.append(KnowledgeLink.model_construct(
+                source=memory_nodes[i].id,
+                target=memory_nodes[j].id,
+                strength=strength,
+                type='association'
+            ))
         
         # 2. Domain-based links (weaker connections)
-        domain_groups = {}
-        for node in nodes:
-            if node.domain not in domain_groups:
-                domain_groups[node.domain] = []
-            domain_groups[node.domain].append(node)
-        
-        for domain_nodes in domain_groups.values():
-            if len(domain_nodes) > 1:
+        for indices in domain_index.values():
+            if len(indices) > 1:
+                domain_nodes = [nodes[i] for i in indices]
                 # Create sparse connections within domain
                 for i, node in enumerate(domain_nodes):
                     # Connect to a few other nodes in the same domain
@@ -401,21 +625,20 @@ class ConstellationAPI:
                     for j in range(1, connections + 1):
                         target_idx = (i + j) % len(domain_nodes)
                         if target_idx != i:
-                            links.append(KnowledgeLink(
+                            links.append(KnowledgeLink.model_construct(
                                 source=node.id,
                                 target=domain_nodes[target_idx].id,
                                 strength=0.2,
                                 type='association'
                             ))
         
-        # 3. Temporal links for recent items
-        recent_nodes = [n for n in nodes if n.metadata and n.metadata.get('timestamp')]
-        recent_nodes.sort(key=lambda n: n.metadata.get('timestamp', ''), reverse=True)
+        # 3. Temporal links for recent items; only the 13 most recent can be linked
+        recent_nodes = [nodes[i] for i in heapq.nlargest(13, timestamped, key=lambda i: nodes[i].metadata['timestamp'])]
         
         # Link recent items together
         for i in range(min(10, len(recent_nodes))):
             for j in range(i+1, min(i+4, len(recent_nodes))):
-                links.append(KnowledgeLink(
+                links.append(KnowledgeLink.model_construct(
                     source=recent_nodes[i].id,
                     target=recent_nodes[j].id,
                     strength=0.3,
@@ -427,7 +650,7 @@ class ConstellationAPI:
         for i, node1 in enumerate(important_nodes):
             for node2 in important_nodes[i+1:i+3]:  # Limit connections
                 if node1.domain == node2.domain:  # Same domain
-                    links.append(KnowledgeLink(
+                    links.append(KnowledgeLink.model_construct(
                         source=node1.id,
                         target=node2.id,
                         strength=0.4,
@@ -436,13 +659,22 @@ class ConstellationAPI:
         
         return links
 
+# Entries serialized per streamed chunk
+NDJSON_CHUNK_SIZE = 100
+
+async def _iter_ndjson(items: List[Dict[str, Any]]):
+    """Yield items as NDJSON, a chunk of lines at a time"""
+    for start in range(0, len(items), NDJSON_CHUNK_SIZE):
+        yield b"".join(orjson.dumps(item) + b"\n" for item in items[start:start + NDJSON_CHUNK_SIZE])
+
 # Initialize API instance
 constellation_api = ConstellationAPI()
 
-@router.get("/memories", response_model=List[Dict[str, Any]])
+@router.get("/memories")
 async def get_memories():
-    """Get all memory entries"""
-    return await constellation_api.get_memories()
+    """Get all memory entries, streamed as NDJSON (one entry per line)"""
+    memories = await constellation_api.get_memories()
+    return StreamingResponse(_iter_ndjson(memories), media_type="application/x-ndjson")
 
 @router.get("/contexts", response_model=List[Dict[str, Any]])
 async def get_contexts():
@@ -458,11 +690,13 @@ async def get_agent_actions():
 async def get_knowledge_graph():
     """Get complete knowledge graph"""
     try:
-        memories = await constellation_api.get_memories()
-        contexts = await constellation_api.get_contexts()
-        actions = await constellation_api.get_agent_actions()
+        memories, contexts, actions = await asyncio.gather(
+            constellation_api.get_memories(),
+            constellation_api.get_contexts(),
+            constellation_api.get_agent_actions()
+        )
         
-        return constellation_api.transform_to_knowledge_graph(memories, contexts, actions)
+        return await constellation_api.get_graph(memories, contexts, actions)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate knowledge graph: {str(e)}")
 
@@ -471,49 +705,66 @@ async def search_knowledge(request: SearchRequest):
     """Search knowledge graph"""
     try:
         # Get all data first
-        memories = await constellation_api.get_memories()
-        contexts = await constellation_api.get_contexts()
-        actions = await constellation_api.get_agent_actions()
+        memories, contexts, actions = await asyncio.gather(
+            constellation_api.get_memories(),
+            constellation_api.get_contexts(),
+            constellation_api.get_agent_actions()
+        )
         
-        # Filter based on search query
+        # Filter based on search query, stopping once each type has its share of the limit
         query_lower = request.query.lower()
+        per_type = request.limit // 3
         
-        filtered_memories = [
+        filtered_memories = islice((
             m for m in memories 
-            if query_lower in m.get('content', '').lower() or 
-               any(query_lower in tag.lower() for tag in m.get('tags', []))
-        ]
+            if query_lower in _lower(m.get('content', '')) or 
+               any(query_lower in _lower(tag) for tag in m.get('tags', []))
+        ), per_type)
         
-        filtered_contexts = [
+        filtered_contexts = islice((
             c for c in contexts
-            if query_lower in c.get('title', '').lower() or 
-               query_lower in c.get('content', '').lower()
-        ]
+            if query_lower in _lower(c.get('title', '')) or 
+               query_lower in _lower(c.get('content', ''))
+        ), per_type)
         
-        filtered_actions = [
+        filtered_actions = islice((
             a for a in actions
-            if query_lower in a.get('action', '').lower() or
-               any(query_lower in skill.lower() for skill in a.get('skills_used', []))
-        ]
-        
-        # Transform to knowledge graph
-        graph = constellation_api.transform_to_knowledge_graph(
-            filtered_memories[:request.limit//3], 
-            filtered_contexts[:request.limit//3], 
-            filtered_actions[:request.limit//3]
+            if query_lower in _lower(a.get('action', '')) or
+               any(query_lower in _lower(skill) for skill in a.get('skills_used', []))
+        ), per_type)
+        
+        # Select the matching nodes and the links between them from the full graph
+        node_ids = {_memory_node_id(m) for m in filtered_memories}
+        node_ids.update(_context_node_id(c) for c in filtered_contexts)
+        node_ids.update(
+            _skill_node_id(skill)
+            for a in filtered_actions
+            for skill in a.get('skills_used', [])
         )
         
-        return graph
+        graph = await constellation_api.get_graph(memories, contexts, actions)
+        return KnowledgeGraph.model_construct(
+            nodes=[n for n in graph.nodes if n.id in node_ids],
+            links=[l for l in graph.links if l.source in node_ids and l.target in node_ids]
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
 @router.get("/stats")
-async def get_knowledge_stats():
+async def get_knowledge_stats(response: Response):
     """Get knowledge graph statistics"""
+    global _stats_cache
+    response.headers["Cache-Control"] = f"max-age={STATS_TTL}"
     try:
-        memories = await constellation_api.get_memories()
-        contexts = await constellation_api.get_contexts()
-        actions = await constellation_api.get_agent_actions()
+        cache_key = await asyncio.to_thread(_source_mtimes)
+        if _stats_cache and _stats_cache[0] == cache_key and _stats_cache[1] > time.monotonic():
+            return _stats_cache[2]
+        
+        memories, contexts, actions = await asyncio.gather(
+            constellation_api.get_memories(),
+            constellation_api.get_contexts(),
+            constellation_api.get_agent_actions()
+        )
         
         # Calculate domain distribution
         all_content = memories + contexts
@@ -531,7 +782,7 @@ async def get_knowledge_stats():
             for skill in action.get('skills_used', []):
                 skill_counts[skill] = skill_counts.get(skill, 0) + 1
         
-        return {
+        stats = {
             'total_memories': len(memories),
             'total_contexts': len(contexts),
             'total_actions': len(actions),
@@ -539,5 +790,7 @@ async def get_knowledge_stats():
             'top_skills': dict(sorted(skill_counts.items(), key=lambda x: x[1], reverse=True)[:10]),
             'last_updated': datetime.now().isoformat()
         }
+        _stats_cache = (cache_key, time.monotonic() + STATS_TTL, stats)
+        return stats
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get stats: {str(e)}")
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, Body
 from typing import Dict, List, Any
+import asyncio
 
 from ..schemas.base import ContextData, ApiResponse
 from ...core.context_loader import get_raw_context, update_context
@@ -7,12 +8,22 @@ from ...core.context_builder import get_domain_scores
 
 router = APIRouter(prefix="/context", tags=["Context"])
 
+# Sérialise les lectures-modifications-écritures du fichier de contexte
+_context_lock = asyncio.Lock()
+
+
+async def _update_context_fields(fields: Dict[str, Any]) -> Any:
+    """Fusionne des champs dans le contexte en une seule lecture-écriture"""
+    async with _context_lock:
+        return await asyncio.to_thread(update_context, fields)
+
 
 @router.get("", response_model=ApiResponse)
 async def get_context():
     """Récupère le contexte complet"""
     try:
-        context = get_raw_context()
+        # context_loader ne relit le fichier que s'il a changé
+        context = await asyncio.to_thread(get_raw_context)
         return ApiResponse(data=context)
     except Exception as e:
         return ApiResponse(status="error", message=str(e))
@@ -32,8 +43,7 @@ async def get_domains():
 async def update_context_handler(data: ContextData):
     """Met à jour le contexte"""
     try:
-        context_dict = data.dict()
-        success = update_context(context_dict)
+        success = await _update_context_fields(data.dict())
         if success:
             return ApiResponse(message="Contexte mis à jour avec succès")
         else:
@@ -46,9 +56,7 @@ async def update_context_handler(data: ContextData):
 async def update_goals(goals: List[str] = Body(...)):
     """Met à jour uniquement les objectifs du contexte"""
     try:
-        context = get_raw_context()
-        context["goals"] = goals
-        success = update_context(context)
+        success = await _update_context_fields({"goals": goals})
         if success:
             return ApiResponse(message="Objectifs mis à jour avec succès")
         else:
@@ -61,9 +69,7 @@ async def update_goals(goals: List[str] = Body(...)):
 async def update_focus(focus: List[str] = Body(...)):
     """Met à jour uniquement les items de focus du contexte"""
     try:
-        context = get_raw_context()
-        context["focus"] = focus
-        success = update_context(context)
+        success = await _update_context_fields({"focus": focus})
         if success:
             return ApiResponse(message="Focus mis à jour avec succès")
         else:
@@ -3,7 +3,7 @@ CogOS Ecosystem Integration Router
 Manages communication with other systems in the AI ecosystem including Blackbird Agent
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from pydantic import BaseModel
@@ -13,7 +13,11 @@ import asyncio
 import json
 
 # Import CogOS core modules
-from ...core.memory import query_memory, add_memory_entry
+from ...core.memory import query_memory_async
+from ..services.task_queue import CELERY_AVAILABLE, get_task_status, record_ecosystem_messages
+
+if CELERY_AVAILABLE:
+    from ..services.task_queue import broadcast_task
 
 router = APIRouter(prefix="/ecosystem", tags=["ecosystem"])
 
@@ -111,7 +115,7 @@ async def register_agent(agent_status: AgentStatus):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/broadcast")
-async def broadcast_message(broadcast_req: BroadcastMessage, background_tasks: BackgroundTasks):
+async def broadcast_message(broadcast_req: BroadcastMessage):
     """Broadcast a message to all connected agents"""
     try:
         message = EcosystemMessage(
@@ -128,15 +132,30 @@ async def broadcast_message(broadcast_req: BroadcastMessage, background_tasks: B
         # For now, we'll just log it
         logging.info(f"Broadcasting message: {broadcast_req.message}")
         
-        # Add to background task for processing
-        background_tasks.add_task(process_broadcast_message, message)
+        # Hand off to a Celery worker when available, otherwise process in-process
+        task_id = None
+        if CELERY_AVAILABLE:
+            try:
+                # Publishing blocks (connection retries) when the broker is unreachable: keep it off the event loop
+                result = await asyncio.to_thread(broadcast_task.delay, message.model_dump(mode="json"))
+                task_id = result.id
+            except Exception as e:
+                logging.warning(f"Task queue unavailable, processing broadcast in-process: {e}")
+        if task_id is None:
+            try:
+                enqueue_broadcast(message)
+            except asyncio.QueueFull:
+                raise HTTPException(status_code=503, detail="Broadcast queue is full, retry later")
         
         return {
             "success": True,
             "message": "Broadcast queued successfully",
             "message_id": len(message_queue),
+            "task_id": task_id,
             "recipients": len(connected_agents)
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error broadcasting message: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -205,7 +224,7 @@ async def query_ecosystem_knowledge(query_req: KnowledgeQuery):
     """Query knowledge from the ecosystem"""
     try:
         # Use CogOS memory system to query knowledge
-        results = query_memory(query_req.query)
+        results = await query_memory_async(query_req.query)
         
         response_data = {
             "query": query_req.query,
@@ -251,6 +270,18 @@ async def get_messages(limit: int = 10, message_type: Optional[str] = None):
         logging.error(f"Error getting messages: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/tasks/{task_id}")
+async def get_task(task_id: str):
+    """Get the status of a queued background task"""
+    try:
+        return {
+            "success": True,
+            "task": await asyncio.to_thread(get_task_status, task_id)
+        }
+    except Exception as e:
+        logging.error(f"Error getting task status: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.delete("/agent/{agent_id}")
 async def unregister_agent(agent_id: str):
     """Unregister an agent from the ecosystem"""
@@ -272,21 +303,38 @@ async def unregister_agent(agent_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 # Background task functions
-async def process_broadcast_message(message: EcosystemMessage):
-    """Process broadcast message in background"""
-    try:
-        # In a real implementation, this would send the message to all connected agents
-        # For now, we'll just add it to memory
-        await add_memory_entry({
-            "content": f"Ecosystem broadcast: {message.content}",
-            "type": "ecosystem_communication",
-            "timestamp": message.timestamp.isoformat(),
-            "source": message.source
-        })
+
+# In-process broadcasts are recorded in memory by a single writer, in batches
+BROADCAST_QUEUE_SIZE = 10_000
+BROADCAST_BATCH_SIZE = 64
+_broadcast_queue: Optional[asyncio.Queue] = None
+_broadcast_writer: Optional[asyncio.Task] = None
+
+def enqueue_broadcast(message: EcosystemMessage):
+    """Queue a broadcast for the memory writer (raises asyncio.QueueFull when saturated)"""
+    global _broadcast_queue, _broadcast_writer
+    if _broadcast_queue is None:
+        _broadcast_queue = asyncio.Queue(maxsize=BROADCAST_QUEUE_SIZE)
+    if _broadcast_writer is None or _broadcast_writer.done():
+        _broadcast_writer = asyncio.create_task(process_broadcast_messages())
+    _broadcast_queue.put_nowait(message)
+
+async def process_broadcast_messages():
+    """Process queued broadcast messages, up to BROADCAST_BATCH_SIZE per bulk insert"""
+    while True:
+        batch = [await _broadcast_queue.get()]
+        while len(batch) < BROADCAST_BATCH_SIZE and not _broadcast_queue.empty():
+            batch.append(_broadcast_queue.get_nowait())
         
-        logging.info(f"Processed broadcast message: {message.content}")
-    except Exception as e:
-        logging.error(f"Error processing broadcast message: {e}")
+        try:
+            # In a real implementation, this would send the messages to all connected agents
+            # For now, we'll just add them to memory
+            stored = await asyncio.to_thread(
+                record_ecosystem_messages, [message.model_dump(mode="json") for message in batch]
+            )
+            logging.info(f"Processed {stored}/{len(batch)} broadcast messages")
+        except Exception as e:
+            logging.error(f"Error processing broadcast messages: {e}")
 
 async def heartbeat_check():
     """Check heartbeat of all connected agents"""
@@ -15,6 +15,7 @@ import json
 # Import CogOS core modules
 from ...core.memory import query_memory, add_memory_entry
 from ...core.config import get_settings
+from ..services.cache import cached
 
 router = APIRouter(prefix="/ecosystem", tags=["ecosystem"])
 
@@ -111,13 +112,18 @@ async def broadcast_message(message: str, target_systems: Optional[List[str]] =
         if target_systems is None:
             target_systems = ["blackbird", "agentgpt"]
         
+        # Send to every system concurrently through the shared client
+        responses = await asyncio.gather(
+            *(api_client.send_message(system, message) for system in target_systems),
+            return_exceptions=True
+        )
+        
         results = {}
-        for system in target_systems:
-            try:
-                result = await api_client.send_message(system, message)
+        for system, result in zip(target_systems, responses):
+            if isinstance(result, Exception):
+                results[system] = {"success": False, "error": str(result)}
+            else:
                 results[system] = {"success": True, "response": result}
-            except Exception as e:
-                results[system] = {"success": False, "error": str(e)}
         
         return APIResponse(
             success=True,
@@ -130,6 +136,7 @@ async def broadcast_message(message: str, target_systems: Optional[List[str]] =
         return APIResponse(success=False, error=str(e))
 
 @router.get("/knowledge/stats")
+@cached(ttl=30, key=lambda **_: "ecosystem:knowledge_stats")
 async def get_knowledge_stats():
     """Get knowledge base statistics"""
     try:
@@ -3,25 +3,40 @@ CogOS Ecosystem Integration Router
 Manages communication with other systems in the AI ecosystem including Blackbird Agent
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from typing import Dict, List, Optional, Any
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import ORJSONResponse
+from typing import Dict, List, Optional, Any, Set
 from datetime import datetime
 from pydantic import BaseModel
+from collections import defaultdict, deque
+import itertools
 import logging
+import os
+import time
 import httpx
 import asyncio
-import json
+import orjson
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
 
 # Import CogOS core modules
-from ...core.memory import query_memory, add_memory_entry
+from ...core.memory import query_memory_async, add_memory_entries
+from ..schemas.json_body import json_body, json_body_openapi
+from ..schemas.json_response import model_response
+from ..services.batch import BatchRequest, BatchResponse, execute_batch
+from ..services.cache import cached, invalidate
 
-router = APIRouter(prefix="/ecosystem", tags=["ecosystem"])
+router = APIRouter(prefix="/ecosystem", tags=["ecosystem"], default_response_class=ORJSONResponse)
 
 # Pydantic models for ecosystem communication
 class EcosystemMessage(BaseModel):
     type: str
     content: str
-    timestamp: datetime
+    timestamp: int  # epoch ms
     source: Optional[str] = None
     target: Optional[str] = None
 
@@ -59,16 +74,148 @@ class SendMessageRequest(BaseModel):
     type: str = "direct"
     metadata: Dict[str, Any] = {}
 
-# In-memory storage for connected agents (in production, use Redis or database)
+# Shared state lives in Redis when REDIS_URL is set, so every uvicorn worker sees the
+# same agents and messages; otherwise it falls back to per-process memory.
+REDIS_URL = os.getenv("REDIS_URL")
+MESSAGE_STREAM = "ecosystem:messages"  # plus one "ecosystem:messages:{type}" stream per type
+AGENTS_KEY = "ecosystem:agents"
+HEARTBEAT_LOCK = "ecosystem:heartbeat"
+MAX_MESSAGES = 10000
+STATUS_CACHE_KEY = "ecosystem:status"
+MESSAGE_CHANNEL = "ecosystem:live"  # pub/sub, plus one "ecosystem:live:{type}" channel per type
+SUBSCRIBER_QUEUE_SIZE = 100
+ALL_MESSAGES = "*"
+
 connected_agents: Dict[str, AgentStatus] = {}
-message_queue: List[EcosystemMessage] = []
+# In-memory log indexed by type (plus ALL_MESSAGES), so filtered reads only touch matching messages
+message_index: Dict[str, deque] = defaultdict(lambda: deque(maxlen=MAX_MESSAGES))
+_message_ids = itertools.count(1)
+# In-memory pub/sub: channel -> queues of the connected /messages/stream clients
+_subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+_redis = None
+
+# Coarse wall clock: message timestamps only need ~100 ms precision
+CLOCK_TICK_SECONDS = 0.1
+_now_ms = [time.time_ns() // 1_000_000]
+_clock_task: Optional[asyncio.Task] = None
+
+async def _tick():
+    while True:
+        _now_ms[0] = time.time_ns() // 1_000_000
+        await asyncio.sleep(CLOCK_TICK_SECONDS)
+
+def now_ms() -> int:
+    """Current epoch time in ms, refreshed by a background task every CLOCK_TICK_SECONDS"""
+    global _clock_task
+    if _clock_task is None or _clock_task.done():
+        _now_ms[0] = time.time_ns() // 1_000_000
+        _clock_task = asyncio.get_running_loop().create_task(_tick())
+    return _now_ms[0]
+
+def get_redis():
+    """Return the shared Redis client, or None when running on in-memory state"""
+    global _redis
+    if _redis is None and REDIS_AVAILABLE and REDIS_URL:
+        _redis = aioredis.Redis.from_url(REDIS_URL, decode_responses=True)
+    return _redis
+
+async def store_message(message: EcosystemMessage):
+    """Append a message to the log and return its id"""
+    redis = get_redis()
+    payload = message.model_dump_json()
+    if redis is None:
+        message_index[message.type].append(message)
+        message_index[ALL_MESSAGES].append(message)
+        for channel in (MESSAGE_CHANNEL, f"{MESSAGE_CHANNEL}:{message.type}"):
+            for queue in _subscribers.get(channel, ()):
+                if not queue.full():  # a slow client misses messages rather than stalling publishers
+                    queue.put_nowait(payload)
+        return next(_message_ids)
+    
+    fields = {
+        "type": message.type,
+        "content": message.content,
+        "timestamp": message.timestamp,
+        "source": message.source or "",
+        "target": message.target or ""
+    }
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.xadd(MESSAGE_STREAM, fields, maxlen=MAX_MESSAGES, approximate=True)
+        pipe.xadd(f"{MESSAGE_STREAM}:{message.type}", fields, maxlen=MAX_MESSAGES, approximate=True)
+        pipe.publish(MESSAGE_CHANNEL, payload)
+        pipe.publish(f"{MESSAGE_CHANNEL}:{message.type}", payload)
+        message_id, *_ = await pipe.execute()
+    return message_id
+
+async def recent_messages(limit: int, message_type: Optional[str] = None):
+    """Return (the last `limit` messages oldest first, total message count)"""
+    redis = get_redis()
+    if redis is None:
+        log = message_index.get(message_type or ALL_MESSAGES, ())
+        messages = list(itertools.islice(reversed(log), max(limit, 0)))
+        messages.reverse()
+        return messages, len(message_index[ALL_MESSAGES])
+    
+    stream = f"{MESSAGE_STREAM}:{message_type}" if message_type else MESSAGE_STREAM
+    entries = await redis.xrevrange(stream, count=limit) if limit > 0 else []
+    messages = [
+        EcosystemMessage(
+            type=fields["type"],
+            content=fields["content"],
+            timestamp=int(fields["timestamp"]),
+            source=fields["source"] or None,
+            target=fields["target"] or None
+        )
+        for _, fields in reversed(entries)
+    ]
+    return messages, await redis.xlen(MESSAGE_STREAM)
+
+async def get_agents() -> Dict[str, AgentStatus]:
+    """Return registered agents by id"""
+    redis = get_redis()
+    if redis is None:
+        return dict(connected_agents)
+    return {
+        agent_id: AgentStatus.model_validate_json(raw)
+        for agent_id, raw in (await redis.hgetall(AGENTS_KEY)).items()
+    }
+
+async def has_agent(agent_id: str) -> bool:
+    """Check whether an agent is registered"""
+    redis = get_redis()
+    if redis is None:
+        return agent_id in connected_agents
+    return bool(await redis.hexists(AGENTS_KEY, agent_id))
+
+async def agent_count() -> int:
+    """Return the number of registered agents"""
+    redis = get_redis()
+    if redis is None:
+        return len(connected_agents)
+    return await redis.hlen(AGENTS_KEY)
+
+async def save_agent(agent: AgentStatus):
+    """Register or refresh an agent"""
+    redis = get_redis()
+    if redis is None:
+        connected_agents[agent.agent_id] = agent
+    else:
+        await redis.hset(AGENTS_KEY, agent.agent_id, agent.model_dump_json())
+
+async def remove_agents(*agent_ids: str) -> int:
+    """Remove agents, returning how many were registered"""
+    redis = get_redis()
+    if redis is None:
+        return sum(connected_agents.pop(agent_id, None) is not None for agent_id in agent_ids)
+    return await redis.hdel(AGENTS_KEY, *agent_ids) if agent_ids else 0
 
 @router.get("/status", response_model=EcosystemStatusResponse)
+@cached(ttl=10, key=lambda **_: STATUS_CACHE_KEY)
 async def get_ecosystem_status():
     """Get current ecosystem status"""
     try:
         current_time = datetime.now()
-        agents_list = list(connected_agents.values())
+        agents_list = list((await get_agents()).values())
         
         return EcosystemStatusResponse(
             status="active",
@@ -84,21 +231,23 @@ async def get_ecosystem_status():
 async def list_connected_agents():
     """List all connected agents in the ecosystem"""
     try:
+        agents = await get_agents()
         return {
             "success": True,
-            "agents": list(connected_agents.values()),
-            "count": len(connected_agents)
+            "agents": list(agents.values()),
+            "count": len(agents)
         }
     except Exception as e:
         logging.error(f"Error listing agents: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/register")
-async def register_agent(agent_status: AgentStatus):
+@router.post("/register", openapi_extra=json_body_openapi(AgentStatus))
+async def register_agent(agent_status: AgentStatus = json_body(AgentStatus)):
     """Register a new agent in the ecosystem"""
     try:
         agent_status.last_seen = datetime.now()
-        connected_agents[agent_status.agent_id] = agent_status
+        await save_agent(agent_status)
+        await invalidate(STATUS_CACHE_KEY)
         
         logging.info(f"Agent {agent_status.agent_id} registered successfully")
         return {
@@ -110,104 +259,109 @@ async def register_agent(agent_status: AgentStatus):
         logging.error(f"Error registering agent: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/broadcast")
-async def broadcast_message(broadcast_req: BroadcastMessage, background_tasks: BackgroundTasks):
+@router.post("/broadcast", openapi_extra=json_body_openapi(BroadcastMessage))
+async def broadcast_message(broadcast_req: BroadcastMessage = json_body(BroadcastMessage)):
     """Broadcast a message to all connected agents"""
     try:
         message = EcosystemMessage(
             type=broadcast_req.type,
             content=broadcast_req.message,
-            timestamp=datetime.now(),
+            timestamp=now_ms(),
             source="cogos"
         )
         
-        # Add to message queue
-        message_queue.append(message)
+        # Add to message log
+        message_id = await store_message(message)
         
         # In a real implementation, you would send this to all connected agents
         # For now, we'll just log it
         logging.info(f"Broadcasting message: {broadcast_req.message}")
         
-        # Add to background task for processing
-        background_tasks.add_task(process_broadcast_message, message)
+        # Hand over to the memory writer; shed load rather than queue without bound
+        try:
+            enqueue_memory_write(message)
+        except asyncio.QueueFull:
+            raise HTTPException(status_code=503, detail="Broadcast queue is full, retry later")
         
         return {
             "success": True,
             "message": "Broadcast queued successfully",
-            "message_id": len(message_queue),
-            "recipients": len(connected_agents)
+            "message_id": message_id,
+            "recipients": await agent_count()
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error broadcasting message: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/send")
-async def send_message(send_req: SendMessageRequest):
+@router.post("/send", openapi_extra=json_body_openapi(SendMessageRequest))
+async def send_message(send_req: SendMessageRequest = json_body(SendMessageRequest)):
     """Send a message to a specific agent"""
     try:
-        if send_req.target_agent not in connected_agents:
+        if not await has_agent(send_req.target_agent):
             raise HTTPException(status_code=404, detail=f"Agent {send_req.target_agent} not found")
         
         message = EcosystemMessage(
             type=send_req.type,
             content=send_req.message,
-            timestamp=datetime.now(),
+            timestamp=now_ms(),
             source="cogos",
             target=send_req.target_agent
         )
         
-        message_queue.append(message)
+        message_id = await store_message(message)
         
         logging.info(f"Message sent to {send_req.target_agent}: {send_req.message}")
         
         return {
             "success": True,
             "message": f"Message sent to {send_req.target_agent}",
-            "message_id": len(message_queue)
+            "message_id": message_id
         }
     except Exception as e:
         logging.error(f"Error sending message: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/task/request")
-async def request_task(task_req: TaskRequest):
+@router.post("/task/request", openapi_extra=json_body_openapi(TaskRequest))
+async def request_task(task_req: TaskRequest = json_body(TaskRequest)):
     """Request a task to be performed by another agent"""
     try:
         # Create a task message
         task_message = EcosystemMessage(
             type="task_request",
-            content=json.dumps({
+            content=orjson.dumps({
                 "task_type": task_req.task_type,
                 "description": task_req.description,
                 "parameters": task_req.parameters,
                 "priority": task_req.priority
-            }),
-            timestamp=datetime.now(),
+            }).decode(),
+            timestamp=now_ms(),
             source="cogos"
         )
         
-        message_queue.append(task_message)
+        task_id = await store_message(task_message)
         
         logging.info(f"Task request created: {task_req.task_type}")
         
         return {
             "success": True,
             "message": "Task request created",
-            "task_id": len(message_queue),
+            "task_id": task_id,
             "task": task_req
         }
     except Exception as e:
         logging.error(f"Error creating task request: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/knowledge/query")
-async def query_ecosystem_knowledge(query_req: KnowledgeQuery):
+@router.post("/knowledge/query", openapi_extra=json_body_openapi(KnowledgeQuery))
+async def query_ecosystem_knowledge(query_req: KnowledgeQuery = json_body(KnowledgeQuery)):
     """Query knowledge from the ecosystem"""
     try:
         # Use CogOS memory system to query knowledge
-        results = await query_memory(
+        results = await query_memory_async(
             query_req.query,
-            limit=query_req.max_results
+            top_k=query_req.max_results
         )
         
         response_data = {
@@ -221,7 +375,7 @@ async def query_ecosystem_knowledge(query_req: KnowledgeQuery):
             response_data["metadata"] = {
                 "source": "cogos_memory",
                 "query_time": datetime.now(),
-                "ecosystem_agents": len(connected_agents)
+                "ecosystem_agents": await agent_count()
             }
         
         return {
@@ -236,76 +390,161 @@ async def query_ecosystem_knowledge(query_req: KnowledgeQuery):
 async def get_messages(limit: int = 10, message_type: Optional[str] = None):
     """Get recent messages from the ecosystem"""
     try:
-        messages = message_queue
-        
-        if message_type:
-            messages = [msg for msg in messages if msg.type == message_type]
-        
-        # Get most recent messages
-        recent_messages = messages[-limit:] if len(messages) > limit else messages
+        # Most recent messages, read from the per-type log when filtering
+        messages, total_messages = await recent_messages(limit, message_type)
         
         return {
             "success": True,
-            "messages": recent_messages,
-            "total_messages": len(message_queue),
-            "filtered_count": len(recent_messages)
+            "messages": messages,
+            "total_messages": total_messages,
+            "filtered_count": len(messages)
         }
     except Exception as e:
         logging.error(f"Error getting messages: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def _forward_messages(websocket: WebSocket, channel: str):
+    """Push every message published on `channel` to the websocket"""
+    redis = get_redis()
+    if redis is None:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        _subscribers[channel].add(queue)
+        try:
+            while True:
+                await websocket.send_text(await queue.get())
+        finally:
+            _subscribers[channel].discard(queue)
+            if not _subscribers[channel]:
+                del _subscribers[channel]
+    
+    pubsub = redis.pubsub()
+    await pubsub.subscribe(channel)
+    try:
+        async for event in pubsub.listen():
+            if event["type"] == "message":
+                await websocket.send_text(event["data"])
+    finally:
+        await pubsub.reset()  # unsubscribes and returns the connection
+
+@router.websocket("/messages/stream")
+async def stream_messages(websocket: WebSocket, message_type: Optional[str] = None):
+    """Push new ecosystem messages to the client as they are stored (replaces polling /messages)"""
+    await websocket.accept()
+    channel = f"{MESSAGE_CHANNEL}:{message_type}" if message_type else MESSAGE_CHANNEL
+    forwarder = asyncio.create_task(_forward_messages(websocket, channel))
+    try:
+        # Clients only listen; reading detects the disconnect
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        forwarder.cancel()
+
 @router.delete("/agent/{agent_id}")
 async def unregister_agent(agent_id: str):
     """Unregister an agent from the ecosystem"""
     try:
-        if agent_id not in connected_agents:
+        if not await remove_agents(agent_id):
             raise HTTPException(status_code=404, detail=f"Agent {agent_id} not found")
-        
-        del connected_agents[agent_id]
+        await invalidate(STATUS_CACHE_KEY)
         
         logging.info(f"Agent {agent_id} unregistered")
         
         return {
             "success": True,
             "message": f"Agent {agent_id} unregistered",
-            "remaining_agents": len(connected_agents)
+            "remaining_agents": await agent_count()
         }
     except Exception as e:
         logging.error(f"Error unregistering agent: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/batch", response_model=BatchResponse, openapi_extra=json_body_openapi(BatchRequest))
+async def batch_requests(request: Request, batch: BatchRequest = json_body(BatchRequest)):
+    """Run several API calls in one round-trip.
+    
+    Each sub-request gives an `id`, a `method`, a `url` (path on this API) and an optional JSON `body`;
+    responses come back in order with the same `id`, their status code and JSON body.
+    """
+    return model_response(await execute_batch(request.app, batch))
+
 # Background task functions
-async def process_broadcast_message(message: EcosystemMessage):
-    """Process broadcast message in background"""
-    try:
-        # In a real implementation, this would send the message to all connected agents
-        # For now, we'll just add it to memory
-        await add_memory_entry({
-            "content": f"Ecosystem broadcast: {message.content}",
-            "type": "ecosystem_communication",
-            "timestamp": message.timestamp.isoformat(),
-            "source": message.source
-        })
+
+# Broadcasts are recorded in memory by a single writer, in batches
+MEMORY_QUEUE_SIZE = 10_000
+MEMORY_BATCH_SIZE = 64
+_memory_queue: Optional[asyncio.Queue] = None
+_memory_writer: Optional[asyncio.Task] = None
+
+def enqueue_memory_write(message: EcosystemMessage):
+    """Queue a broadcast for the memory writer (raises asyncio.QueueFull when saturated)"""
+    global _memory_queue, _memory_writer
+    if _memory_queue is None:
+        _memory_queue = asyncio.Queue(maxsize=MEMORY_QUEUE_SIZE)
+    if _memory_writer is None or _memory_writer.done():
+        _memory_writer = asyncio.create_task(drain_memory_queue())
+    _memory_queue.put_nowait(message)
+
+async def drain_memory_queue():
+    """Write queued broadcasts to memory, up to MEMORY_BATCH_SIZE per bulk insert"""
+    while True:
+        batch = [await _memory_queue.get()]
+        while len(batch) < MEMORY_BATCH_SIZE and not _memory_queue.empty():
+            batch.append(_memory_queue.get_nowait())
         
-        logging.info(f"Processed broadcast message: {message.content}")
-    except Exception as e:
-        logging.error(f"Error processing broadcast message: {e}")
+        try:
+            # In a real implementation, this would send the messages to all connected agents
+            # For now, we'll just add them to memory
+            stored = await asyncio.to_thread(add_memory_entries, [
+                {
+                    "content": f"Ecosystem broadcast: {message.content}",
+                    "tags": ["ecosystem_communication", message.type],
+                    "source": message.source
+                }
+                for message in batch
+            ])
+            logging.info(f"Processed {stored}/{len(batch)} broadcast messages")
+        except Exception as e:
+            logging.error(f"Error processing broadcast messages: {e}")
 
 async def heartbeat_check():
     """Check heartbeat of all connected agents"""
     try:
-        current_time = datetime.now()
-        inactive_agents = []
+        redis = get_redis()
+        lock = None
+        if redis is not None:
+            # Only one worker sweeps at a time
+            lock = redis.lock(HEARTBEAT_LOCK, timeout=60)
+            if not await lock.acquire(blocking=False):
+                return
         
-        for agent_id, agent in connected_agents.items():
-            # If agent hasn't been seen for more than 5 minutes, mark as inactive
-            if (current_time - agent.last_seen).total_seconds() > 300:
-                inactive_agents.append(agent_id)
-        
-        # Remove inactive agents
-        for agent_id in inactive_agents:
-            del connected_agents[agent_id]
-            logging.warning(f"Removed inactive agent: {agent_id}")
+        try:
+            current_time = now_ms() / 1000
+            inactive_agents = []
+            
+            if redis is None:
+                agents = connected_agents.items()
+            else:
+                agents = [
+                    (agent_id, AgentStatus.model_validate_json(raw))
+                    async for agent_id, raw in redis.hscan_iter(AGENTS_KEY)
+                ]
+            
+            for agent_id, agent in agents:
+                # If agent hasn't been seen for more than 5 minutes, mark as inactive
+                if current_time - agent.last_seen.timestamp() > 300:
+                    inactive_agents.append(agent_id)
+            
+            # Remove inactive agents
+            if inactive_agents:
+                await remove_agents(*inactive_agents)
+                await invalidate(STATUS_CACHE_KEY)
+            for agent_id in inactive_agents:
+                logging.warning(f"Removed inactive agent: {agent_id}")
+        finally:
+            if lock is not None:
+                await lock.release()
             
     except Exception as e:
         logging.error(f"Error in heartbeat check: {e}")
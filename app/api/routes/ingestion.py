@@ -2,12 +2,16 @@
 Knowledge Ingestion API Routes
 Provides endpoints for file upload, processing, and management of the ingestion pipeline
 """
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, BackgroundTasks, Request
+from fastapi.responses import JSONResponse, ORJSONResponse
 from typing import List, Optional, Dict, Any
-import json
+import anyio
+import hashlib
+import orjson
 import os
+import shutil
 import tempfile
+import uuid
 import asyncio
 import logging
 from datetime import datetime
@@ -21,21 +25,61 @@ from ..schemas.ingestion import (
     SearchRequest,
     SearchResponse
 )
+from ..schemas.json_body import json_body, json_body_openapi
+from ..schemas.json_response import model_response
+from ..services.batch import BatchRequest, BatchResponse, execute_batch
+from ..services.cache import Dedup, cached, invalidate
+from ..services.uploads import save_upload
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/ingestion", tags=["Knowledge Ingestion"])
+router = APIRouter(prefix="/ingestion", tags=["Knowledge Ingestion"], default_response_class=ORJSONResponse)
 
-# Global ingestion coordinator instance
-ingestion_coordinator = None
+def create_ingestion_coordinator() -> IngestionCoordinator:
+    """Build the ingestion coordinator (called once, from the app lifespan)"""
+    # Load default config or from environment
+    config_path = os.getenv('INGESTION_CONFIG_PATH', 'config/ingestion_config.json')
+    return IngestionCoordinator(config_path)
 
-def get_ingestion_coordinator():
-    """Get or create the global ingestion coordinator"""
-    global ingestion_coordinator
-    if ingestion_coordinator is None:
-        # Load default config or from environment
-        config_path = os.getenv('INGESTION_CONFIG_PATH', 'config/ingestion_config.json')
-        ingestion_coordinator = IngestionCoordinator(config_path)
-    return ingestion_coordinator
+def get_coordinator(request: Request) -> IngestionCoordinator:
+    """Inject the ingestion coordinator created during lifespan startup"""
+    coordinator = getattr(request.app.state, "ingestion_coordinator", None)
+    if coordinator is None:
+        raise HTTPException(status_code=503, detail="Ingestion coordinator not initialized")
+    return coordinator
+
+# Global cap on files being processed at once, sized to what the coordinator can sustain;
+# excess work waits here instead of piling onto the embedding model and the storage pool
+INGEST_CONCURRENCY = int(os.getenv("INGEST_CONCURRENCY", "8"))
+_ingest_limiter: Optional[anyio.CapacityLimiter] = None
+
+def get_ingest_limiter() -> anyio.CapacityLimiter:
+    """Return the ingestion limiter (created inside the running event loop)"""
+    global _ingest_limiter
+    if _ingest_limiter is None:
+        _ingest_limiter = anyio.CapacityLimiter(INGEST_CONCURRENCY)
+    return _ingest_limiter
+
+# Uploads are copied to disk in chunks instead of being read whole into memory
+UPLOAD_CHUNK_BYTES = 256 * 1024
+MAX_CONCURRENT_UPLOAD_WRITES = 8
+
+# Uploads are staged under one shared directory, on tmpfs when available (no disk I/O)
+STAGING_DIR = os.getenv("INGESTION_STAGING_DIR") or (
+    "/dev/shm/cogos-ingest" if os.path.isdir("/dev/shm") else os.path.join(tempfile.gettempdir(), "cogos-ingest")
+)
+
+def create_staging_dir() -> str:
+    """Create a unique directory under STAGING_DIR for one upload request"""
+    path = os.path.join(STAGING_DIR, uuid.uuid4().hex)
+    os.makedirs(path)
+    return path
+
+def remove_staging_dir(path: str):
+    """Delete a staging directory and everything left in it"""
+    if os.path.dirname(os.path.abspath(path)) != os.path.abspath(STAGING_DIR):
+        logger.warning(f"Refusing to remove {path}: not a staging directory")
+        return
+    shutil.rmtree(path, ignore_errors=True)
 
 @router.post("/upload/single", response_model=FileProcessingResponse)
 async def upload_single_file(
@@ -44,24 +88,22 @@ async def upload_single_file(
     collection_name: Optional[str] = Form(None),
     user_id: Optional[str] = Form(None),
     tags: Optional[str] = Form(None),  # JSON string of tags list
-    metadata: Optional[str] = Form(None)  # JSON string of metadata dict
+    metadata: Optional[str] = Form(None),  # JSON string of metadata dict
+    coordinator: IngestionCoordinator = Depends(get_coordinator)
 ):
     """Upload and process a single file"""
+    temp_dir = None
     try:
-        coordinator = get_ingestion_coordinator()
-        
         # Parse optional JSON fields
-        tags_list = json.loads(tags) if tags else []
-        metadata_dict = json.loads(metadata) if metadata else {}
+        tags_list = orjson.loads(tags) if tags else []
+        metadata_dict = orjson.loads(metadata) if metadata else {}
         
         # Create temporary file
-        temp_dir = tempfile.mkdtemp()
+        temp_dir = create_staging_dir()
         temp_file_path = os.path.join(temp_dir, file.filename)
         
         # Save uploaded file
-        with open(temp_file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        await save_upload(file, temp_file_path, UPLOAD_CHUNK_BYTES)
         
         # Process file in background
         job_id = f"single_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}"
@@ -77,14 +119,16 @@ async def upload_single_file(
             metadata_dict
         )
         
-        return FileProcessingResponse(
+        return model_response(FileProcessingResponse(
             job_id=job_id,
             filename=file.filename,
             status="processing",
             message="File uploaded successfully and processing started"
-        )
+        ))
         
     except Exception as e:
+        if temp_dir:
+            remove_staging_dir(temp_dir)
         logger.error(f"Error uploading file: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
@@ -95,27 +139,28 @@ async def upload_batch_files(
     collection_name: Optional[str] = Form(None),
     user_id: Optional[str] = Form(None),
     tags: Optional[str] = Form(None),
-    metadata: Optional[str] = Form(None)
+    metadata: Optional[str] = Form(None),
+    coordinator: IngestionCoordinator = Depends(get_coordinator)
 ):
     """Upload and process multiple files as a batch"""
+    temp_dir = None
     try:
-        coordinator = get_ingestion_coordinator()
-        
         # Parse optional JSON fields
-        tags_list = json.loads(tags) if tags else []
-        metadata_dict = json.loads(metadata) if metadata else {}
+        tags_list = orjson.loads(tags) if tags else []
+        metadata_dict = orjson.loads(metadata) if metadata else {}
         
         # Create temporary directory for batch
-        temp_dir = tempfile.mkdtemp()
-        file_paths = []
+        temp_dir = create_staging_dir()
         
-        # Save all uploaded files
-        for file in files:
-            temp_file_path = os.path.join(temp_dir, file.filename)
-            with open(temp_file_path, "wb") as buffer:
-                content = await file.read()
-                buffer.write(content)
-            file_paths.append(temp_file_path)
+        # Save all uploaded files, a bounded number at a time
+        file_paths = [os.path.join(temp_dir, file.filename) for file in files]
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_UPLOAD_WRITES)
+        
+        async def save(file: UploadFile, path: str):
+            async with semaphore:
+                await save_upload(file, path, UPLOAD_CHUNK_BYTES)
+        
+        await asyncio.gather(*(save(file, path) for file, path in zip(files, file_paths)))
         
         # Process batch in background
         job_id = f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{len(files)}_files"
@@ -131,15 +176,17 @@ async def upload_batch_files(
             metadata_dict
         )
         
-        return IngestionJobResponse(
+        return model_response(IngestionJobResponse(
             job_id=job_id,
             status="processing",
             total_files=len(files),
             processed_files=0,
             message="Batch upload successful, processing started"
-        )
+        ))
         
     except Exception as e:
+        if temp_dir:
+            remove_staging_dir(temp_dir)
         logger.error(f"Error uploading batch: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Batch upload failed: {str(e)}")
 
@@ -147,12 +194,11 @@ async def upload_batch_files(
 async def sync_cloud_drives(
     background_tasks: BackgroundTasks,
     config: Optional[Dict[str, Any]] = None,
-    user_id: Optional[str] = None
+    user_id: Optional[str] = None,
+    coordinator: IngestionCoordinator = Depends(get_coordinator)
 ):
     """Sync and process files from configured cloud drives"""
     try:
-        coordinator = get_ingestion_coordinator()
-        
         # Start cloud sync in background
         job_id = f"cloud_sync_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
@@ -164,22 +210,20 @@ async def sync_cloud_drives(
             user_id
         )
         
-        return IngestionJobResponse(
+        return model_response(IngestionJobResponse(
             job_id=job_id,
             status="processing",
             message="Cloud sync started"
-        )
+        ))
         
     except Exception as e:
         logger.error(f"Error starting cloud sync: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Cloud sync failed: {str(e)}")
 
 @router.get("/jobs/{job_id}")
-async def get_job_status(job_id: str):
+async def get_job_status(job_id: str, coordinator: IngestionCoordinator = Depends(get_coordinator)):
     """Get the status of an ingestion job"""
     try:
-        coordinator = get_ingestion_coordinator()
-        
         # Get job status from coordinator
         status = await coordinator.get_job_status(job_id)
         
@@ -198,12 +242,11 @@ async def get_job_status(job_id: str):
 async def list_jobs(
     user_id: Optional[str] = None,
     status: Optional[str] = None,
-    limit: int = 50
+    limit: int = 50,
+    coordinator: IngestionCoordinator = Depends(get_coordinator)
 ):
     """List ingestion jobs with optional filtering"""
     try:
-        coordinator = get_ingestion_coordinator()
-        
         jobs = await coordinator.list_jobs(
             user_id=user_id,
             status=status,
@@ -216,37 +259,40 @@ async def list_jobs(
         logger.error(f"Error listing jobs: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to list jobs: {str(e)}")
 
-@router.post("/search", response_model=SearchResponse)
-async def search_knowledge(request: SearchRequest):
+# Identical concurrent searches share one embedding + vector search
+search_dedup = Dedup()
+
+@router.post("/search", response_model=SearchResponse, openapi_extra=json_body_openapi(SearchRequest))
+async def search_knowledge(request: SearchRequest = json_body(SearchRequest), coordinator: IngestionCoordinator = Depends(get_coordinator)):
     """Search through ingested knowledge using semantic similarity"""
     try:
-        coordinator = get_ingestion_coordinator()
-        
-        results = await coordinator.search_knowledge(
+        key = hashlib.blake2b(
+            orjson.dumps(request.model_dump(), option=orjson.OPT_SORT_KEYS), digest_size=16
+        ).digest()
+        results = await search_dedup.run(key, lambda: coordinator.search_knowledge(
             query=request.query,
             collection_name=request.collection_name,
             user_id=request.user_id,
             limit=request.limit,
             min_similarity=request.min_similarity,
             filters=request.filters
-        )
+        ))
         
-        return SearchResponse(
+        return model_response(SearchResponse(
             query=request.query,
             results=results,
             total_results=len(results)
-        )
+        ))
         
     except Exception as e:
         logger.error(f"Error searching knowledge: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
 @router.get("/collections")
-async def list_collections(user_id: Optional[str] = None):
+@cached(ttl=30, key=lambda user_id=None, **_: f"ingestion:collections:{user_id}")
+async def list_collections(user_id: Optional[str] = None, coordinator: IngestionCoordinator = Depends(get_coordinator)):
     """List available knowledge collections"""
     try:
-        coordinator = get_ingestion_coordinator()
-        
         collections = await coordinator.list_collections(user_id=user_id)
         
         return {"collections": collections}
@@ -256,11 +302,9 @@ async def list_collections(user_id: Optional[str] = None):
         raise HTTPException(status_code=500, detail=f"Failed to list collections: {str(e)}")
 
 @router.delete("/collections/{collection_name}")
-async def delete_collection(collection_name: str, user_id: Optional[str] = None):
+async def delete_collection(collection_name: str, user_id: Optional[str] = None, coordinator: IngestionCoordinator = Depends(get_coordinator)):
     """Delete a knowledge collection and all its documents"""
     try:
-        coordinator = get_ingestion_coordinator()
-        
         success = await coordinator.delete_collection(
             collection_name=collection_name,
             user_id=user_id
@@ -268,6 +312,7 @@ async def delete_collection(collection_name: str, user_id: Optional[str] = None)
         
         if not success:
             raise HTTPException(status_code=404, detail="Collection not found")
+        await invalidate(f"ingestion:collections:{user_id}", f"ingestion:stats:{user_id}")
         
         return {"message": f"Collection '{collection_name}' deleted successfully"}
         
@@ -278,11 +323,10 @@ async def delete_collection(collection_name: str, user_id: Optional[str] = None)
         raise HTTPException(status_code=500, detail=f"Failed to delete collection: {str(e)}")
 
 @router.get("/stats")
-async def get_ingestion_stats(user_id: Optional[str] = None):
+@cached(ttl=10, key=lambda user_id=None, **_: f"ingestion:stats:{user_id}")
+async def get_ingestion_stats(user_id: Optional[str] = None, coordinator: IngestionCoordinator = Depends(get_coordinator)):
     """Get ingestion pipeline statistics"""
     try:
-        coordinator = get_ingestion_coordinator()
-        
         stats = await coordinator.get_stats(user_id=user_id)
         
         return stats
@@ -291,12 +335,10 @@ async def get_ingestion_stats(user_id: Optional[str] = None):
         logger.error(f"Error getting stats: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get stats: {str(e)}")
 
-@router.post("/config")
-async def update_ingestion_config(config: IngestionConfig):
+@router.post("/config", openapi_extra=json_body_openapi(IngestionConfig))
+async def update_ingestion_config(config: IngestionConfig = json_body(IngestionConfig), coordinator: IngestionCoordinator = Depends(get_coordinator)):
     """Update ingestion configuration"""
     try:
-        coordinator = get_ingestion_coordinator()
-        
         success = await coordinator.update_config(config.dict())
         
         if not success:
@@ -311,13 +353,19 @@ async def update_ingestion_config(config: IngestionConfig):
         raise HTTPException(status_code=500, detail=f"Failed to update config: {str(e)}")
 
 @router.get("/health")
-async def ingestion_health_check():
+async def ingestion_health_check(coordinator: IngestionCoordinator = Depends(get_coordinator)):
     """Check the health of the ingestion system"""
     try:
-        coordinator = get_ingestion_coordinator()
-        
         health = await coordinator.health_check()
         
+        # Front-door queue depth, for capacity planning
+        limiter = get_ingest_limiter()
+        health["ingestion_queue"] = {
+            "capacity": limiter.total_tokens,
+            "in_progress": limiter.borrowed_tokens,
+            "waiting": limiter.statistics().tasks_waiting
+        }
+        
         return health
         
     except Exception as e:
@@ -328,6 +376,15 @@ async def ingestion_health_check():
             "timestamp": datetime.now().isoformat()
         }
 
+@router.post("/batch", response_model=BatchResponse, openapi_extra=json_body_openapi(BatchRequest))
+async def batch_requests(request: Request, batch: BatchRequest = json_body(BatchRequest)):
+    """Run several API calls in one round-trip.
+    
+    Each sub-request gives an `id`, a `method`, a `url` (path on this API) and an optional JSON `body`;
+    responses come back in order with the same `id`, their status code and JSON body.
+    """
+    return model_response(await execute_batch(request.app, batch))
+
 # Background task functions
 async def process_single_file_background(
     coordinator: IngestionCoordinator,
@@ -340,23 +397,20 @@ async def process_single_file_background(
 ):
     """Background task to process a single file"""
     try:
-        await coordinator.process_single_file(
-            file_path=file_path,
-            job_id=job_id,
-            collection_name=collection_name,
-            user_id=user_id,
-            tags=tags,
-            metadata=metadata
-        )
+        async with get_ingest_limiter():
+            await coordinator.process_single_file(
+                file_path=file_path,
+                job_id=job_id,
+                collection_name=collection_name,
+                user_id=user_id,
+                tags=tags,
+                metadata=metadata
+            )
     except Exception as e:
         logger.error(f"Error processing file {file_path}: {str(e)}")
     finally:
         # Clean up temporary file
-        try:
-            os.remove(file_path)
-            os.rmdir(os.path.dirname(file_path))
-        except:
-            pass
+        remove_staging_dir(os.path.dirname(file_path))
 
 async def process_batch_files_background(
     coordinator: IngestionCoordinator,
@@ -369,27 +423,21 @@ async def process_batch_files_background(
 ):
     """Background task to process multiple files"""
     try:
-        await coordinator.process_batch_files(
-            file_paths=file_paths,
-            job_id=job_id,
-            collection_name=collection_name,
-            user_id=user_id,
-            tags=tags,
-            metadata=metadata
-        )
+        async with get_ingest_limiter():
+            await coordinator.process_batch_files(
+                file_paths=file_paths,
+                job_id=job_id,
+                collection_name=collection_name,
+                user_id=user_id,
+                tags=tags,
+                metadata=metadata
+            )
     except Exception as e:
         logger.error(f"Error processing batch: {str(e)}")
     finally:
         # Clean up temporary files
-        for file_path in file_paths:
-            try:
-                os.remove(file_path)
-            except:
-                pass
-        try:
-            os.rmdir(os.path.dirname(file_paths[0]))
-        except:
-            pass
+        if file_paths:
+            remove_staging_dir(os.path.dirname(file_paths[0]))
 
 async def sync_cloud_drives_background(
     coordinator: IngestionCoordinator,
@@ -399,6 +447,8 @@ async def sync_cloud_drives_background(
 ):
     """Background task to sync cloud drives"""
     try:
+        # Cloud transfers move data in chunks of this size unless the request overrides it
+        config = {"chunk_size_bytes": IngestionConfig.model_fields["chunk_size_bytes"].default, **config}
         await coordinator.sync_cloud_drives(
             job_id=job_id,
             config=config,
@@ -1,19 +1,29 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Request, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
-import json
+from typing import List, Optional, Dict, Any, Tuple
+import aiofiles
+import asyncio
+import hashlib
+import orjson
 import os
+from collections import Counter
 from pathlib import Path
 from datetime import datetime
 
+from ..schemas.json_body import json_body, json_body_openapi
+from ..schemas.json_response import model_response
+
 router = APIRouter(
     prefix="/api/v1/life-os",
     tags=["life-os"],
     responses={404: {"description": "Not found"}},
+    default_response_class=ORJSONResponse,
 )
 
 # Data file path
 DATA_FILE = Path(__file__).parent.parent.parent / "data" / "life_os_goals.json"
+DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
 
 # Models
 class Category(BaseModel):
@@ -35,79 +45,172 @@ class LifeOSData(BaseModel):
     categories: List[Category]
     goals: List[Goal]
 
-# Helper functions
-def load_data() -> LifeOSData:
-    if not DATA_FILE.exists():
-        return LifeOSData(categories=[], goals=[])
+class GoalIndex:
+    """Goals indexed by id, with per-status counts kept up to date on every change"""
+    
+    def __init__(self, data: LifeOSData):
+        self.categories = data.categories
+        self.by_id: Dict[str, Goal] = {goal.id: goal for goal in data.goals}
+        self.status_counts = Counter(goal.status for goal in data.goals)
+        self._encoded: Optional[Tuple[bytes, str]] = None
+    
+    def upsert(self, goal: Goal):
+        """Replace the goal with the same id, or add it"""
+        previous = self.by_id.get(goal.id)
+        if previous is not None:
+            self.status_counts[previous.status] -= 1
+        self.by_id[goal.id] = goal
+        self.status_counts[goal.status] += 1
+        self._encoded = None
+    
+    def remove(self, goal_id: str) -> bool:
+        """Delete a goal, returning False if it did not exist"""
+        goal = self.by_id.pop(goal_id, None)
+        if goal is None:
+            return False
+        self.status_counts[goal.status] -= 1
+        self._encoded = None
+        return True
+    
+    def to_data(self) -> LifeOSData:
+        return LifeOSData(categories=self.categories, goals=list(self.by_id.values()))
     
+    def encoded(self) -> Tuple[bytes, str]:
+        """JSON body and ETag of the full data, computed once per change"""
+        if self._encoded is None:
+            body = self.to_data().model_dump_json().encode()
+            self._encoded = (body, f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"')
+        return self._encoded
+
+# Parsed data, keyed by the file's mtime: re-read only when the file changes
+_cache: Optional[Tuple[int, GoalIndex]] = None
+_cache_lock = asyncio.Lock()
+
+# Cache key while the data file does not exist
+_NO_FILE = -1
+
+def _empty_index() -> GoalIndex:
+    return GoalIndex(LifeOSData(categories=[], goals=[]))
+
+def _data_mtime() -> int:
     try:
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return LifeOSData(**data)
-    except Exception as e:
-        print(f"Error loading data: {e}")
-        return LifeOSData(categories=[], goals=[])
+        return os.stat(DATA_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return _NO_FILE
 
-def save_data(data: LifeOSData):
+# Helper functions
+async def load_data() -> GoalIndex:
+    mtime = _data_mtime()
+    if _cache is not None and _cache[0] == mtime:
+        return _cache[1]
+    
+    async with _cache_lock:
+        return await _read_data()
+
+async def _read_data() -> GoalIndex:
+    """Parse the data file into the cache (caller holds _cache_lock).
+    
+    A missing or unreadable file is cached as a single empty index, so concurrent
+    writers all modify the same object and the next flush keeps every change.
+    """
+    global _cache
+    mtime = _data_mtime()
+    if _cache is not None and _cache[0] == mtime:  # refreshed while we waited for the lock
+        return _cache[1]
+    
+    index = _empty_index()
+    if mtime != _NO_FILE:
+        try:
+            async with aiofiles.open(DATA_FILE, "rb") as f:
+                raw = await f.read()
+            index = GoalIndex(LifeOSData.model_validate_json(raw))
+        except Exception as e:
+            print(f"Error loading data: {e}")
+    _cache = (mtime, index)
+    return index
+
+# Writes within FLUSH_DELAY_SECONDS of each other are coalesced into a single flush
+FLUSH_DELAY_SECONDS = 0.05
+_flush_task: Optional[asyncio.Task] = None
+_pending: Optional[GoalIndex] = None
+
+def _write_file(payload: bytes) -> int:
+    """Atomically replace the data file, returning its new mtime"""
+    tmp_file = DATA_FILE.with_suffix(".json.tmp")
+    with open(tmp_file, "wb") as f:
+        f.write(payload)
+        f.flush()
+        # The rename makes the swap atomic; only the data itself needs to reach the disk
+        getattr(os, "fdatasync", os.fsync)(f.fileno())
+    os.replace(tmp_file, DATA_FILE)
+    return os.stat(DATA_FILE).st_mtime_ns
+
+async def _flush_pending():
+    global _cache, _flush_task
+    await asyncio.sleep(FLUSH_DELAY_SECONDS)
+    _flush_task = None  # saves from now on schedule the next flush
+    index = _pending
+    async with _cache_lock:
+        try:
+            payload = orjson.dumps(index.to_data().model_dump(), option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            _cache = (await asyncio.to_thread(_write_file, payload), index)
+        except Exception:
+            # The cached index holds changes that never reached the disk: re-read the file next time
+            _cache = None
+            raise
+
+async def save_data(index: GoalIndex):
+    """Persist the goals, waiting for the (shared) flush that writes them"""
+    global _flush_task, _pending
+    _pending = index
+    if _flush_task is None:
+        _flush_task = asyncio.create_task(_flush_pending())
     try:
-        # Ensure directory exists
-        DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump(data.dict(), f, indent=2, ensure_ascii=False)
+        await asyncio.shield(_flush_task)
     except Exception as e:
         print(f"Error saving data: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to save data: {str(e)}")
 
 # Endpoints
 @router.get("/goals", response_model=LifeOSData)
-async def get_goals():
+async def get_goals(request: Request):
     """Get all goals and categories"""
-    return load_data()
+    body, etag = (await load_data()).encoded()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
-@router.post("/goals/update", response_model=Goal)
-async def update_goal(goal_update: Goal):
+@router.post("/goals/update", response_model=Goal, openapi_extra=json_body_openapi(Goal))
+async def update_goal(goal_update: Goal = json_body(Goal)):
     """Update a specific goal"""
-    data = load_data()
+    data = await load_data()
     
-    # Find and update
-    found = False
-    for i, goal in enumerate(data.goals):
-        if goal.id == goal_update.id:
-            data.goals[i] = goal_update
-            found = True
-            break
+    # Update in place, or add it (could be a new goal)
+    data.upsert(goal_update)
     
-    if not found:
-        # If not found, add it (could be a new goal)
-        data.goals.append(goal_update)
-    
-    save_data(data)
-    return goal_update
+    await save_data(data)
+    return model_response(goal_update)
 
 @router.post("/goals/delete/{goal_id}")
 async def delete_goal(goal_id: str):
     """Delete a goal"""
-    data = load_data()
-    
-    initial_len = len(data.goals)
-    data.goals = [g for g in data.goals if g.id != goal_id]
+    data = await load_data()
     
-    if len(data.goals) == initial_len:
+    if not data.remove(goal_id):
         raise HTTPException(status_code=404, detail="Goal not found")
         
-    save_data(data)
+    await save_data(data)
     return {"status": "success", "message": "Goal deleted"}
 
 @router.get("/stats")
 async def get_stats():
     """Get statistics about goals"""
-    data = load_data()
+    data = await load_data()
     
-    total_goals = len(data.goals)
-    completed = len([g for g in data.goals if g.status == "completed"])
-    in_progress = len([g for g in data.goals if g.status == "in_progress"])
-    todo = len([g for g in data.goals if g.status == "todo"])
+    total_goals = len(data.by_id)
+    completed = data.status_counts["completed"]
+    in_progress = data.status_counts["in_progress"]
+    todo = data.status_counts["todo"]
     
     return {
         "total": total_goals,
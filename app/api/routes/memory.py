@@ -1,62 +1,70 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
 from typing import List, Optional
 
-from ..schemas.base import QueryRequest, MemoryEntry, ApiResponse
-from ...core.memory import query_memory, add_memory_entry, get_recent_entries
-from ...core.reflector import reflect_on_last_entries, summarize_by_tag
+from ..schemas.base import (
+    QueryRequest, MemoryEntry, ApiResponse,
+    QueryPayload, RecentEntriesPayload, ReflectionPayload, SummaryPayload
+)
+from ..schemas.json_body import json_body, json_body_openapi
+from ..schemas.json_response import model_response
+from ...core.memory import query_memory_async, add_memory_entry, get_recent_entries
+from ...core.reflector import reflect_on_last_entries_async, summarize_by_tag
 
 router = APIRouter(prefix="/memory", tags=["Memory"])
 
 
-@router.post("/query", response_model=ApiResponse)
-async def query(req: QueryRequest):
+@router.post("/query", response_model=ApiResponse[QueryPayload], openapi_extra=json_body_openapi(QueryRequest))
+async def query(req: QueryRequest = json_body(QueryRequest)):
     """Interroge la mémoire avec une question"""
-    response = query_memory(req.question)
-    return ApiResponse(data={"response": response})
+    response = await query_memory_async(req.question)
+    return model_response(ApiResponse[QueryPayload](data=QueryPayload(response=response)))
 
 
-@router.get("/recent", response_model=ApiResponse)
+@router.get("/recent", response_model=ApiResponse[RecentEntriesPayload])
 async def get_recent(limit: int = 10):
     """Récupère les entrées récentes de la mémoire"""
     try:
         entries = get_recent_entries(limit)
-        return ApiResponse(data={"entries": entries})
+        return model_response(ApiResponse[RecentEntriesPayload](data=RecentEntriesPayload(entries=entries)))
     except Exception as e:
-        return ApiResponse(status="error", message=str(e))
+        return model_response(ApiResponse(status="error", message=str(e)))
 
 
-@router.post("/add", response_model=ApiResponse)
-async def add_entry(entry: MemoryEntry):
+@router.post("/add", response_model=ApiResponse, openapi_extra=json_body_openapi(MemoryEntry))
+async def add_entry(entry: MemoryEntry = json_body(MemoryEntry)):
     """Ajoute une nouvelle entrée dans la mémoire"""
     try:
-        success = add_memory_entry(
+        # Encodage et écriture Chroma bloquants : hors de la boucle d'événements
+        success = await asyncio.to_thread(
+            add_memory_entry,
             entry.content, 
             entry.tags, 
             entry.source
         )
         if success:
-            return ApiResponse(message="Entrée ajoutée avec succès")
+            return model_response(ApiResponse(message="Entrée ajoutée avec succès"))
         else:
-            return ApiResponse(status="error", message="Échec de l'ajout")
+            return model_response(ApiResponse(status="error", message="Échec de l'ajout"))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/reflect", response_model=ApiResponse)
+@router.get("/reflect", response_model=ApiResponse[ReflectionPayload])
 async def reflect():
     """Génère une réflexion sur les dernières entrées"""
     try:
-        reflection = reflect_on_last_entries()
-        return ApiResponse(data={"reflection": reflection})
+        reflection = await reflect_on_last_entries_async()
+        return model_response(ApiResponse[ReflectionPayload](data=ReflectionPayload(reflection=reflection)))
     except Exception as e:
-        return ApiResponse(status="error", message=str(e))
+        return model_response(ApiResponse(status="error", message=str(e)))
 
 
-@router.get("/summarize", response_model=ApiResponse)
+@router.get("/summarize", response_model=ApiResponse[SummaryPayload])
 async def summarize(tag: str = Query(..., description="Tag à résumer")):
     """Génère un résumé des entrées avec un tag spécifique"""
     try:
         summary = summarize_by_tag(tag)
-        return ApiResponse(data={"summary": summary})
+        return model_response(ApiResponse[SummaryPayload](data=SummaryPayload(summary=summary)))
     except Exception as e:
-        return ApiResponse(status="error", message=str(e)) 
\ No newline at end of file
+        return model_response(ApiResponse(status="error", message=str(e)))
\ No newline at end of file
@@ -1,13 +1,15 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, BackgroundTasks
 from fastapi.responses import FileResponse
+import functools
 import tempfile
 import os
 from typing import Optional
-import shutil
 from datetime import datetime
 from pathlib import Path
 
-from ..schemas.base import AudioTranscriptResponse, ApiResponse
+from ..schemas.base import AudioTranscriptResponse, ApiResponse, SessionPayload, SessionHistoryPayload
+from ..schemas.json_response import model_response
+from ..services.uploads import save_upload
 from ...core.voice_input import (
     listen_from_microphone, 
     start_new_session,
@@ -16,28 +18,38 @@ from ...core.voice_input import (
 
 router = APIRouter(prefix="/voice", tags=["Voice"])
 
+UPLOAD_CHUNK_BYTES = 1 << 20
 
-@router.post("/session", response_model=ApiResponse)
+
+@functools.lru_cache(maxsize=1024)
+def session_dir(session_id: str) -> Path:
+    """Dossier d'enregistrement d'une session, créé à la première utilisation seulement"""
+    path = Path("logs/voice_sessions") / session_id
+    path.mkdir(exist_ok=True, parents=True)
+    return path
+
+
+@router.post("/session", response_model=ApiResponse[SessionPayload])
 async def create_session():
     """Démarre une nouvelle session d'enregistrement vocal"""
     try:
         session_id = start_new_session()
-        return ApiResponse(data={"session_id": session_id})
+        return model_response(ApiResponse[SessionPayload](data=SessionPayload(session_id=session_id)))
     except Exception as e:
-        return ApiResponse(status="error", message=str(e))
+        return model_response(ApiResponse(status="error", message=str(e)))
 
 
-@router.get("/sessions/{session_id}/history", response_model=ApiResponse)
+@router.get("/sessions/{session_id}/history", response_model=ApiResponse[SessionHistoryPayload])
 async def session_history(session_id: str):
     """Récupère l'historique des enregistrements d'une session"""
     try:
         history = get_session_history(session_id)
-        return ApiResponse(data={"history": history})
+        return model_response(ApiResponse[SessionHistoryPayload](data=SessionHistoryPayload(history=history)))
     except Exception as e:
-        return ApiResponse(status="error", message=str(e))
+        return model_response(ApiResponse(status="error", message=str(e)))
 
 
-@router.post("/upload", response_model=ApiResponse)
+@router.post("/upload", response_model=ApiResponse[AudioTranscriptResponse])
 async def upload_audio(
     file: UploadFile = File(...),
     session_id: Optional[str] = Form(None)
@@ -46,9 +58,8 @@ async def upload_audio(
     if not session_id:
         session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
     
-    # Créer le dossier temporaire pour les enregistrements
-    voice_logs_dir = Path("logs/voice_sessions") / session_id
-    voice_logs_dir.mkdir(exist_ok=True, parents=True)
+    # Dossier des enregistrements de la session
+    voice_logs_dir = session_dir(session_id)
     
     # Sauvegarder le fichier
     timestamp = datetime.now().isoformat()
@@ -56,8 +67,7 @@ async def upload_audio(
     
     try:
         # Sauvegarder le fichier audio uploadé
-        with open(audio_file, "wb") as f:
-            shutil.copyfileobj(file.file, f)
+        await save_upload(file, audio_file, UPLOAD_CHUNK_BYTES)
             
         # TODO: Transcrire l'audio en utilisant un service comme Whisper
         # Pour l'instant, nous simulons une transcription réussie
@@ -70,7 +80,7 @@ async def upload_audio(
             timestamp=timestamp
         )
         
-        return ApiResponse(data=response.dict())
+        return model_response(ApiResponse[AudioTranscriptResponse](data=response))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     finally:
@@ -1,10 +1,13 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from typing import List, Dict
-import json
+import aiofiles
+import orjson
 import asyncio
 import base64
+import binascii
 import io
 import os
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 
@@ -18,140 +21,210 @@ except ImportError:
 
 # Pour la transcription
 from ...core.voice_input import start_new_session
+from ..services.clock import now_iso
 
 router = APIRouter(tags=["WebSockets"])
 
+# Tampons audio réutilisés d'une connexion à l'autre
+AUDIO_BUFFER_BYTES = 256 * 1024
+MAX_POOLED_BUFFERS = 16
+
+class AudioBuffer:
+    """Tampon audio à capacité conservée : vider ne libère pas la mémoire allouée"""
+
+    def __init__(self, capacity: int = AUDIO_BUFFER_BYTES):
+        self.data = bytearray(capacity)
+        self.size = 0
+
+    def append(self, chunk: bytes):
+        end = self.size + len(chunk)
+        if end > len(self.data):
+            self.data.extend(bytes(max(end, 2 * len(self.data)) - len(self.data)))
+        self.data[self.size:end] = chunk
+        self.size = end
+
+    def view(self) -> memoryview:
+        """Vue sans copie sur le contenu (à libérer avant le prochain append)"""
+        return memoryview(self.data)[:self.size]
+
+    def reset(self):
+        self.size = 0
+
+_buffer_pool: List[AudioBuffer] = []
+
+# Trame pong pré-construite : seul l'horodatage change d'un ping à l'autre
+_PONG_PREFIX = '{"type":"pong","data":{"timestamp":"'
+_PONG_SUFFIX = '"}}'
+
+@dataclass(slots=True)
+class Conn:
+    """État d'un client connecté, regroupé pour une seule recherche par opération"""
+    ws: WebSocket
+    buffer: AudioBuffer
+    session_id: str
+    session_dir: Path
+    b64_tail: bytes = b""  # base64 non aligné sur 4 caractères, en attente du chunk suivant
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
 # Gestionnaire de connexions actives
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
-        self.audio_buffers: Dict[str, List[bytes]] = {}
-        self.sessions: Dict[str, str] = {}
+        self.conns: Dict[str, Conn] = {}
 
-    async def connect(self, websocket: WebSocket, client_id: str):
+    async def connect(self, websocket: WebSocket, client_id: str) -> Conn:
         await websocket.accept()
-        self.active_connections[client_id] = websocket
-        self.audio_buffers[client_id] = []
-        self.sessions[client_id] = start_new_session()
+        session_id = start_new_session()
+        
+        # Créer le répertoire pour les enregistrements une fois par connexion
+        session_dir = Path("logs/voice_sessions") / session_id
+        session_dir.mkdir(exist_ok=True, parents=True)
         
-        # Créer le répertoire pour les enregistrements si nécessaire
-        session_id = self.sessions[client_id]
-        voice_logs_dir = Path(f"logs/voice_sessions/{session_id}")
-        voice_logs_dir.mkdir(exist_ok=True, parents=True)
+        conn = self.conns[client_id] = Conn(
+            ws=websocket,
+            buffer=_buffer_pool.pop() if _buffer_pool else AudioBuffer(),
+            session_id=session_id,
+            session_dir=session_dir
+        )
+        return conn
 
     def disconnect(self, client_id: str):
-        if client_id in self.active_connections:
-            del self.active_connections[client_id]
-        if client_id in self.audio_buffers:
-            del self.audio_buffers[client_id]
+        conn = self.conns.pop(client_id, None)
+        if conn is not None and len(_buffer_pool) < MAX_POOLED_BUFFERS:
+            conn.buffer.reset()
+            _buffer_pool.append(conn.buffer)
 
     async def send_text(self, message: str, client_id: str):
-        if client_id in self.active_connections:
-            await self.active_connections[client_id].send_text(message)
+        conn = self.conns.get(client_id)
+        if conn is not None:
+            await conn.ws.send_text(message)
 
-    def add_audio_chunk(self, client_id: str, audio_data: bytes):
-        if client_id in self.audio_buffers:
-            self.audio_buffers[client_id].append(audio_data)
+    async def add_audio_chunk(self, client_id: str, audio_data: str):
+        """Décoder un chunk base64 dès sa réception et l'ajouter au tampon du client.
+
+        Seuls les groupes complets de 4 caractères sont décodés ; le reste est gardé
+        pour le chunk suivant, le flux base64 pouvant être découpé n'importe où.
+        """
+        conn = self.conns.get(client_id)
+        if conn is None:
+            return
+        try:
+            async with conn.lock:
+                chunk = conn.b64_tail + audio_data.encode("ascii")
+                aligned = len(chunk) - len(chunk) % 4
+                conn.buffer.append(base64.b64decode(chunk[:aligned]))
+                conn.b64_tail = chunk[aligned:]
+        except (binascii.Error, ValueError) as e:
+            await conn.ws.send_text(orjson.dumps({
+                "type": "error",
+                "data": f"Chunk audio invalide: {str(e)}"
+            }).decode())
 
     async def process_audio(self, client_id: str):
         """Traiter l'audio accumulé et le transcrire"""
-        if client_id not in self.audio_buffers or not self.audio_buffers[client_id]:
+        conn = self.conns.get(client_id)
+        if conn is None or not conn.buffer.size:
             return None
 
         if not HAS_SOUNDFILE:
-            await self.send_text(json.dumps({
+            await conn.ws.send_text(orjson.dumps({
                 "type": "error",
                 "data": "Dépendances audio manquantes (soundfile, numpy)"
-            }), client_id)
+            }).decode())
             return None
 
-        # Assembler tous les chunks audio
-        audio_data = b''.join(self.audio_buffers[client_id])
-        self.audio_buffers[client_id] = []  # Vider le buffer
-        
-        if not audio_data:
-            return None
-            
-        try:
-            # Convertir les données base64 en audio
-            audio_bytes = base64.b64decode(audio_data)
-            
-            # Sauvegarder l'audio temporairement
-            session_id = self.sessions[client_id]
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            voice_file = Path(f"logs/voice_sessions/{session_id}/stream_{timestamp}.wav")
-            
-            with open(voice_file, "wb") as f:
-                f.write(audio_bytes)
-            
-            # TODO: Appeler le service de transcription (comme Whisper)
-            # Pour l'instant, simuler une transcription
-            
-            result = {
-                "text": f"Simulation de transcription pour {voice_file.name}",
-                "success": True,
-                "audio_file": str(voice_file),
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            return result
-            
-        except Exception as e:
-            await self.send_text(json.dumps({
-                "type": "error",
-                "data": f"Erreur de traitement audio: {str(e)}"
-            }), client_id)
-            return None
+        # Les chunks sont déjà décodés et contigus dans le tampon ; le verrou empêche
+        # un nouveau chunk de s'y ajouter pendant l'écriture
+        async with conn.lock:
+            try:
+                # Sauvegarder l'audio temporairement
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                voice_file = conn.session_dir / f"stream_{timestamp}.wav"
+                
+                async with aiofiles.open(voice_file, "wb") as f:
+                    with conn.buffer.view() as audio_bytes:
+                        await f.write(audio_bytes)
+                
+                # TODO: Appeler le service de transcription (comme Whisper)
+                # Pour l'instant, simuler une transcription
+                
+                result = {
+                    "text": f"Simulation de transcription pour {voice_file.name}",
+                    "success": True,
+                    "audio_file": str(voice_file),
+                    "timestamp": now_iso()
+                }
+                
+                return result
+                
+            except Exception as e:
+                await conn.ws.send_text(orjson.dumps({
+                    "type": "error",
+                    "data": f"Erreur de traitement audio: {str(e)}"
+                }).decode())
+                return None
+            finally:
+                conn.buffer.reset()  # Vider le tampon en gardant sa capacité
+                conn.b64_tail = b""
 
 # Créer le gestionnaire
 manager = ConnectionManager()
 
+# Gestionnaires des messages clients, indexés par type
+async def _handle_audio_data(websocket: WebSocket, client_id: str, message: dict):
+    """Réception données audio"""
+    await manager.add_audio_chunk(client_id, message["data"])
+
+async def _handle_process_audio(websocket: WebSocket, client_id: str, message: dict):
+    """Demande de traitement et transcription"""
+    result = await manager.process_audio(client_id)
+    if result:
+        await websocket.send_text(orjson.dumps({
+            "type": "transcription",
+            "data": result
+        }).decode())
+
+async def _handle_ping(websocket: WebSocket, client_id: str, message: dict):
+    """Simple ping pour maintenir la connexion"""
+    await websocket.send_text(_PONG_PREFIX + now_iso() + _PONG_SUFFIX)
+
+MESSAGE_HANDLERS = {
+    "audio_data": _handle_audio_data,
+    "process_audio": _handle_process_audio,
+    "ping": _handle_ping,
+}
+
 @router.websocket("/ws/audio/{client_id}")
 async def websocket_audio(websocket: WebSocket, client_id: str):
     """Point d'entrée WebSocket pour streaming audio"""
-    await manager.connect(websocket, client_id)
+    conn = await manager.connect(websocket, client_id)
     
     try:
         # Envoyer confirmation de connexion
-        await manager.send_text(json.dumps({
+        await websocket.send_text(orjson.dumps({
             "type": "connection_established",
             "data": {
                 "client_id": client_id,
-                "session_id": manager.sessions[client_id]
+                "session_id": conn.session_id
             }
-        }), client_id)
+        }).decode())
         
         while True:
-            # Attendre des données du client
-            data = await websocket.receive_text()
-            message = json.loads(data)
-            
-            if message["type"] == "audio_data":
-                # Réception données audio
-                audio_chunk = message["data"]
-                manager.add_audio_chunk(client_id, audio_chunk)
-                
-            elif message["type"] == "process_audio":
-                # Demande de traitement et transcription
-                result = await manager.process_audio(client_id)
-                if result:
-                    await manager.send_text(json.dumps({
-                        "type": "transcription",
-                        "data": result
-                    }), client_id)
-                
-            elif message["type"] == "ping":
-                # Simple ping pour maintenir la connexion
-                await manager.send_text(json.dumps({
-                    "type": "pong",
-                    "data": {"timestamp": datetime.now().isoformat()}
-                }), client_id)
+            # Attendre des données du client (trames texte : receive_bytes ne les accepte pas)
+            message = orjson.loads(await websocket.receive_text())
+            handler = MESSAGE_HANDLERS.get(message.get("type"))
+            if handler is None:
+                await websocket.send_text(orjson.dumps({
+                    "type": "error",
+                    "data": f"Type de message inconnu: {message.get('type')}"
+                }).decode())
+                continue
+            await handler(websocket, client_id, message)
                 
     except WebSocketDisconnect:
         manager.disconnect(client_id)
     except Exception as e:
-        await manager.send_text(json.dumps({
+        await manager.send_text(orjson.dumps({
             "type": "error",
             "data": f"Erreur: {str(e)}"
-        }), client_id)
-        manager.disconnect(client_id) 
\ No newline at end of file
+        }).decode(), client_id)
+        manager.disconnect(client_id)
@@ -4,9 +4,14 @@ Script de lancement du serveur API CogOS
 """
 import uvicorn
 import argparse
+import importlib.util
 from dotenv import load_dotenv
 import os
 
+# Boucle et parseur HTTP en C (uvicorn[standard]) quand ils sont installés ; uvloop n'existe pas sous Windows
+HAS_UVLOOP = importlib.util.find_spec("uvloop") is not None
+HAS_HTTPTOOLS = importlib.util.find_spec("httptools") is not None
+
 def main():
     # Charger les variables d'environnement
     load_dotenv()
@@ -28,7 +33,11 @@ def main():
         "backend.api.main:app",
         host=args.host,
         port=args.port,
-        reload=args.reload
+        reload=args.reload,
+        # --reload n'accepte qu'un seul worker
+        workers=1 if args.reload else int(os.getenv("WEB_CONCURRENCY", "1")),
+        loop="uvloop" if HAS_UVLOOP else "asyncio",
+        http="httptools" if HAS_HTTPTOOLS else "h11"
     )
 
 if __name__ == "__main__":
@@ -1,7 +1,9 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Generic, TypeVar
 from datetime import datetime
 
+from ..services.clock import now_iso
+
 
 class QueryRequest(BaseModel):
     """Requête pour interroger la mémoire"""
@@ -16,7 +18,7 @@ class AgentAction(BaseModel):
     action_type: str
     priority: int = 1
     deadline: Optional[str] = None
-    created_at: str = Field(default_factory=lambda: datetime.now().isoformat())
+    created_at: str = Field(default_factory=now_iso)
     completed: bool = False
 
 
@@ -35,20 +37,53 @@ class AudioTranscriptResponse(BaseModel):
     text: str
     success: bool
     audio_file: Optional[str] = None
-    timestamp: str = Field(default_factory=lambda: datetime.now().isoformat())
+    timestamp: str = Field(default_factory=now_iso)
 
 
 class MemoryEntry(BaseModel):
     """Entrée dans la mémoire"""
     content: str
-    timestamp: str
+    timestamp: Optional[str] = None
     tags: List[str] = []
     source: Optional[str] = None
     embedding_id: Optional[str] = None
 
 
-class ApiResponse(BaseModel):
-    """Réponse API générique"""
+class QueryPayload(BaseModel):
+    """Réponse à une question posée à la mémoire"""
+    response: str
+
+
+class RecentEntriesPayload(BaseModel):
+    """Entrées récentes de la mémoire"""
+    entries: List[Dict[str, Any]]
+
+
+class ReflectionPayload(BaseModel):
+    """Réflexion sur les dernières entrées"""
+    reflection: str
+
+
+class SummaryPayload(BaseModel):
+    """Résumé des entrées d'un tag"""
+    summary: str
+
+
+class SessionPayload(BaseModel):
+    """Session d'enregistrement vocal créée"""
+    session_id: str
+
+
+class SessionHistoryPayload(BaseModel):
+    """Historique des enregistrements d'une session"""
+    history: List[Dict[str, Any]]
+
+
+T = TypeVar("T")
+
+
+class ApiResponse(BaseModel, Generic[T]):
+    """Réponse API générique, typée par son contenu (`ApiResponse[SummaryPayload]`)"""
     status: str = "success"
-    data: Any = None
+    data: Optional[T] = None
     message: Optional[str] = None 
\ No newline at end of file
@@ -6,6 +6,12 @@ from typing import List, Optional, Dict, Any, Union
 from datetime import datetime
 from enum import Enum
 
+def _lookup_normalized(cls, value):
+    """`_missing_` for the enums below: resolve ".PDF", " Completed " etc. through the value map"""
+    if isinstance(value, str):
+        return cls._value2member_map_.get(value.strip().lstrip(".").lower())
+    return None
+
 class JobStatus(str, Enum):
     """Status of an ingestion job"""
     PENDING = "pending"
@@ -13,6 +19,8 @@ class JobStatus(str, Enum):
     COMPLETED = "completed"
     FAILED = "failed"
     CANCELLED = "cancelled"
+    
+    _missing_ = classmethod(_lookup_normalized)
 
 class FileType(str, Enum):
     """Supported file types for ingestion"""
@@ -41,12 +49,16 @@ class FileType(str, Enum):
     MOBI = "mobi"
     HTML = "html"
     XML = "xml"
+    
+    _missing_ = classmethod(_lookup_normalized)
 
 class QualityLevel(str, Enum):
     """Quality control levels"""
     BASIC = "basic"
     STANDARD = "standard"
     STRICT = "strict"
+    
+    _missing_ = classmethod(_lookup_normalized)
 
 class ChunkingStrategy(str, Enum):
     """Text chunking strategies"""
@@ -54,6 +66,8 @@ class ChunkingStrategy(str, Enum):
     SENTENCE_BASED = "sentence_based"
     SEMANTIC = "semantic"
     PARAGRAPH = "paragraph"
+    
+    _missing_ = classmethod(_lookup_normalized)
 
 class CloudProvider(str, Enum):
     """Supported cloud storage providers"""
@@ -61,6 +75,8 @@ class CloudProvider(str, Enum):
     DROPBOX = "dropbox"
     ICLOUD = "icloud"
     ONEDRIVE = "onedrive"
+    
+    _missing_ = classmethod(_lookup_normalized)
 
 class FileProcessingResponse(BaseModel):
     """Response for single file processing"""
@@ -151,6 +167,7 @@ class IngestionConfig(BaseModel):
     concurrent_jobs: int = Field(default=5, ge=1, le=20)
     storage_path: str = "/tmp/ingestion"
     enable_deduplication: bool = True
+    chunk_size_bytes: int = Field(default=1_048_576, ge=64 * 1024, le=128 * 1024 * 1024)  # Cloud transfer chunk size
 
 class CollectionInfo(BaseModel):
     """Information about a knowledge collection"""
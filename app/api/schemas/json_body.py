@@ -0,0 +1,50 @@
+"""
+Corps de requête JSON validés en une seule passe.
+
+FastAPI décode le corps avec json.loads puis valide le dict obtenu ; `json_body`
+confie directement les octets à `model_validate_json` (parseur Rust de pydantic-core),
+sans dict intermédiaire. `json_body_openapi` documente le corps dans OpenAPI.
+"""
+from typing import Any, Dict, Type, TypeVar
+
+from fastapi import Depends, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def _inline_refs(schema: Any, defs: Dict[str, Any]) -> Any:
+    """Remplace les références `#/$defs/...` par leur définition"""
+    if isinstance(schema, dict):
+        ref = schema.get("$ref", "")
+        if ref.startswith("#/$defs/"):
+            return _inline_refs(defs[ref[len("#/$defs/"):]], defs)
+        return {key: _inline_refs(value, defs) for key, value in schema.items()}
+    if isinstance(schema, list):
+        return [_inline_refs(value, defs) for value in schema]
+    return schema
+
+
+def json_body_openapi(model: Type[BaseModel]) -> Dict[str, Any]:
+    """`openapi_extra` décrivant `model` comme corps JSON de la route"""
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": _inline_refs(schema, defs)}}
+        }
+    }
+
+
+def json_body(model: Type[ModelT]) -> Any:
+    """Dépendance qui valide le corps brut de la requête avec `model.model_validate_json`"""
+    async def parse(request: Request) -> ModelT:
+        try:
+            return model.model_validate_json(await request.body())
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+            )
+    return Depends(parse)
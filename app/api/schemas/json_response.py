@@ -0,0 +1,19 @@
+"""
+Réponses JSON sérialisées en une seule passe.
+
+Quand une route déclare `response_model`, FastAPI revalide l'objet retourné puis
+l'encode via `jsonable_encoder`. `model_response` sérialise directement le modèle
+en octets avec le sérialiseur compilé de pydantic-core et renvoie une `Response`,
+que FastAPI transmet telle quelle ; `response_model` reste utile pour OpenAPI.
+"""
+from pydantic import BaseModel
+from starlette.responses import Response
+
+
+def model_response(model: BaseModel, status_code: int = 200) -> Response:
+    """Réponse JSON contenant `model`, sans revalidation ni `jsonable_encoder`"""
+    return Response(
+        content=model.model_dump_json(),
+        status_code=status_code,
+        media_type="application/json"
+    )
@@ -0,0 +1,76 @@
+"""
+CogOS JSON Batching
+Runs several API calls from a single HTTP request (Microsoft Graph style $batch)
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+import httpx
+import orjson
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_REQUESTS = 20
+MAX_CONCURRENT_BATCH_REQUESTS = 8
+
+
+class BatchSubRequest(BaseModel):
+    id: str
+    method: str = "GET"
+    url: str  # Path on this API, e.g. "/ecosystem/status?limit=5"
+    body: Optional[Any] = None
+    headers: Dict[str, str] = {}
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest] = Field(..., max_length=MAX_BATCH_REQUESTS)
+
+
+class BatchSubResponse(BaseModel):
+    id: str
+    status: int
+    body: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    responses: List[BatchSubResponse]
+
+
+async def execute_batch(app, batch: BatchRequest) -> BatchResponse:
+    """Dispatch the sub-requests to the ASGI app in-process, concurrently.
+
+    Sub-requests skip the network and HTTP framing; a semaphore bounds how many
+    run at once so a single batch cannot flood the handlers behind it.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_BATCH_REQUESTS)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://cogos") as client:
+        async def run(sub: BatchSubRequest) -> BatchSubResponse:
+            if not sub.url.startswith("/") or sub.url.split("?", 1)[0].endswith("/batch"):
+                return BatchSubResponse(id=sub.id, status=400, body={"detail": "Invalid batch sub-request url"})
+
+            async with semaphore:
+                try:
+                    response = await client.request(
+                        sub.method.upper(),
+                        sub.url,
+                        content=orjson.dumps(sub.body) if sub.body is not None else None,
+                        headers={"content-type": "application/json", **sub.headers}
+                    )
+                except Exception as e:
+                    logger.error(f"Batch sub-request {sub.id} failed: {e}")
+                    return BatchSubResponse(id=sub.id, status=500, body={"detail": str(e)})
+
+            try:
+                body = orjson.loads(response.content) if response.content else None
+            except orjson.JSONDecodeError:
+                body = response.text
+            return BatchSubResponse(id=sub.id, status=response.status_code, body=body)
+
+        responses = await asyncio.gather(*(run(sub) for sub in batch.requests))
+
+    return BatchResponse(responses=responses)
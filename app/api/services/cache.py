@@ -0,0 +1,160 @@
+"""
+CogOS Response Cache
+Cache-aside for read-heavy endpoints (Redis when configured, process memory otherwise)
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL")
+CACHE_PREFIX = "cache:"
+LOCK_TTL_MS = 10_000
+LOCK_WAIT_SECONDS = 2.0
+
+_redis = None
+_local: Dict[str, Tuple[float, Any]] = {}  # key -> (expires_at, value)
+_refreshing: set = set()
+
+
+class Dedup:
+    """Share one in-flight call between identical concurrent requests"""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await the call already running under `key`, or start `fn()` for it"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.create_task(fn())
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # A cancelled caller must not cancel the call other requests are awaiting
+        return await asyncio.shield(task)
+
+
+_misses = Dedup()
+
+
+def get_redis():
+    """Return the shared Redis client, or None to cache in process memory"""
+    global _redis
+    if _redis is None and REDIS_AVAILABLE and REDIS_URL:
+        _redis = aioredis.Redis.from_url(REDIS_URL)
+    return _redis
+
+
+async def _read(key: str) -> Optional[Tuple[float, Any]]:
+    redis = get_redis()
+    if redis is None:
+        return _local.get(key)
+    raw = await redis.get(CACHE_PREFIX + key)
+    if raw is None:
+        return None
+    entry = orjson.loads(raw)
+    return entry["expires_at"], entry["value"]
+
+
+async def _write(key: str, value: Any, ttl: float, stale_ttl: float):
+    expires_at = time.time() + ttl
+    redis = get_redis()
+    if redis is None:
+        _local[key] = (expires_at, value)
+        return
+    await redis.set(
+        CACHE_PREFIX + key,
+        orjson.dumps({"expires_at": expires_at, "value": value}),
+        px=int((ttl + stale_ttl) * 1000)
+    )
+
+
+async def invalidate(*keys: str):
+    """Drop cached values so the next read recomputes them"""
+    for key in keys:
+        _local.pop(key, None)
+    redis = get_redis()
+    if redis is not None and keys:
+        await redis.delete(*(CACHE_PREFIX + key for key in keys))
+
+
+async def _compute(key: str, fn: Callable[[], Awaitable[Any]], ttl: float, stale_ttl: float) -> Any:
+    """Recompute a value, holding the distributed lock so one worker does it at a time"""
+    redis = get_redis()
+    lock_key = f"{CACHE_PREFIX}lock:{key}"
+    if redis is not None and not await redis.set(lock_key, b"1", nx=True, px=LOCK_TTL_MS):
+        # Another worker is recomputing: wait briefly for its result
+        deadline = time.monotonic() + LOCK_WAIT_SECONDS
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            entry = await _read(key)
+            if entry is not None and entry[0] > time.time():
+                return entry[1]
+        lock_key = None
+
+    try:
+        value = jsonable_encoder(await fn())
+        await _write(key, value, ttl, stale_ttl)
+        return value
+    finally:
+        if redis is not None and lock_key:
+            await redis.delete(lock_key)
+
+
+def _refresh_done(key: str, task: asyncio.Task):
+    _refreshing.discard(key)
+    if not task.cancelled() and task.exception():
+        logger.warning(f"Background refresh failed for {key}: {task.exception()}")
+
+
+def cached(ttl: float, key: Callable[..., str], stale_ttl: Optional[float] = None):
+    """Cache an endpoint's result for `ttl` seconds under `key(**kwargs)`.
+
+    Concurrent misses on the same key share one computation. Past `ttl` and for
+    `stale_ttl` more seconds (default: `ttl`), the expired value is served while a
+    background task refreshes it. Endpoint exceptions are never cached.
+    """
+    stale_ttl = ttl if stale_ttl is None else stale_ttl
+
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            cache_key = key(*args, **kwargs)
+            compute = lambda: _compute(cache_key, lambda: endpoint(*args, **kwargs), ttl, stale_ttl)
+
+            try:
+                entry = await _read(cache_key)
+            except Exception as e:
+                logger.warning(f"Cache read failed for {cache_key}: {e}")
+                return await endpoint(*args, **kwargs)
+
+            if entry is not None:
+                expires_at, value = entry
+                now = time.time()
+                if now < expires_at:
+                    return value
+                if now < expires_at + stale_ttl:
+                    if cache_key not in _refreshing:
+                        _refreshing.add(cache_key)
+                        task = asyncio.create_task(compute())
+                        task.add_done_callback(functools.partial(_refresh_done, cache_key))
+                    return value
+
+            return await _misses.run(cache_key, compute)
+
+        return wrapper
+
+    return decorator
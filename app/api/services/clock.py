@@ -0,0 +1,24 @@
+"""
+CogOS Clock
+Millisecond-cached ISO timestamps for high-frequency paths (websocket frames, response defaults)
+"""
+
+import time
+from datetime import datetime
+
+_cached_ms = -1
+_cached_iso = ""
+
+
+def now_iso() -> str:
+    """Local time as ISO 8601, formatted at most once per millisecond.
+
+    Not for values that must be unique (file names, ids): calls within the same
+    millisecond return the same string.
+    """
+    global _cached_ms, _cached_iso
+    ms = time.time_ns() // 1_000_000
+    if ms != _cached_ms:
+        _cached_iso = datetime.fromtimestamp(ms / 1000).isoformat()
+        _cached_ms = ms
+    return _cached_iso
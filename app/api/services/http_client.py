@@ -0,0 +1,50 @@
+"""
+CogOS Outbound HTTP
+Shared aiohttp session for fan-out calls to other ecosystem systems
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+CONNECTOR_LIMIT = 100
+DNS_CACHE_TTL_SECONDS = 300
+KEEPALIVE_TIMEOUT_SECONDS = 60
+REQUEST_TIMEOUT_SECONDS = 10
+
+_session: Optional[aiohttp.ClientSession] = None
+_session_lock = asyncio.Lock()
+
+
+async def get_http_session() -> aiohttp.ClientSession:
+    """Return the process-wide session, creating it on first use.
+
+    One pooled connector is shared by every broadcast, so concurrent requests to
+    the same host reuse keep-alive connections instead of reconnecting.
+    """
+    global _session
+    if _session is None or _session.closed:
+        async with _session_lock:
+            if _session is None or _session.closed:
+                _session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(
+                        limit=CONNECTOR_LIMIT,
+                        ttl_dns_cache=DNS_CACHE_TTL_SECONDS,
+                        keepalive_timeout=KEEPALIVE_TIMEOUT_SECONDS
+                    ),
+                    timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS)
+                )
+    return _session
+
+
+async def close_http_session():
+    """Close the shared session (application shutdown)"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+        logger.info("HTTP session closed")
+    _session = None
@@ -0,0 +1,72 @@
+"""
+CogOS Task Queue
+Durable background work (Celery + Redis) for long-running ecosystem jobs
+"""
+
+import os
+import logging
+from typing import Any, Dict, List, Optional
+
+try:
+    from celery import Celery
+    from celery.result import AsyncResult
+    CELERY_AVAILABLE = True
+except ImportError:
+    CELERY_AVAILABLE = False
+
+from ...core.memory import add_memory_entries
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+celery_app: Optional["Celery"] = None
+
+if CELERY_AVAILABLE:
+    celery_app = Celery("cogos", broker=REDIS_URL, backend=REDIS_URL)
+    celery_app.conf.update(
+        task_acks_late=True,
+        worker_prefetch_multiplier=1,
+    )
+
+
+def record_ecosystem_messages(payloads: List[Dict[str, Any]]) -> int:
+    """Store ecosystem messages in CogOS memory with one batched embedding + insert"""
+    return add_memory_entries([
+        {
+            "content": f"Ecosystem {payload.get('type', 'message')}: {payload.get('content', '')}",
+            "tags": ["ecosystem_communication", payload.get("type", "message")],
+            "source": payload.get("source") or "ecosystem"
+        }
+        for payload in payloads
+    ])
+
+
+def record_ecosystem_message(payload: Dict[str, Any]) -> bool:
+    """Store an ecosystem message in CogOS memory"""
+    return record_ecosystem_messages([payload]) == 1
+
+
+if CELERY_AVAILABLE:
+    @celery_app.task(bind=True, max_retries=3, name="cogos.ecosystem.broadcast")
+    def broadcast_task(self, payload: Dict[str, Any]) -> bool:
+        """Record a broadcast message in memory from a Celery worker"""
+        try:
+            if not record_ecosystem_message(payload):
+                raise RuntimeError("memory entry was not stored")
+            return True
+        except Exception as exc:
+            logger.warning(f"Broadcast task failed, retrying: {exc}")
+            raise self.retry(exc=exc, countdown=2 ** self.request.retries)
+
+
+def get_task_status(task_id: str) -> Dict[str, Any]:
+    """Return the state (and result when ready) of a queued task"""
+    if not CELERY_AVAILABLE:
+        return {"task_id": task_id, "status": "UNAVAILABLE"}
+
+    result = AsyncResult(task_id, app=celery_app)
+    status = {"task_id": task_id, "status": result.state}
+    if result.ready():
+        status["result"] = result.result if result.successful() else str(result.result)
+    return status
@@ -0,0 +1,43 @@
+"""
+CogOS Uploads
+Copy UploadFile bodies to disk without holding them in memory
+"""
+
+import asyncio
+import os
+
+import aiofiles
+from fastapi import UploadFile
+
+DEFAULT_CHUNK_BYTES = 1 << 20
+
+
+def _sendfile_copy(src_fd: int, path: str) -> bool:
+    """Copy an open file to `path` inside the kernel; False if sendfile can't target a file here"""
+    size = os.fstat(src_fd).st_size
+    with open(path, "wb") as dst:
+        offset = 0
+        try:
+            while offset < size:
+                sent = os.sendfile(dst.fileno(), src_fd, offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        except OSError:
+            if offset:
+                raise
+            return False
+    return True
+
+
+async def save_upload(file: UploadFile, path, chunk_bytes: int = DEFAULT_CHUNK_BYTES):
+    """Stream an uploaded file to `path` in `chunk_bytes` writes"""
+    # Large uploads are already spooled to a temp file: copy it with sendfile(2), no userspace pass
+    if getattr(file.file, "_rolled", False) and hasattr(os, "sendfile"):
+        if await asyncio.to_thread(_sendfile_copy, file.file.fileno(), os.fspath(path)):
+            return
+
+    await file.seek(0)
+    async with aiofiles.open(path, "wb") as buffer:
+        while chunk := await file.read(chunk_bytes):
+            await buffer.write(chunk)
@@ -1,16 +1,27 @@
 import pytest
-import os
-import sys
-from unittest.mock import MagicMock
+from types import MappingProxyType, SimpleNamespace
+from unittest.mock import MagicMock, patch
+from fastapi.testclient import TestClient
 
-# Ajouter le chemin parent au PYTHONPATH
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Le PYTHONPATH est configuré une seule fois par pytest.ini (`pythonpath`)
 
 # Configuration des fixtures pour les tests
+@pytest.fixture(scope="session")
+def client():
+    """Client de test partagé : l'application (et son lifespan) ne démarre qu'une fois.
+
+    Le préchauffage de la mémoire (modèle d'embedding, collection Chroma) est désactivé :
+    les tests de routes remplacent les fonctions mémoire par des mocks.
+    """
+    from .. import main
+    with patch.object(main, "warmup_memory", lambda: None), TestClient(main.app) as test_client:
+        yield test_client
+
 @pytest.fixture
 def mock_collection():
     """Mock pour la collection ChromaDB"""
     collection = MagicMock()
+    collection.count.return_value = 2
     collection.query.return_value = {
         "documents": [["Document de test 1", "Document de test 2"]],
         "distances": [[0.1, 0.2]]
@@ -18,56 +29,85 @@ def mock_collection():
     return collection
 
 @pytest.fixture
+def memory_mocks(monkeypatch, mock_collection):
+    """Collection, modèle d'embedding et client de chat simulés, installés dans core.memory.
+
+    Des objets neufs à chaque test : une copie de MagicMock partage ses attributs
+    enfants (et donc leurs appels) avec l'original.
+    """
+    import numpy as np
+
+    mocks = {
+        "collection": mock_collection,
+        "get_collection": MagicMock(return_value=mock_collection),
+        "encode": MagicMock(return_value=np.full(384, 0.1)),
+        "chat": MagicMock()
+    }
+    monkeypatch.setattr("core.memory.get_collection", mocks["get_collection"])
+    monkeypatch.setattr("core.memory.get_embedding_model", lambda: SimpleNamespace(encode=mocks["encode"]))
+    # Recherche via la collection simulée plutôt que via l'index FAISS
+    monkeypatch.setattr("core.memory.FAISS_AVAILABLE", False)
+    monkeypatch.setattr("core.memory.get_faiss_index", lambda: None)
+    monkeypatch.setattr("core.memory.client", SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=mocks["chat"]))
+    ))
+    # Pas de réponse mise en cache par un test précédent
+    monkeypatch.setattr("core.memory._query_caches", {})
+    monkeypatch.setattr("core.memory._HAS_ENTRIES", False)
+    return mocks
+
+# Données immuables construites une fois et partagées par toute la session de tests
+@pytest.fixture(scope="session")
 def mock_context():
-    """Données de contexte simulées pour les tests"""
-    return {
+    """Données de contexte simulées pour les tests (lecture seule)"""
+    return MappingProxyType({
         "name": "Utilisateur Test",
         "role": "Développeur Python",
         "tone": "Professionnel",
-        "goals": [
+        "goals": (
             "Apprendre le deep learning",
             "Construire une API REST",
             "Maîtriser FastAPI"
-        ],
-        "focus": [
+        ),
+        "focus": (
             "Python",
             "Machine Learning",
             "Web Development"
-        ],
-        "domains": {
+        ),
+        "domains": MappingProxyType({
             "tech": 8.5,
             "science": 7.2,
             "art": 4.3,
             "histoire": 5.1,
             "économie": 6.7
-        },
-        "memory": {
-            "short_term": ["FastAPI", "Next.js", "React"],
-            "long_term": ["Python", "IA"]
-        }
-    }
+        }),
+        "memory": MappingProxyType({
+            "short_term": ("FastAPI", "Next.js", "React"),
+            "long_term": ("Python", "IA")
+        })
+    })
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_memory_entries():
-    """Entrées de mémoire simulées pour les tests"""
-    return [
-        {
+    """Entrées de mémoire simulées pour les tests (lecture seule)"""
+    return (
+        MappingProxyType({
             "content": "FastAPI est un framework web moderne pour Python.",
             "timestamp": "2023-01-01T12:00:00",
-            "tags": ["python", "web", "fastapi"],
+            "tags": ("python", "web", "fastapi"),
             "source": "documentation",
             "embedding_id": "123"
-        },
-        {
+        }),
+        MappingProxyType({
             "content": "Next.js est un framework React pour la production.",
             "timestamp": "2023-01-02T14:30:00",
-            "tags": ["javascript", "react", "nextjs"],
+            "tags": ("javascript", "react", "nextjs"),
             "source": "article",
             "embedding_id": "456"
-        }
-    ]
+        })
+    )
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_agent_actions():
     """Actions d'agent simulées pour les tests"""
     class MockAction:
@@ -93,9 +133,9 @@ def mock_agent_actions():
                 "completed": self.completed
             }
     
-    return [
+    return (
         MockAction("1", "Apprendre FastAPI", "apprentissage", 4),
         MockAction("2", "Créer une API REST", "défi", 5),
         MockAction("3", "Réviser Python asyncio", "consolidation", 3),
         MockAction("4", "Finir le cours React", "apprentissage", 2, True)
-    ] 
\ No newline at end of file
+    ) 
\ No newline at end of file
@@ -10,28 +10,22 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Import des modules à tester
 from ...core.memory import query_memory, add_memory_entry, get_recent_entries
 
+# Les dépendances de core.memory sont simulées par la fixture `memory_mocks` (conftest.py)
+
 # Tests pour query_memory
 @pytest.mark.parametrize("query,expected", [
     ("test query", True),  # Teste si une requête de base retourne une réponse
 ])
-@patch("core.memory.get_collection")
-@patch("core.memory.EMBEDDING_MODEL.encode")
-@patch("core.memory.client.chat.completions.create")
-def test_query_memory_success(mock_chat_create, mock_encode, mock_get_collection, query, expected):
+def test_query_memory_success(memory_mocks, query, expected):
     # Configurer les mocks
-    mock_collection = MagicMock()
-    mock_get_collection.return_value = mock_collection
-    
-    mock_encode.return_value = [0.1, 0.2, 0.3]
-    
-    mock_collection.query.return_value = {
+    memory_mocks["collection"].query.return_value = {
         "documents": [["Document 1", "Document 2"]]
     }
     
     mock_chat_response = MagicMock()
     mock_chat_response.choices = [MagicMock()]
     mock_chat_response.choices[0].message.content = "Réponse test"
-    mock_chat_create.return_value = mock_chat_response
+    memory_mocks["chat"].return_value = mock_chat_response
     
     # Appeler la fonction
     result = query_memory(query)
@@ -41,18 +35,14 @@ def test_query_memory_success(mock_chat_create, mock_encode, mock_get_collection
     assert result == "Réponse test"
     
     # Vérifier que les mocks ont été appelés correctement
-    mock_get_collection.assert_called_once()
-    mock_encode.assert_called_once_with(query)
-    mock_collection.query.assert_called_once()
-    mock_chat_create.assert_called_once()
+    memory_mocks["get_collection"].assert_called_once()
+    memory_mocks["encode"].assert_called_once_with(query, normalize_embeddings=True)
+    memory_mocks["collection"].query.assert_called_once()
+    memory_mocks["chat"].assert_called_once()
 
-@patch("core.memory.get_collection")
-def test_query_memory_empty_results(mock_get_collection):
+def test_query_memory_empty_results(memory_mocks):
     # Configurer les mocks pour simuler aucun résultat
-    mock_collection = MagicMock()
-    mock_get_collection.return_value = mock_collection
-    
-    mock_collection.query.return_value = {
+    memory_mocks["collection"].query.return_value = {
         "documents": [[]]  # Aucun document trouvé
     }
     
@@ -63,15 +53,9 @@ def test_query_memory_empty_results(mock_get_collection):
     assert "Aucun souvenir trouvé" in result
 
 # Tests pour add_memory_entry
-@patch("core.memory.get_collection")
-@patch("core.memory.EMBEDDING_MODEL.encode")
 @patch("uuid.uuid4")
-def test_add_memory_entry(mock_uuid, mock_encode, mock_get_collection):
+def test_add_memory_entry(mock_uuid, memory_mocks):
     # Configurer les mocks
-    mock_collection = MagicMock()
-    mock_get_collection.return_value = mock_collection
-    
-    mock_encode.return_value = [0.1, 0.2, 0.3]
     mock_uuid.return_value = "test-uuid"
     
     # Appeler la fonction
@@ -80,30 +64,26 @@ def test_add_memory_entry(mock_uuid, mock_encode, mock_get_collection):
     # Vérifier le résultat
     assert result is True
     
-    # Vérifier que les mocks ont été appelés correctement
-    mock_get_collection.assert_called_once()
-    mock_encode.assert_called_once_with("Test content")
-    mock_collection.add.assert_called_once()
+    # Vérifier que les mocks ont été appelés correctement (ajout unitaire = lot d'une entrée)
+    memory_mocks["get_collection"].assert_called_once()
+    memory_mocks["encode"].assert_called_once()
+    assert memory_mocks["encode"].call_args[0][0] == ["Test content"]
+    memory_mocks["collection"].add.assert_called_once()
     
     # Vérifier les arguments du add
-    add_args = mock_collection.add.call_args[1]
+    add_args = memory_mocks["collection"].add.call_args[1]
     assert add_args["ids"] == ["test-uuid"]
     assert add_args["documents"] == ["Test content"]
     assert "tag1,tag2" in str(add_args["metadatas"])
     assert "test_source" in str(add_args["metadatas"])
 
 # Tests pour get_recent_entries
-@patch("core.memory.get_collection")
-def test_get_recent_entries(mock_get_collection):
-    # Configurer les mocks
-    mock_collection = MagicMock()
-    mock_get_collection.return_value = mock_collection
-    
+def test_get_recent_entries(memory_mocks):
     # Simuler des résultats de la collection
     now = datetime.now().isoformat()
     earlier = datetime.now().replace(hour=10).isoformat()
     
-    mock_collection.get.return_value = {
+    memory_mocks["collection"].get.return_value = {
         "documents": ["Doc 1", "Doc 2"],
         "metadatas": [
             {"timestamp": now, "source": "source1", "tags": "tag1,tag2"},
@@ -124,4 +104,4 @@ def test_get_recent_entries(mock_get_collection):
     
     # Vérifier avec une limite
     result_limited = get_recent_entries(limit=1)
-    assert len(result_limited) == 1 
\ No newline at end of file
+    assert len(result_limited) == 1
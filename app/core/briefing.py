@@ -1,16 +1,31 @@
-from .reflector import reflect_on_last_entries
-from .context_loader import get_raw_context
+import asyncio
 
-def generate_briefing():
-    ctx = get_raw_context()
-    short_focus = ", ".join(ctx.get("memory", {}).get("short_term", []))
-    goals = ", ".join(ctx.get("goals", []))
-    reflection = reflect_on_last_entries()
+from .reflector import reflect_on_last_entries, reflect_on_last_entries_async
+from .context_loader import get_context_readonly
 
-    return f"""
+BRIEFING_TEMPLATE = """
 🎯 Objectifs : {goals}
 🧠 Focus du moment : {short_focus}
 
 📚 Derniers apprentissages :
 {reflection}
-""" 
\ No newline at end of file
+"""
+
+def _format_briefing(ctx, reflection: str) -> str:
+    return BRIEFING_TEMPLATE.format(
+        goals=", ".join(ctx.get("goals", [])),
+        short_focus=", ".join(ctx.get("memory", {}).get("short_term", [])),
+        reflection=reflection
+    )
+
+def generate_briefing():
+    # Lecture seule : pas de copie du contexte mis en cache
+    return _format_briefing(get_context_readonly(), reflect_on_last_entries())
+
+async def generate_briefing_async():
+    # Lecture du contexte et réflexion indépendantes : menées en parallèle
+    ctx, reflection = await asyncio.gather(
+        asyncio.to_thread(get_context_readonly),
+        reflect_on_last_entries_async()
+    )
+    return _format_briefing(ctx, reflection)
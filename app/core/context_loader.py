@@ -1,38 +1,72 @@
 from pathlib import Path
-import json
-from typing import Dict, Any
+import os
+import orjson
+from typing import Dict, Any, Optional, Tuple
 
 CONTEXT_PATH = Path("memory/context_mcp.json")
 
+# ((mtime_ns, size), contenu brut, contexte décodé) du dernier chargement
+_cache: Optional[Tuple[Tuple[int, int], bytes, Dict[str, Any]]] = None
+
+def _read_context() -> Optional[Tuple[bytes, Dict[str, Any]]]:
+    """Return the file bytes and parsed context, re-read only when the file changed."""
+    global _cache
+    try:
+        st = os.stat(CONTEXT_PATH)
+    except FileNotFoundError:
+        return None
+    key = (st.st_mtime_ns, st.st_size)
+    if _cache is None or _cache[0] != key:
+        with open(CONTEXT_PATH, "rb") as f:
+            raw = f.read()
+        _cache = (key, raw, orjson.loads(raw))
+    return _cache[1], _cache[2]
+
+# Prompt block built by load_context
+CONTEXT_TEMPLATE = """# User Context:
+- Name: {name}
+- Role: {role}
+- Tone: {tone}
+- Goals: {goals}
+- Current Focus: {focus}"""
+
+def get_context_readonly() -> Dict[str, Any]:
+    """Parsed context shared between callers (no copy): read only, never modify it."""
+    cached = _read_context()
+    return cached[1] if cached is not None else {}
+
 def load_context() -> str:
     """Load and format the MCP context for LLM prompts."""
-    if not CONTEXT_PATH.exists():
+    ctx = get_context_readonly()
+    if not ctx:
         return ""
-    
-    with open(CONTEXT_PATH, "r", encoding="utf-8") as f:
-        ctx = json.load(f)
 
     # Convert MCP to text block for prompt
-    context_str = f"""# User Context:
-- Name: {ctx.get('name')}
-- Role: {ctx['persona']['role']}
-- Tone: {ctx['persona']['tone']}
-- Goals: {', '.join(ctx.get('goals', []))}
-- Current Focus: {', '.join(ctx['memory'].get('short_term', []))}"""
-    return context_str
+    return CONTEXT_TEMPLATE.format(
+        name=ctx.get('name'),
+        role=ctx['persona']['role'],
+        tone=ctx['persona']['tone'],
+        goals=', '.join(ctx.get('goals', [])),
+        focus=', '.join(ctx['memory'].get('short_term', []))
+    )
 
 def get_raw_context() -> Dict[str, Any]:
     """Load the raw MCP context as a dictionary."""
-    if not CONTEXT_PATH.exists():
+    cached = _read_context()
+    if cached is None:
         return {}
-    
-    with open(CONTEXT_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+    # Callers modify the result: decode a fresh copy from the cached bytes (no disk read)
+    return orjson.loads(cached[0])
 
 def update_context(new_context: Dict[str, Any]) -> None:
     """Update the MCP context with new values."""
-    current_context = get_raw_context()
-    current_context.update(new_context)
-    
-    with open(CONTEXT_PATH, "w", encoding="utf-8") as f:
-        json.dump(current_context, f, indent=2, ensure_ascii=False) 
\ No newline at end of file
+    global _cache
+    merged = get_raw_context() | new_context
+    raw = orjson.dumps(merged, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+
+    with open(CONTEXT_PATH, "wb") as f:
+        f.write(raw)
+    # Seed the cache with what was just written: the next read needs no disk access.
+    # Decoded from `raw` so the cache shares no objects with the caller's new_context.
+    st = os.stat(CONTEXT_PATH)
+    _cache = ((st.st_mtime_ns, st.st_size), raw, orjson.loads(raw))
@@ -0,0 +1,63 @@
+"""
+Index FAISS HNSW pour la recherche de query_memory.
+
+Chroma reste la source de vérité (documents, métadonnées) : l'index, construit une
+fois à partir de la collection, ne garde que les vecteurs et leurs ids Chroma. La
+recherche des plus proches voisins se fait entièrement en C++, sans aller-retour
+SQLite ; seuls les documents retenus sont ensuite lus dans Chroma.
+"""
+import threading
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+
+class FaissIndex:
+    """Index HNSW en produit scalaire (embeddings normalisés) associé aux ids Chroma"""
+
+    def __init__(self, dim: int):
+        self.index = faiss.IndexHNSWFlat(dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        self.index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        self.index.hnsw.efSearch = HNSW_EF_SEARCH
+        self.ids: List[str] = []  # position dans l'index -> id Chroma
+        # HNSW ne supporte pas un ajout concurrent à une recherche
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_collection(cls, collection) -> Optional["FaissIndex"]:
+        """Construire l'index à partir de tous les embeddings de la collection (None si elle est vide)"""
+        data = collection.get(include=["embeddings"])
+        embeddings = data.get("embeddings")
+        if embeddings is None or len(embeddings) == 0:
+            return None
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        index = cls(vectors.shape[1])
+        index.add(data["ids"], vectors)
+        return index
+
+    def add(self, ids: List[str], embeddings):
+        vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+        with self._lock:
+            self.index.add(vectors)
+            self.ids.extend(ids)
+
+    def search(self, query_vec, top_k: int) -> Tuple[List[str], List[float]]:
+        """Ids Chroma des `top_k` vecteurs les plus proches (du plus proche au plus lointain) et leurs produits scalaires"""
+        query = np.ascontiguousarray(query_vec, dtype=np.float32).reshape(1, -1)
+        with self._lock:
+            scores, positions = self.index.search(query, top_k)
+        hits = [(self.ids[i], float(score)) for i, score in zip(positions[0], scores[0]) if i >= 0]
+        return [entry_id for entry_id, _ in hits], [score for _, score in hits]
+
+    def __len__(self) -> int:
+        return self.index.ntotal
@@ -35,6 +35,7 @@ def get_embedding_model():
 import faiss
 import numpy as np
 import chromadb
+from chromadb.config import Settings
 
 # === Config ===
 SUPPORTED_TEXT_EXTENSIONS = [".md", ".txt"]
@@ -51,7 +52,10 @@ OUTPUT_JSONL = "ingested/memory.jsonl"
 EMBEDDING_INDEX = "embeddings/memory.index"
 
 # Initialize the new ChromaDB client
-chroma_client = chromadb.PersistentClient(path="embeddings/chroma")
+chroma_client = chromadb.PersistentClient(
+    path="embeddings/chroma",
+    settings=Settings(anonymized_telemetry=False, allow_reset=False)
+)
 
 # === Extracteurs ===
 def extract_text_txt(path: Path) -> str:
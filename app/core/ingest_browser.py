@@ -1,42 +1,80 @@
 import sqlite3
 import os
-import datetime
+import sys
+from hashlib import blake2b
 from pathlib import Path
-import json
+import numpy as np
+import orjson
+
+try:
+    from .memory import add_memory_entries
+except ImportError:
+    # Lancé comme script (python core/ingest_browser.py) : pas de paquet parent
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from core.memory import add_memory_entries
 
 OUTPUT_JSONL = "ingested/history.jsonl"
 
-def fetch_chrome_history(limit=100):
-    history_path = os.path.expanduser("~/Library/Application Support/Google/Chrome/Default/History")
-    if not Path(history_path).exists():
-        print("❌ Historique Chrome non trouvé.")
-        return
+# Chrome timestamps start from Jan 1, 1601 (microseconds)
+CHROME_EPOCH = np.datetime64("1601-01-01T00:00:00", "us")
+BROWSER_TAGS = ["chrome", "navigation", "web"]
 
-    conn = sqlite3.connect(history_path)
-    cursor = conn.cursor()
+# Rows converted, written and indexed per batch: memory stays bounded whatever the limit
+FETCH_BATCH_ROWS = 1000
 
-    cursor.execute("""
-        SELECT url, title, last_visit_time FROM urls ORDER BY last_visit_time DESC LIMIT ?
-    """, (limit,))
+def _entry_id(url: str, last_visit_time: int) -> str:
+    # Stable d'un import à l'autre : une visite déjà importée est mise à jour, pas dupliquée
+    return "chrome_" + blake2b(f"{url}|{last_visit_time}".encode(), digest_size=16).hexdigest()
 
-    entries = []
-    for url, title, last_visit_time in cursor.fetchall():
-        # Chrome timestamps start from Jan 1, 1601 — convert to readable datetime
-        ts = datetime.datetime(1601, 1, 1) + datetime.timedelta(microseconds=last_visit_time)
-        entries.append({
+def _build_entries(rows) -> list:
+    # Convert every visit time of the batch to an ISO string in one vectorized pass
+    micros = np.fromiter((row[2] for row in rows), dtype=np.int64, count=len(rows))
+    created_at = np.datetime_as_string(CHROME_EPOCH + micros.astype("timedelta64[us]"), unit="us").tolist()
+
+    return [
+        {
+            "id": _entry_id(url, visited),
             "text": f"{title} — {url}",
             "metadata": {
                 "source": "browser",
-                "created_at": ts.isoformat(),
-                "tags": ["chrome", "navigation", "web"]
+                "created_at": ts,
+                "tags": BROWSER_TAGS
             }
-        })
+        }
+        for (url, title, visited), ts in zip(rows, created_at)
+    ]
+
+def fetch_chrome_history(limit=100):
+    history_path = os.path.expanduser("~/Library/Application Support/Google/Chrome/Default/History")
+    if not Path(history_path).exists():
+        print("❌ Historique Chrome non trouvé.")
+        return
+
+    # Read-only and immutable: no lock taken, so this works while Chrome is open
+    conn = sqlite3.connect(f"{Path(history_path).as_uri()}?mode=ro&immutable=1", uri=True)
+    try:
+        cursor = conn.execute("""
+            SELECT url, title, last_visit_time FROM urls ORDER BY last_visit_time DESC LIMIT ?
+        """, (limit,))
+
+        imported = added = 0
+        # Gardé pour la fusion dans memory.jsonl par ingest.py
+        with open(OUTPUT_JSONL, "wb") as f:
+            while rows := cursor.fetchmany(FETCH_BATCH_ROWS):
+                entries = _build_entries(rows)
+                f.write(b"".join(orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE) for entry in entries))
 
-    with open(OUTPUT_JSONL, "w", encoding="utf-8") as f:
-        for entry in entries:
-            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                # Un seul encodage et un seul ajout à la collection par lot
+                added += add_memory_entries([
+                    {"id": entry["id"], "content": entry["text"], "tags": entry["metadata"]["tags"],
+                     "source": "browser", "timestamp": entry["metadata"]["created_at"]}
+                    for entry in entries
+                ])
+                imported += len(entries)
+    finally:
+        conn.close()
 
-    print(f"✅ {len(entries)} entrées importées depuis Chrome.")
+    print(f"✅ {imported} entrées importées depuis Chrome ({added} indexées en mémoire).")
 
 if __name__ == "__main__":
     fetch_chrome_history()
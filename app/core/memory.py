@@ -1,4 +1,7 @@
 import chromadb
+import asyncio
+import os
+import numpy as np
 try:
     from sentence_transformers import SentenceTransformer
     SentenceTransformer_available = True
@@ -6,11 +9,62 @@ except ImportError as e:
     print(f"Warning: Could not import SentenceTransformer: {e}")
     SentenceTransformer_available = False
 
+try:
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    from transformers import AutoTokenizer
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+# Dossier du MiniLM exporté en ONNX et quantifié int8 (optimum-cli export onnx / onnxruntime quantize).
+# S'il est défini, il remplace le modèle PyTorch : même API encode, inférence int8 sur CPU.
+EMBEDDING_ONNX_MODEL_DIR = os.getenv("EMBEDDING_ONNX_MODEL_DIR")
+EMBEDDING_MAX_TOKENS = 256  # max_seq_length de all-MiniLM-L6-v2
+
 EMBEDDING_MODEL = None
 
+class OnnxEmbeddingModel:
+    """MiniLM sous ONNX Runtime, compatible avec SentenceTransformer.encode (mean pooling + normalisation L2)"""
+
+    def __init__(self, model_dir: str):
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = os.cpu_count() or 1
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            model_dir,
+            provider="CPUExecutionProvider",
+            session_options=options
+        )
+
+    def encode(self, sentences, batch_size: int = 32, **kwargs) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            tokens = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=EMBEDDING_MAX_TOKENS,
+                return_tensors="np"
+            )
+            hidden = self.model(**tokens).last_hidden_state
+            mask = tokens["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            batches.append(pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None))
+        embeddings = np.concatenate(batches) if batches else np.empty((0, 0), dtype=np.float32)
+        return embeddings[0] if single else embeddings
+
 def get_embedding_model():
     """Lazy initialization of the embedding model."""
     global EMBEDDING_MODEL
+    if EMBEDDING_MODEL is None and EMBEDDING_ONNX_MODEL_DIR and ONNXRUNTIME_AVAILABLE:
+        try:
+            EMBEDDING_MODEL = OnnxEmbeddingModel(EMBEDDING_ONNX_MODEL_DIR)
+        except Exception as e:
+            print(f"Warning: Could not load ONNX embedding model, falling back to SentenceTransformer: {e}")
+            EMBEDDING_MODEL = None
     if EMBEDDING_MODEL is None and SentenceTransformer_available:
         try:
             EMBEDDING_MODEL = SentenceTransformer("all-MiniLM-L6-v2")
@@ -20,66 +74,302 @@ def get_embedding_model():
     return EMBEDDING_MODEL
     
 from config.secrets import get_api_key
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 from pathlib import Path
 import chromadb.errors
+from chromadb.config import Settings
 from datetime import datetime
 import uuid
-client = OpenAI(api_key=get_api_key())
+import httpx
+import threading
+import heapq
+from typing import Optional
+from .faiss_index import FAISS_AVAILABLE, FaissIndex
+from .query_cache import QueryCache
+
+try:
+    import h2  # noqa: F401  (HTTP/2 pour httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Un appel au modèle ne doit pas bloquer une requête indéfiniment
+OPENAI_TIMEOUT_SECONDS = 15.0
+
+client = OpenAI(api_key=get_api_key(), timeout=OPENAI_TIMEOUT_SECONDS)
+# Client non bloquant pour les routes async (query_memory_async) : pool de connexions
+# keep-alive partagé, multiplexées en HTTP/2 quand h2 est installé
+async_client = AsyncOpenAI(
+    api_key=get_api_key(),
+    http_client=httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=OPENAI_TIMEOUT_SECONDS
+    )
+)
+
+async def close_async_client():
+    """Fermer le pool de connexions du client async (arrêt de l'application)"""
+    await async_client.close()
 
 # ChromaDB client (local persistent store)
 CHROMA_DIR = "embeddings/chroma"
-chroma_client = chromadb.PersistentClient(path=CHROMA_DIR)
+# Sans télémétrie (un envoi réseau par opération) ni remise à zéro possible de la base
+CHROMA_SETTINGS = Settings(anonymized_telemetry=False, allow_reset=False)
+chroma_client = chromadb.PersistentClient(path=CHROMA_DIR, settings=CHROMA_SETTINGS)
 
 # Nom de la collection
 COLLECTION_NAME = "cogos_memory"
 
+# Taille des lots passés au modèle d'embedding lors des ajouts groupés
+EMBEDDING_BATCH_SIZE = 64
+
+# Les embeddings sont normalisés à l'encodage : le produit scalaire équivaut au cosinus
+# sans renormaliser chaque candidat. Appliqué à la création de la collection uniquement
+# (une collection existante garde son espace ; sur des vecteurs unitaires, L2 classe pareil).
+COLLECTION_METADATA = {"hnsw:space": "ip", "hnsw:construction_ef": 200, "hnsw:M": 32}
+
+# Handle de collection résolu une seule fois par processus
+_COLLECTION = None
+
 def get_collection():
-    try:
-        return chroma_client.get_collection(name=COLLECTION_NAME)
-    except chromadb.errors.CollectionNotFoundError:
-        # Si la collection n'existe pas encore, la créer vide
-        return chroma_client.create_collection(name=COLLECTION_NAME)
+    global _COLLECTION
+    if _COLLECTION is None:
+        # Créée vide si elle n'existe pas encore
+        _COLLECTION = chroma_client.get_or_create_collection(name=COLLECTION_NAME, metadata=COLLECTION_METADATA)
+    return _COLLECTION
+
+# Devient vrai au premier souvenir vu : la mémoire ne se vide pas ensuite
+_HAS_ENTRIES = False
+
+def collection_has_entries(collection) -> bool:
+    """La collection contient-elle au moins un souvenir ?
+
+    Tant qu'elle est vide, count() est relu à chaque appel (ingest.py peut la remplir
+    depuis un autre processus) ; une fois un souvenir vu, plus d'aller-retour SQLite.
+    """
+    global _HAS_ENTRIES
+    if not _HAS_ENTRIES:
+        _HAS_ENTRIES = collection.count() > 0
+    return _HAS_ENTRIES
+
+def invalidate_collection_cache():
+    """Oublier le handle mis en cache et l'index FAISS qui en dérive (collection recréée, tests)"""
+    global _COLLECTION, _HAS_ENTRIES
+    _COLLECTION = None
+    _HAS_ENTRIES = False
+    invalidate_faiss_index()
+
+# Index FAISS des embeddings de la collection, construit à la demande.
+# None : FAISS absent ou collection vide, la recherche passe par Chroma.
+# ingest.py réécrit la collection depuis un autre processus (ids réutilisés) :
+# l'index est reconstruit dès qu'il ne correspond plus à la collection.
+_FAISS_INDEX = None
+_faiss_loaded = False
+_faiss_lock = threading.Lock()
+
+# Écart toléré entre le score FAISS et le produit scalaire recalculé sur l'embedding Chroma
+FAISS_SCORE_TOLERANCE = 1e-3
+
+def get_faiss_index():
+    global _FAISS_INDEX, _faiss_loaded
+    if not _faiss_loaded and FAISS_AVAILABLE:
+        with _faiss_lock:
+            if not _faiss_loaded:
+                _FAISS_INDEX = FaissIndex.from_collection(get_collection())
+                _faiss_loaded = True
+    return _FAISS_INDEX
+
+def invalidate_faiss_index():
+    """Oublier l'index FAISS : il sera reconstruit depuis la collection au prochain appel"""
+    global _FAISS_INDEX, _faiss_loaded
+    with _faiss_lock:
+        _FAISS_INDEX = None
+        _faiss_loaded = False
+
+def _index_embeddings(ids: list, embeddings: list):
+    """Répercuter dans l'index FAISS des vecteurs ajoutés à la collection"""
+    global _FAISS_INDEX
+    if not FAISS_AVAILABLE or not embeddings:
+        return
+    index = get_faiss_index()
+    if index is None:
+        with _faiss_lock:
+            if _FAISS_INDEX is None:
+                _FAISS_INDEX = FaissIndex(len(embeddings[0]))
+            index = _FAISS_INDEX
+    index.add(ids, embeddings)
+
+def _search_with_index(index, collection, query_vec, top_k: int) -> Optional[list]:
+    """Documents les plus proches via l'index FAISS, ou None si l'index ne reflète plus la collection"""
+    ids, scores = index.search(query_vec, top_k)
+    if not ids:
+        return []
+    # Chroma ne rend pas les ids dans l'ordre demandé : remettre l'ordre de proximité
+    found = collection.get(ids=ids, include=["documents", "embeddings"])
+    rows = {
+        entry_id: (doc, embedding)
+        for entry_id, doc, embedding in zip(found["ids"], found["documents"], found["embeddings"])
+    }
+    query = np.asarray(query_vec, dtype=np.float32)
+    documents = []
+    for entry_id, score in zip(ids, scores):
+        row = rows.get(entry_id)
+        # Id supprimé, ou réutilisé pour un autre document : l'index est périmé
+        if row is None or abs(float(np.dot(query, np.asarray(row[1], dtype=np.float32))) - score) > FAISS_SCORE_TOLERANCE:
+            return None
+        documents.append(row[0])
+    return documents
+
+def _search_documents(collection, query_vec, top_k: int) -> list:
+    """Documents les plus proches de query_vec : via l'index FAISS s'il est à jour, sinon via Chroma"""
+    index = get_faiss_index()
+    if index is not None and len(index) != collection.count():
+        # Collection modifiée hors de ce processus : reconstruire l'index
+        invalidate_faiss_index()
+        index = get_faiss_index()
+
+    if index is not None:
+        documents = _search_with_index(index, collection, query_vec, top_k)
+        if documents is not None:
+            return documents
+        # Même nombre d'entrées mais contenu réécrit : reconstruit à la prochaine recherche
+        invalidate_faiss_index()
+
+    results = collection.query(
+        query_embeddings=[query_vec.tolist()],
+        n_results=top_k
+    )
+    return results.get("documents", [[]])[0]
+
+def warmup():
+    """Ouvrir la collection, charger le modèle d'embedding et construire l'index avant la première requête"""
+    get_collection()
+    get_embedding_model()
+    get_faiss_index()
+
+# Réponses déjà générées, par valeur de top_k (vidées à chaque ajout en mémoire)
+_query_caches = {}
+
+def get_query_cache(top_k: int) -> QueryCache:
+    cache = _query_caches.get(top_k)
+    if cache is None:
+        cache = _query_caches.setdefault(top_k, QueryCache())
+    return cache
+
+def invalidate_query_cache():
+    for cache in list(_query_caches.values()):
+        cache.clear()
+
+# Consignes fixes, identiques d'un appel à l'autre : un préfixe que l'API peut mettre en cache
+MEMORY_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "Tu es un assistant personnel qui puise dans les souvenirs de ton utilisateur. "
+               "Donne une réponse claire, fidèle, et personnelle en français."
+}
+
+# Taille maximale d'un souvenir, puis de l'ensemble des souvenirs, envoyés au modèle
+# (la latence et le coût de l'appel croissent avec la longueur du prompt)
+MEMORY_DOC_MAX_CHARS = 500
+MEMORY_CONTEXT_MAX_CHARS = 3000
+
+def _memory_messages(query: str, docs: list) -> list:
+    # Souvenirs du plus proche au plus lointain, jusqu'à épuisement du budget
+    lines = []
+    remaining = MEMORY_CONTEXT_MAX_CHARS
+    for doc in docs:
+        line = f"- {doc[:min(MEMORY_DOC_MAX_CHARS, remaining)]}"
+        lines.append(line)
+        remaining -= len(line)
+        if remaining <= 0:
+            break
+
+    context = "\n".join(lines)
+    return [
+        MEMORY_SYSTEM_MESSAGE,
+        {"role": "user", "content": f'Question : "{query}"\n\nMémoire :\n{context}'}
+    ]
 
 def query_memory(query: str, top_k: int = 5) -> str:
     try:
+        # Question déjà posée : pas d'embedding, de recherche ni d'appel au modèle
+        cache = get_query_cache(top_k)
+        cached_answer = cache.get(query)
+        if cached_answer is not None:
+            return cached_answer
+
+        # Mémoire vide : inutile d'encoder la question
+        collection = get_collection()
+        if not collection_has_entries(collection):
+            return "🤖 Aucun souvenir trouvé en mémoire."
+
         embedding_model = get_embedding_model()
         if embedding_model is None:
             return "🤖 Système d'embedding non disponible. Vérifiez la configuration des dépendances."
-            
-        collection = get_collection()
 
         # Embedding de la requête
-        query_vec = embedding_model.encode(query).tolist()
+        query_vec = embedding_model.encode(query, normalize_embeddings=True)
+
+        # Question quasi identique déjà posée
+        cached_answer = cache.get_similar(query_vec)
+        if cached_answer is not None:
+            return cached_answer
 
         # Recherche vectorielle
-        results = collection.query(
-            query_embeddings=[query_vec],
-            n_results=top_k
+        docs = _search_documents(collection, query_vec, top_k)
+
+        if not docs:
+            return "🤖 Aucun souvenir trouvé en mémoire."
+
+        response = client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=_memory_messages(query, docs)
         )
 
-        docs = results.get("documents", [[]])[0]
+        answer = response.choices[0].message.content.strip()
+        cache.put(query, query_vec, answer)
+        return answer
 
-        if not docs:
+    except chromadb.errors.NoIndexException:
+        return "⚠️ Index mémoire manquant. Lance `python core/ingest.py` pour construire la mémoire."
+    except Exception as e:
+        return f"⚠️ Erreur mémoire : {str(e)}"
+
+async def query_memory_async(query: str, top_k: int = 5) -> str:
+    """Version async de query_memory : encodage et recherche Chroma dans un thread, appel au modèle non bloquant"""
+    try:
+        cache = get_query_cache(top_k)
+        cached_answer = cache.get(query)
+        if cached_answer is not None:
+            return cached_answer
+
+        collection = await asyncio.to_thread(get_collection)
+        if not await asyncio.to_thread(collection_has_entries, collection):
             return "🤖 Aucun souvenir trouvé en mémoire."
 
-        # Contexte concaténé
-        context = "\n\n".join([f"- {doc[:500]}" for doc in docs])
+        embedding_model = await asyncio.to_thread(get_embedding_model)
+        if embedding_model is None:
+            return "🤖 Système d'embedding non disponible. Vérifiez la configuration des dépendances."
 
-        prompt = f"""Tu es un assistant personnel qui puise dans les souvenirs de ton utilisateur. 
-Voici ce que tu as trouvé en mémoire concernant la question : "{query}"
+        query_vec = await asyncio.to_thread(embedding_model.encode, query, normalize_embeddings=True)
 
-{context}
+        cached_answer = cache.get_similar(query_vec)
+        if cached_answer is not None:
+            return cached_answer
 
-Donne une réponse claire, fidèle, et personnelle en français.
-"""
+        docs = await asyncio.to_thread(_search_documents, collection, query_vec, top_k)
 
-        response = client.chat.completions.create(
+        if not docs:
+            return "🤖 Aucun souvenir trouvé en mémoire."
+
+        response = await async_client.chat.completions.create(
             model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}]
+            messages=_memory_messages(query, docs)
         )
 
-        return response.choices[0].message.content.strip()
+        answer = response.choices[0].message.content.strip()
+        cache.put(query, query_vec, answer)
+        return answer
 
     except chromadb.errors.NoIndexException:
         return "⚠️ Index mémoire manquant. Lance `python core/ingest.py` pour construire la mémoire."
@@ -98,47 +388,118 @@ def add_memory_entry(content: str, tags: list = None, source: str = None) -> boo
     Returns:
         bool: True si l'ajout a réussi, False sinon
     """
+    # Un ajout unitaire est un lot d'une entrée
+    return add_memory_entries([{"content": content, "tags": tags, "source": source}]) == 1
+
+def add_memory_entries(entries: list) -> int:
+    """
+    Ajoute plusieurs entrées en une fois : un seul encodage par lot et un seul ajout à la collection.
+    
+    Args:
+        entries: Liste de dicts {"content": str, "tags": list (optionnel), "source": str (optionnel),
+                 "timestamp": str ISO (optionnel, maintenant par défaut),
+                 "id": str (optionnel, stable : l'entrée existante de même id est remplacée)}
+        
+    Returns:
+        int: Nombre d'entrées ajoutées
+    """
+    global _HAS_ENTRIES
+    if not entries:
+        return 0
     try:
         embedding_model = get_embedding_model()
         if embedding_model is None:
-            print("Warning: EMBEDDING_MODEL is not available. Cannot add entry.")
-            return False
+            print("Warning: EMBEDDING_MODEL is not available. Cannot add entries.")
+            return 0
             
         collection = get_collection()
+        now = datetime.now()
         
-        # Générer un ID unique
-        entry_id = str(uuid.uuid4())
-        
-        # Créer les métadonnées
-        metadata = {
-            "timestamp": datetime.now().isoformat(),
-            "source": source or "direct_input"
-        }
-        
-        # Ajouter les tags aux métadonnées s'ils existent
-        if tags:
-            metadata["tags"] = ",".join(tags)
+        contents = [entry["content"] for entry in entries]
+        metadatas = []
+        for entry in entries:
+            created = datetime.fromisoformat(entry["timestamp"]) if entry.get("timestamp") else now
+            metadata = {
+                "timestamp": created.isoformat(),
+                # Horodatage entier, filtrable par Chroma ($gte) pour get_recent_entries
+                "timestamp_ms": int(created.timestamp() * 1000),
+                "source": entry.get("source") or "direct_input"
+            }
+            if entry.get("tags"):
+                metadata["tags"] = ",".join(entry["tags"])
+            metadatas.append(metadata)
         
-        # Encoder le contenu
-        embedding = embedding_model.encode(content).tolist()
+        # Encoder tout le lot en un appel
+        embeddings = embedding_model.encode(
+            contents,
+            batch_size=EMBEDDING_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        ).tolist()
         
-        # Ajouter à la collection
-        collection.add(
-            ids=[entry_id],
-            embeddings=[embedding],
-            documents=[content],
-            metadatas=[metadata]
-        )
+        ids = [entry.get("id") or str(uuid.uuid4()) for entry in entries]
+        if any(entry.get("id") for entry in entries):
+            # Ids fournis par l'appelant : remplacer les entrées déjà importées plutôt que les dupliquer
+            collection.upsert(
+                ids=ids,
+                embeddings=embeddings,
+                documents=contents,
+                metadatas=metadatas
+            )
+            # Des vecteurs ont pu être remplacés : l'index FAISS est reconstruit à la prochaine recherche
+            invalidate_faiss_index()
+        else:
+            collection.add(
+                ids=ids,
+                embeddings=embeddings,
+                documents=contents,
+                metadatas=metadatas
+            )
+            _index_embeddings(ids, embeddings)
+        invalidate_query_cache()
+        _HAS_ENTRIES = True
         
-        return True
+        return len(entries)
     except Exception as e:
-        print(f"Erreur lors de l'ajout à la mémoire: {str(e)}")
-        return False
+        print(f"Erreur lors de l'ajout groupé à la mémoire: {str(e)}")
+        return 0
+
+# Fenêtre initiale de get_recent_entries, élargie jusqu'à trouver assez d'entrées
+RECENT_WINDOW_MS = 24 * 3600 * 1000
+RECENT_WINDOW_GROWTH = 8
+
+def _to_entries(results: dict, limit: int) -> list:
+    """Convertir un résultat collection.get() en ses `limit` entrées les plus récentes, de la plus récente à la plus ancienne"""
+    docs = results.get("documents") or []
+    ids = results.get("ids") or []
+    empty = {}
+    metas = [metadata or empty for metadata in results.get("metadatas") or []]
+
+    # Sélection sur le seul timestamp : les entrées (et le découpage des tags)
+    # ne sont construites que pour les lignes retenues, pas pour toute la fenêtre
+    timestamps = [meta.get("timestamp", "") for meta in metas]
+    latest = heapq.nlargest(limit, range(min(len(docs), len(metas), len(ids))), key=timestamps.__getitem__)
+
+    return [
+        {
+            "content": docs[i],
+            "timestamp": timestamps[i],
+            "tags": metas[i]["tags"].split(",") if metas[i].get("tags") else [],
+            "source": metas[i].get("source", ""),
+            "embedding_id": ids[i]
+        }
+        for i in latest
+    ]
 
 def get_recent_entries(limit: int = 10) -> list:
     """
     Récupère les entrées les plus récentes de la mémoire.
     
+    Chroma ne sait pas trier : on filtre sur timestamp_ms dans une fenêtre récente,
+    élargie tant qu'elle contient moins de `limit` entrées, puis on trie ce petit
+    résultat. Les embeddings ne sont jamais chargés.
+    
     Args:
         limit: Nombre maximum d'entrées à récupérer
         
@@ -147,37 +508,22 @@ def get_recent_entries(limit: int = 10) -> list:
     """
     try:
         collection = get_collection()
+        include = ["documents", "metadatas"]
         
-        # Récupérer toutes les entrées (Chroma n'a pas de tri intégré)
-        results = collection.get()
-        
-        entries = []
-        
-        # Traiter les résultats
-        for i, doc in enumerate(results.get("documents", [])):
-            metadata = results.get("metadatas", [])[i]
-            entry_id = results.get("ids", [])[i]
-            
-            # Extraire les tags
-            tags = []
-            if metadata and "tags" in metadata:
-                tags = metadata["tags"].split(",")
-            
-            entry = {
-                "content": doc,
-                "timestamp": metadata.get("timestamp", ""),
-                "tags": tags,
-                "source": metadata.get("source", ""),
-                "embedding_id": entry_id
-            }
-            
-            entries.append(entry)
+        now_ms = int(datetime.now().timestamp() * 1000)
+        window_ms = RECENT_WINDOW_MS
+        while True:
+            cutoff_ms = max(now_ms - window_ms, 0)
+            results = collection.get(where={"timestamp_ms": {"$gte": cutoff_ms}}, include=include)
+            if len(results["ids"]) >= limit or cutoff_ms == 0:
+                break
+            window_ms *= RECENT_WINDOW_GROWTH
         
-        # Trier par timestamp (du plus récent au plus ancien)
-        entries.sort(key=lambda x: x["timestamp"], reverse=True)
+        # Entrées antérieures à timestamp_ms : seul un parcours complet les retrouve
+        if len(results["ids"]) < limit and collection.count() > len(results["ids"]):
+            results = collection.get(include=include)
         
-        # Limiter le nombre d'entrées
-        return entries[:limit]
+        return _to_entries(results, limit)
     except Exception as e:
         print(f"Erreur lors de la récupération des entrées récentes: {str(e)}")
         return []
@@ -0,0 +1,90 @@
+"""
+Cache sémantique des réponses de query_memory.
+
+Une question déjà posée (texte identique) ou très proche (similarité cosinus des
+embeddings au-dessus du seuil) renvoie la réponse générée précédemment, sans
+nouvelle recherche Chroma ni appel au modèle de chat.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+
+class QueryCache:
+    """Cache LRU à expiration, interrogeable par texte exact ou par embedding voisin"""
+
+    def __init__(self, max_size: int = 256, ttl_seconds: float = 3600, threshold: float = 0.95):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self._lock = threading.RLock()
+        self._slots: "OrderedDict[str, int]" = OrderedDict()  # question -> ligne de _vectors, du plus ancien au plus récent
+        self._answers: list = [None] * max_size  # ligne -> (question, réponse, expiration)
+        self._vectors: Optional[np.ndarray] = None  # (max_size, dim), embeddings normalisés
+        self._valid = np.zeros(max_size, dtype=bool)
+
+    def get(self, query: str) -> Optional[str]:
+        """Réponse mise en cache pour exactement cette question"""
+        with self._lock:
+            slot = self._slots.get(query)
+            if slot is None:
+                return None
+            return self._hit(query, slot)
+
+    def get_similar(self, query_vec) -> Optional[str]:
+        """Réponse d'une question dont l'embedding est assez proche de `query_vec`"""
+        with self._lock:
+            if self._vectors is None or not self._valid.any():
+                return None
+            vec = self._normalize(query_vec)
+            # Une seule multiplication matrice-vecteur sur toutes les questions en cache
+            sims = np.where(self._valid, self._vectors @ vec, -1.0)
+            slot = int(sims.argmax())
+            if sims[slot] < self.threshold:
+                return None
+            return self._hit(self._answers[slot][0], slot)
+
+    def put(self, query: str, query_vec, answer: str):
+        """Mémoriser la réponse à une question, en évinçant la moins récemment utilisée si plein"""
+        vec = self._normalize(query_vec)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_size, vec.shape[0]), dtype=np.float32)
+
+            slot = self._slots.pop(query, None)
+            if slot is None:
+                if len(self._slots) < self.max_size:
+                    slot = int((~self._valid).argmax())
+                else:
+                    _, slot = self._slots.popitem(last=False)
+
+            self._slots[query] = slot
+            self._vectors[slot] = vec
+            self._answers[slot] = (query, answer, time.monotonic() + self.ttl_seconds)
+            self._valid[slot] = True
+
+    def clear(self):
+        """Tout invalider (la mémoire a changé, les réponses peuvent être obsolètes)"""
+        with self._lock:
+            self._slots.clear()
+            self._answers = [None] * self.max_size
+            self._valid[:] = False
+
+    def _hit(self, query: str, slot: int) -> Optional[str]:
+        _, answer, expires_at = self._answers[slot]
+        if time.monotonic() >= expires_at:
+            del self._slots[query]
+            self._answers[slot] = None
+            self._valid[slot] = False
+            return None
+        self._slots.move_to_end(query)
+        return answer
+
+    @staticmethod
+    def _normalize(vec) -> np.ndarray:
+        vec = np.asarray(vec, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
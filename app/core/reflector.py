@@ -1,5 +1,7 @@
+import asyncio
 import json
 from pathlib import Path
+from typing import Optional
 from openai import OpenAI
 from config.secrets import get_api_key
 
@@ -35,23 +37,46 @@ Fais une synthèse claire de ses idées, réflexions ou apprentissages à ce suj
     return response.choices[0].message.content.strip()
 
 
-def reflect_on_last_entries(n=5) -> str:
+def _reflection_prompt(n: int) -> Optional[str]:
+    """Prompt de réflexion sur les `n` dernières entrées (None si la mémoire est vide)"""
     if not Path(MEMORY_PATH).exists():
-        return "Mémoire vide."
+        return None
 
     entries = [json.loads(line) for line in open(MEMORY_PATH, encoding="utf-8")]
     latest = sorted(entries, key=lambda x: x["metadata"]["created_at"], reverse=True)[:n]
 
     content = "\n\n".join([f"- {e['text'][:500]}" for e in latest])
-    prompt = f"""Voici les dernières entrées mémorielles de l'utilisateur :
+    return f"""Voici les dernières entrées mémorielles de l'utilisateur :
 
 {content}
 
 Quelles sont les thématiques récurrentes ? Vois-tu des tendances ? Suggère une réflexion personnelle ou une synthèse à partir de ça.
 """
 
+
+def reflect_on_last_entries(n=5) -> str:
+    prompt = _reflection_prompt(n)
+    if prompt is None:
+        return "Mémoire vide."
+
     response = client.chat.completions.create(
         model="gpt-3.5-turbo",
         messages=[{"role": "user", "content": prompt}]
     )
     return response.choices[0].message.content.strip()
+
+
+async def reflect_on_last_entries_async(n=5) -> str:
+    """Version async de reflect_on_last_entries : lecture du fichier dans un thread, appel au modèle non bloquant"""
+    # Pool de connexions partagé avec query_memory_async, fermé à l'arrêt de l'API
+    from .memory import async_client
+
+    prompt = await asyncio.to_thread(_reflection_prompt, n)
+    if prompt is None:
+        return "Mémoire vide."
+
+    response = await async_client.chat.completions.create(
+        model="gpt-3.5-turbo",
+        messages=[{"role": "user", "content": prompt}]
+    )
+    return response.choices[0].message.content.strip()